@@ -22,6 +22,10 @@ from src.Interface.Classes.QClickTreeWidget import QClickTreeWidget
 
 from src.Modules.BackupLogic import *
 from src.Modules.BackupHistoryViewLogic import *
+from src.Modules.ChangeJournal import ChangeJournalService
+from src.Modules.ContinuousBackup import ContinuousBackupService
+from src.Modules.DriveMonitor import DriveMetadataCache
+from src.Modules.HistoryRetention import startHistoryRotation
 
 # ------------------------------------------------------------------------------------ #
 
@@ -60,6 +64,14 @@ class MainWindow(QMainWindow):
 
         self.historyCounter = findObject(self, "historyCounter")
 
+        # Entries rotated out of the history are only shown on demand, such as for audits.
+        self.showArchivedHistoryCheck: QCheckBox = findObject(self, "showArchivedHistoryCheck")
+        self.showArchivedHistoryCheck.toggled.connect(self.populate_history_view)
+
+        # Set-up the drive benchmark, of the drive selected inside the drive view.
+        self.benchmarkDriveBtn = findObject(self, "benchmarkDriveButton")
+        self.benchmarkDriveBtn.clicked.connect(lambda: benchmarkSelectedDrive(self, self.drive_tree))
+
         # Set-up the backup registry view, button logic.
         self.actionsBackups: QListWidget = findObject(self, "actionsBackups")
         self.actionsSelection: QListWidget = findObject(self, "actionsSelection")
@@ -86,13 +98,22 @@ class MainWindow(QMainWindow):
         # Populate the drive and backups view.
         self.refreshViews()
 
+        # Keep the drive view up to date as drives are plugged in, removed, mounted or unmounted.
+        DriveMetadataCache.startMonitoring()
+
+        # Rotate old backup history entries into the archive, once per rotation interval while the program runs.
+        startHistoryRotation()
+
     # -- MAIN WINDOW FUNCTIONS & ACTIONS ---------------------------- #
 
     # View refreshing logic.
     def refreshViews(self):
         populateDriveView(self, self.drive_tree)
         populateBackupRegistryView(self, self.backup_tree)
-        populateBackupHistoryView(self, self.history_tree)
+        self.populate_history_view()
+
+    def populate_history_view(self):
+        populateBackupHistoryView(self, self.history_tree, self.showArchivedHistoryCheck.isChecked())
 
 
     # Prompt windows
@@ -217,7 +238,7 @@ class MainWindow(QMainWindow):
         
         if result:
             clearBackupHistory()
-            populateBackupHistoryView(self, self.history_tree)
+            self.populate_history_view()
 
 # ------------------------------------------------------------------------------------ #
 
@@ -279,4 +300,9 @@ if __name__ == "__main__":
         ),
     ])
 
-    app.exec_()
\ No newline at end of file
+    app.exec_()
+
+    # Stop the continuous backups and journaling changes, so the journals are marked as no longer being watched.
+    ContinuousBackupService.stopAll()
+    ChangeJournalService.stopAll()
+    DriveMetadataCache.stopMonitoring()
\ No newline at end of file
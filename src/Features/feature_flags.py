@@ -18,6 +18,59 @@ DYNViewsAreRefreshing = False
 
 CRITICALFileStructureCompatibilityVersion = 1
 
+PathProbeCacheSeconds = 30
+PathProbeCacheEntries = 1024
+
+FolderReportEntries = 10
+FolderReportDisplayedEntries = 5
+FolderStatsCacheLoadedLimit = 8
+FolderStatsCacheMaxAgeDays = 30
+
+ChangeJournalFlushSeconds = 5
+ChangeJournalHeartbeatTimeoutSeconds = 30
+ChangeJournalMaxEntries = 100000
+
+ContinuousBackupIntervalSeconds = 10
+ContinuousBackupFallbackIntervalSeconds = 300
+ContinuousBackupQueueSize = 10000
+ContinuousBackupBatchSize = 1000
+ContinuousBackupCoalescedFolders = 1000
+
+TreeSnapshotInternedNames = 262144
+
+BackupPredictorSampleCount = 10
+BackupOverlapMinimumMinutes = 15
+
+CapacityReservePercent = 5
+CapacityGrowthWindowDays = 30
+
+DriveEventDebounceSeconds = 0.5
+DriveLetterPollingSeconds = 2
+
+DriveBenchmarkFileMegabytes = 256
+DriveBenchmarkSmallFiles = 500
+DriveBenchmarkSyncCount = 20
+DriveBenchmarkSlowdownRatio = 4
+
+IoTelemetryIntervalSeconds = 1
+IoTelemetryBufferSize = 600
+IoTelemetryPersistedSamples = 60
+
+HistoryRecentEntries = 1000
+HistoryLogIndexInterval = 256
+HistoryLogFrameRecords = 4096
+HistoryLogMergeFrames = 1024
+
+# Retention of the backup history, older entries are rotated into the archive. Setting a rule to 0 disables it.
+HistoryRetentionMaxAgeDays = 365
+HistoryRetentionEntriesPerBackup = 1000
+HistoryRetentionFailuresOnlyAfterDays = 0
+HistoryRotationIntervalHours = 24
+
+EnvironmentFlushSeconds = 0.5
+EnvironmentReloadSeconds = 1
+StorageIndexRefreshSeconds = 1
+
 # -- OTHER --------------------------------------------------------------------------- #
 
 MainWindowPath = "src/Interface/MainWindow.ui"
@@ -26,3 +79,12 @@ BackupSetupPath = "src/Interface/BackupSetup.ui"
 BackupSchedulerPath = "src/Interface/BackupScheduler.ui"
 
 BaseProjectWebPath = "https://github.com/matkeg/RobotCopy"
+
+# Forces a drive enumeration backend ("Windows" or "Linux"), the platform's backend is used when empty.
+DriveProbeBackend = ""
+
+# Selects where the backup registry, the backup history and the environment values are stored ("json" or "sqlite").
+StorageBackend = "json"
+
+# Selects the file type of the backup history log ("JSONLines" or "Binary"), the existing log is converted on first use.
+HistoryLogFileType = "JSONLines"
@@ -3,7 +3,7 @@
 # Date: January 7th 2025
 
 # Standard Libraries
-import os, shutil, json
+import os, re, time, shutil, json, threading
 from enum import Enum
 from typing import Optional
 
@@ -27,15 +27,90 @@ class StorageFolder(Enum):
 class FileType(Enum):
     BackupEntry = getFFlag("BackupEntryFileExtension") or "rcbe"
     JSON = "json"
+    JSONLines = "jsonl"
     XML = "xml"
     Text = "txt"
+    TreeSnapshot = "rcts"
+    Database = "db"
+    Binary = "rcb"
+
+# ------------------------------------------------------------------------------------ #
+
+# Folders are only created once per process, and the files of each storage folder are indexed in memory,
+# so resolving a stored file doesn't probe the disk for every possible extension.
+_created_folders = set()
+_folder_indexes = {}
+_folder_indexes_lock = threading.Lock()
+
+class FolderIndex:
+    def __init__(self):
+        self.files = frozenset()
+        self.modified_at = None
+        self.checked_at = None
+
+def ensure_folder(folder_path: str):
+    """Creates the folder unless it was already created by this process."""
+    if folder_path not in _created_folders:
+        os.makedirs(folder_path, exist_ok=True)
+        _created_folders.add(folder_path)
+
+def forget_storage_paths():
+    """Forgets the created folders and the indexed files, such as after the AppData folder was removed."""
+    with _folder_indexes_lock:
+        _created_folders.clear()
+        _folder_indexes.clear()
+
+def get_folder_files(folder_path: str, revalidate: Optional[bool] = False) -> frozenset:
+    """
+    Returns the names of the files inside of a storage folder, from its index.
+    - The index is listed again when the folder's modification time changed, which is checked at most once per
+      `StorageIndexRefreshSeconds` (or right away when revalidating), so most lookups don't touch the disk at all.
+    - Folders modified too recently to trust their modification time are checked again on the next lookup.
+    """
+    with _folder_indexes_lock:
+        index = _folder_indexes.setdefault(folder_path, FolderIndex())
+
+        now = time.monotonic()
+        refresh_interval = getFFlag("StorageIndexRefreshSeconds") or 1
+        if not revalidate and index.checked_at is not None and now - index.checked_at < refresh_interval:
+            return index.files
+        index.checked_at = now
+
+        try:
+            modified_at = os.stat(folder_path).st_mtime_ns
+        except FileNotFoundError:
+            index.files, index.modified_at = frozenset(), None
+            _created_folders.discard(folder_path)
+            return index.files
+
+        if modified_at != index.modified_at:
+            with os.scandir(folder_path) as entries:
+                index.files = frozenset(entry.name for entry in entries if entry.is_file())
+
+            # File systems with coarse timestamps (such as FAT) could modify the folder again within the same tick.
+            is_settled = time.time_ns() - modified_at > 2_000_000_000
+            index.modified_at = modified_at if is_settled else None
+
+        return index.files
+
+def note_file_written(file_path: str):
+    with _folder_indexes_lock:
+        index = _folder_indexes.get(os.path.dirname(file_path))
+        if index is not None:
+            index.files = index.files | {os.path.basename(file_path)}
+
+def note_file_removed(file_path: str):
+    with _folder_indexes_lock:
+        index = _folder_indexes.get(os.path.dirname(file_path))
+        if index is not None:
+            index.files = index.files - {os.path.basename(file_path)}
 
 # ------------------------------------------------------------------------------------ #
 
 def get_app_data_path() -> str:
     """Returns the AppData directory path for the application."""
     app_data_path = os.path.join(os.getenv("APPDATA", ""), PROGRAM_NAME)
-    os.makedirs(app_data_path, exist_ok=True)
+    ensure_folder(app_data_path)
     return app_data_path
 
 
@@ -47,7 +122,7 @@ def get_storage_folder_path(folder: Optional[StorageFolder] = StorageFolder.UNDE
         return base_path
     
     folder_path = os.path.join(base_path, folder.value)
-    os.makedirs(folder_path, exist_ok=True)
+    ensure_folder(folder_path)
     return folder_path
 
 
@@ -63,22 +138,237 @@ def get_data_file_path(filename: str, folder: Optional[StorageFolder] = StorageF
 
 def find_file_path(filename: str, folder: Optional[StorageFolder] = StorageFolder.UNDEFINED) -> Optional[str]:
     """Finds the full path of a file by checking all possible extensions."""
-    for file_type in FileType:
-        potential_path = get_data_file_path(filename, folder, file_type)
-
-        if os.path.exists(potential_path):
-            return potential_path
+    folder_path = get_storage_folder_path(folder)
+
+    # A file missing from the index might have just been created by another process, so the index is revalidated once.
+    for revalidate in (False, True):
+        files = get_folder_files(folder_path, revalidate)
+        for file_type in FileType:
+            file_name = f"{filename}.{file_type.value}"
+            if file_name in files:
+                return os.path.join(folder_path, file_name)
         
     return get_data_file_path(filename, folder)
 
 
 # ------------------------------------------------------------------------------------ #
 
+# Every stored file is written while holding its file lock, shared with the other processes of the program
+# (such as a background backup runner), so they never write the same file at once.
+_file_locks = {}
+_file_locks_lock = threading.Lock()
+
+def get_file_lock(file_path: str):
+    """Returns the lock of a stored file, its lock file is kept in the Temp folder so it's never mistaken for data."""
+    from .FileLock import FileLock
+
+    file_path = os.path.abspath(file_path)
+    with _file_locks_lock:
+        if file_path not in _file_locks:
+            lock_name = os.path.relpath(file_path, get_app_data_path()).replace(os.sep, "_").replace(":", "_")
+            lock_folder = os.path.join(get_storage_folder_path(StorageFolder.TEMP), "Locks")
+            os.makedirs(lock_folder, exist_ok=True)
+            _file_locks[file_path] = FileLock(os.path.join(lock_folder, f"{lock_name}.lock"))
+        return _file_locks[file_path]
+
+def write_file(file_path: str, content: bytes):
+    """Writes a stored file atomically under its file lock, concurrent writes of the same file are coalesced."""
+    from .AtomicWriter import AtomicWriter
+
+    try:
+        AtomicWriter.write(os.path.abspath(file_path), content, get_file_lock(file_path))
+    except FileNotFoundError:
+        # The folder was removed since it was created, such as by the user.
+        forget_storage_paths()
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        AtomicWriter.write(os.path.abspath(file_path), content, get_file_lock(file_path))
+    note_file_written(file_path)
+
+def encode_file(data, file_type: Optional[FileType] = None, compact: Optional[bool] = False) -> bytes:
+    """Encodes data the way files of the passed type store it, binary files hold records (see RecordCodec)."""
+    if file_type == FileType.Binary:
+        from .RecordCodec import encodeFile
+        return encodeFile(data)
+
+    # Records loaded from binary files are stored as regular objects.
+    from .RecordCodec import recordToDict
+    if compact:
+        return json.dumps(data, separators=(',', ':'), default=recordToDict).encode('utf-8')
+    return json.dumps(data, indent=4, default=recordToDict).encode('utf-8')
+
+def load_file(file_path: str):
+    """Loads a stored file, decoding binary files by their extension and every other file as JSON."""
+    if file_path.endswith(f".{FileType.Binary.value}"):
+        from .RecordCodec import decodeFile
+        with open(file_path, 'rb') as f:
+            return decodeFile(f.read())
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+# ------------------------------------------------------------------------------------ #
+
+# With the SQLite storage backend, the backup registry, the backup history and the environment values are
+# stored in tables of a single database instead of their JSON files. Every other file stays a file.
+_sqlite_storage = None
+_sqlite_storage_lock = threading.Lock()
+
+def uses_sqlite_storage() -> bool:
+    return (getFFlag("StorageBackend") or "json").lower() == "sqlite"
+
+def get_sqlite_storage():
+    """Returns the SQLite storage, creating the database (and importing the existing JSON files into it) on first use."""
+    global _sqlite_storage
+    with _sqlite_storage_lock:
+        if _sqlite_storage is None:
+            from .SQLiteStorage import SQLiteStorage
+
+            database_path = get_data_file_path("storage", StorageFolder.UNDEFINED, FileType.Database)
+            is_new_database = not os.path.exists(database_path)
+
+            _sqlite_storage = SQLiteStorage(database_path)
+            if is_new_database:
+                import_json_into_sqlite(_sqlite_storage)
+
+        return _sqlite_storage
+
+def close_sqlite_storage():
+    global _sqlite_storage
+    with _sqlite_storage_lock:
+        if _sqlite_storage is not None:
+            _sqlite_storage.close()
+            _sqlite_storage = None
+
+def get_sqlite_table(filename: str, folder: Optional[StorageFolder]) -> Optional[tuple[str, Optional[int]]]:
+    """Returns the table (and the backup id, for registry entries) the passed file is stored in, or None if it stays a file."""
+    if not uses_sqlite_storage():
+        return None
+
+    if folder == StorageFolder.BACKUPS:
+        match = re.fullmatch(r"backup(\d+)", filename)
+        if match:
+            return "backups", int(match.group(1))
+    elif folder == StorageFolder.LOGS and filename == "backup_history":
+        return "history", None
+    elif (folder is None or folder == StorageFolder.UNDEFINED) and filename == "enviroment":
+        return "environment", None
+    return None
+
+def import_json_into_sqlite(storage):
+    """Imports the registry, history and environment files into a new database, the files are left as they are."""
+    for filename in os.listdir(get_storage_folder_path(StorageFolder.BACKUPS)):
+        match = re.fullmatch(r"backup(\d+)\.\w+", filename)
+        if match:
+            data = load_json_file(os.path.join(get_storage_folder_path(StorageFolder.BACKUPS), filename))
+            if data is not None:
+                storage.save_backup(int(match.group(1)), data)
+
+    history = get_history_log().read()
+    if history:
+        storage.save_history(history)
+
+    environment = load_json_file(find_file_path("enviroment", StorageFolder.UNDEFINED))
+    if environment:
+        storage.save_environment(environment)
+
+def load_json_file(file_path: str) -> Optional[dict]:
+    if not os.path.exists(file_path):
+        return None
+    try:
+        return load_file(file_path)
+    except Exception as e:
+        print(f"Unable to import {file_path}: {e}")
+        return None
+
+# ------------------------------------------------------------------------------------ #
+
+# With the JSON storage backend, the backup history is an append-only log rather than a JSON file, so adding
+# an entry doesn't rewrite the whole history. `HistoryLogFileType` selects whether the log holds JSON Lines
+# or binary records, which load much faster.
+_history_log = None
+_history_log_lock = threading.Lock()
+
+def uses_history_log(filename: str, folder: Optional[StorageFolder]) -> bool:
+    return folder == StorageFolder.LOGS and filename == "backup_history" and not uses_sqlite_storage()
+
+def get_history_log_file_type() -> FileType:
+    file_type = getattr(FileType, getFFlag("HistoryLogFileType") or "JSONLines", None)
+    return file_type if file_type in (FileType.JSONLines, FileType.Binary) else FileType.JSONLines
+
+def get_history_log():
+    """
+    Returns the history log, moving the entries of the previous history file into it on first use,
+    either the JSON history file or the log of the other file type.
+    """
+    global _history_log
+    with _history_log_lock:
+        if _history_log is None:
+            from .HistoryLog import HistoryLog, JsonLinesFormat, BinaryFormat
+
+            log_formats = {FileType.JSONLines: JsonLinesFormat, FileType.Binary: BinaryFormat}
+            file_type = get_history_log_file_type()
+            log_path = get_data_file_path("backup_history", StorageFolder.LOGS, file_type)
+
+            # The log is only kept once the previous history moved into it, so a failed move is retried on the next use.
+            history_log = HistoryLog(log_path, get_file_lock(log_path), log_formats[file_type]())
+            if not os.path.exists(log_path):
+                for previous_type in (FileType.JSON, *log_formats):
+                    previous_path = get_data_file_path("backup_history", StorageFolder.LOGS, previous_type)
+                    if previous_type == file_type or not os.path.exists(previous_path):
+                        continue
+
+                    if previous_type == FileType.JSON:
+                        history = load_json_file(previous_path)
+                    else:
+                        history = HistoryLog(previous_path, get_file_lock(previous_path), log_formats[previous_type]()).read()
+
+                    if history is not None:
+                        history_log.replace(history)
+                        os.remove(previous_path)
+                        if os.path.exists(f"{previous_path}.idx"):
+                            os.remove(f"{previous_path}.idx")
+                        break
+
+            _history_log = history_log
+
+        return _history_log
+
+# ------------------------------------------------------------------------------------ #
+
+# With the JSON storage backend, the environment values are kept in memory by an environment store,
+# which writes changes to the environment file in batches and allocates counters under a file lock.
+_environment_store = None
+_environment_store_lock = threading.Lock()
+
+def uses_environment_store(filename: str, folder: Optional[StorageFolder]) -> bool:
+    return (folder is None or folder == StorageFolder.UNDEFINED) and filename == "enviroment" and not uses_sqlite_storage()
+
+def get_environment_store():
+    global _environment_store
+    with _environment_store_lock:
+        if _environment_store is None:
+            from .EnvironmentStore import EnvironmentStore
+            file_path = find_file_path("enviroment", StorageFolder.UNDEFINED)
+            _environment_store = EnvironmentStore(file_path, get_file_lock(file_path))
+        return _environment_store
+
+def close_environment_store():
+    """Writes the pending environment values and drops the store, it's loaded again on the next use."""
+    global _environment_store
+    with _environment_store_lock:
+        if _environment_store is not None:
+            _environment_store.flush()
+            _environment_store = None
+
+# ------------------------------------------------------------------------------------ #
+
 def get_environment_value(key: str, default_value: any = None) -> any:
     """Retrieves a specific value from the environment data file."""
     try:
-        env_data = load_data("enviroment", StorageFolder.UNDEFINED, silent=True) or {}
-        return env_data.get(key, default_value)
+        if get_sqlite_table("enviroment", StorageFolder.UNDEFINED):
+            return get_sqlite_storage().get_environment_value(key, default_value)
+
+        return get_environment_store().get(key, default_value)
     except Exception as e:
         error(f"Error getting environment value {key}: {e}", "get_environment_value Error")
         return default_value
@@ -86,36 +376,52 @@ def get_environment_value(key: str, default_value: any = None) -> any:
 def set_environment_value(key: str, value: any) -> bool:
     """Sets or updates a specific value in the environment data file."""
     try:
-        env_data = load_data("enviroment", StorageFolder.UNDEFINED, silent=True) or {}
-        env_data[key] = value
-        return save_data("enviroment", env_data, StorageFolder.UNDEFINED)
+        if get_sqlite_table("enviroment", StorageFolder.UNDEFINED):
+            get_sqlite_storage().set_environment_value(key, value)
+            return True
+
+        get_environment_store().set(key, value)
+        return True
     except Exception as e:
         error(f"Error setting environment value {key}: {e}", "set_environment_value Error")
         return False
 
 def increment_environment_value(key: str, increment: int = 1, default_value: int = 0) -> Optional[int]:
-    """Increments a numeric value in the environment data file, useful for handling Ids."""
+    """
+    Increments a numeric value in the environment data file, useful for handling Ids.
+    - The increment is atomic across threads and processes, so each returned value is only ever handed out once.
+    """
     try:
-        current_value = get_environment_value(key, default_value)
-        if not isinstance(current_value, (int, float)):
-            current_value = default_value
-        new_value = current_value + increment
-        if set_environment_value(key, new_value):
-            return new_value
-        return None
+        if get_sqlite_table("enviroment", StorageFolder.UNDEFINED):
+            return get_sqlite_storage().increment_environment_value(key, increment, default_value)
+
+        return get_environment_store().allocate(key, increment, default_value)
     except Exception as e:
         error(f"Error incrementing environment value {key}: {e}", "increment_environment_value Error")
         return None
 
 # ------------------------------------------------------------------------------------ #
 
-def save_data(filename: str, data: dict, folder: Optional[StorageFolder] = StorageFolder.UNDEFINED, file_type: Optional[FileType] = None) -> bool:
-    """Saves the provided data as a file in the specified storage folder with the given extension."""
+def save_data(filename: str, data: dict, folder: Optional[StorageFolder] = StorageFolder.UNDEFINED, file_type: Optional[FileType] = None, compact: Optional[bool] = False) -> bool:
+    """
+    Saves the provided data as a file in the specified storage folder with the given extension.
+    - Large, machine-only files (such as caches) should pass `compact` to skip indentation.
+    """
     try:
+        table = get_sqlite_table(filename, folder)
+        if table is not None:
+            save_sqlite_data(table, data)
+            return True
+        elif uses_history_log(filename, folder):
+            get_history_log().replace(data)
+            return True
+        elif uses_environment_store(filename, folder):
+            get_environment_store().replace(data)
+            return True
+
+        # The file is replaced as a whole, so a crash while saving leaves the previous data rather than a truncated file.
         file_path = get_data_file_path(filename, folder, file_type)
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4)
+        write_file(file_path, encode_file(data, file_type, compact))
         return True
     except Exception as e:
         error(f"Error saving data to {filename}: {e}", "save_data Error")
@@ -125,14 +431,16 @@ def save_data(filename: str, data: dict, folder: Optional[StorageFolder] = Stora
 def edit_data(filename: str, newData: dict, folder: Optional[StorageFolder] = StorageFolder.UNDEFINED, file_type: Optional[FileType] = None) -> bool:
     """Edits existing data or adds new data to a file. If the file does not exist, it creates a new one with the provided data."""
     try:
-        # Load existing data or create an empty structure
-        data = load_data(filename, folder, silent=True) or {}
-        
-        # Apply updates
-        data.update(newData)
-        
-        # Save the updated data
-        return save_data(filename, data, folder, file_type)
+        # The file stays locked from loading to saving, so edits by other processes in between aren't lost.
+        with get_file_lock(get_data_file_path(filename, folder, file_type)):
+            # Load existing data or create an empty structure
+            data = load_data(filename, folder, silent=True) or {}
+            
+            # Apply updates
+            data.update(newData)
+            
+            # Save the updated data
+            return save_data(filename, data, folder, file_type)
     
     except Exception as e:
         error(f"Error editing data in {filename}: {e}", "edit_data Error")
@@ -142,16 +450,27 @@ def edit_data(filename: str, newData: dict, folder: Optional[StorageFolder] = St
 def load_data(filename: str, folder: Optional[StorageFolder] = StorageFolder.UNDEFINED, silent: Optional[bool] = False) -> Optional[dict]:
     """Loads and returns data from a file in the specified storage folder."""
     try:
+        table = get_sqlite_table(filename, folder)
+        if table is not None:
+            data = load_sqlite_data(table)
+            if data is None and not silent:
+                error(f"File {filename} does not exist in {folder.value if folder else 'root'} folder.", "load_data Error")
+            return data
+        elif uses_history_log(filename, folder):
+            return get_history_log().read() or None
+        elif uses_environment_store(filename, folder):
+            return get_environment_store().getAll() or None
+
         file_path = find_file_path(filename, folder)
 
-        if not os.path.exists(file_path):
+        try:
+            return load_file(file_path)
+        except FileNotFoundError:
+            note_file_removed(file_path)
             if not silent:
                 error(f"File {filename} does not exist in {folder.value if folder else 'root'} folder.", "load_data Error")  
             return None
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-        
     except Exception as e:
         error(f"Error loading data from {filename}: {e}", "load_data Error")
         return None
@@ -160,18 +479,124 @@ def load_data(filename: str, folder: Optional[StorageFolder] = StorageFolder.UND
 def remove_data(filename: str, folder: Optional[StorageFolder] = StorageFolder.UNDEFINED) -> bool:
     """Removes a data file from the specified storage folder."""
     try:
+        table = get_sqlite_table(filename, folder)
+        if table is not None:
+            return remove_sqlite_data(table)
+        elif uses_history_log(filename, folder):
+            get_history_log().clear()
+            return True
+        elif uses_environment_store(filename, folder):
+            get_environment_store().remove()
+            return True
+
         file_path = find_file_path(filename, folder)
 
-        if file_path and os.path.exists(file_path):
-            os.remove(file_path)
+        try:
+            with get_file_lock(file_path):
+                os.remove(file_path)
             return True
-        return False
+        except FileNotFoundError:
+            return False
+        finally:
+            note_file_removed(file_path)
     
     except Exception as e:
         error(f"Error removing {filename}: {e}", "remove_data Error")
         return False
 
 
+def save_sqlite_data(table: tuple[str, Optional[int]], data):
+    table_name, backup_id = table
+    if table_name == "backups":
+        get_sqlite_storage().save_backup(backup_id, data)
+    elif table_name == "history":
+        get_sqlite_storage().save_history(data)
+    elif table_name == "environment":
+        get_sqlite_storage().save_environment(data)
+
+def load_sqlite_data(table: tuple[str, Optional[int]]):
+    """Loads the data of a table the same way its JSON file would load, None standing for a missing file."""
+    table_name, backup_id = table
+    if table_name == "backups":
+        return get_sqlite_storage().load_backup(backup_id)
+    elif table_name == "history":
+        return get_sqlite_storage().query_history() or None
+    elif table_name == "environment":
+        return get_sqlite_storage().load_environment() or None
+
+def remove_sqlite_data(table: tuple[str, Optional[int]]) -> bool:
+    table_name, backup_id = table
+    if table_name == "backups":
+        return get_sqlite_storage().remove_backup(backup_id)
+    elif table_name == "history":
+        get_sqlite_storage().save_history([])
+    elif table_name == "environment":
+        get_sqlite_storage().save_environment({})
+    return True
+
+# ------------------------------------------------------------------------------------ #
+
+def load_all_backup_data() -> list[dict]:
+    """Loads the data of every registered backup."""
+    if uses_sqlite_storage():
+        return get_sqlite_storage().list_backups()
+
+    backups = []
+    backups_folder = get_storage_folder_path(StorageFolder.BACKUPS)
+    for filename in sorted(get_folder_files(backups_folder, revalidate=True)):
+        # Skips the temporary files of backups being saved.
+        if not re.fullmatch(r"backup(\d+)\.\w+", filename):
+            continue
+        try:
+            backups.append(load_file(os.path.join(backups_folder, filename)))
+        except FileNotFoundError:
+            note_file_removed(os.path.join(backups_folder, filename))
+    return backups
+
+def append_history_data(entry: dict) -> bool:
+    """Appends an entry to the backup history, without rewriting the whole history."""
+    try:
+        if uses_sqlite_storage():
+            get_sqlite_storage().append_history(entry)
+            return True
+
+        get_history_log().append(entry)
+        return True
+    except Exception as e:
+        error(f"Error adding a backup history entry: {e}", "append_history_data Error")
+        return False
+
+def query_history_data(backup_id: Optional[int] = None, limit: Optional[int] = None) -> list[dict]:
+    """Returns the history entries of the passed backup (or of every backup), the most recent `limit` entries if passed."""
+    if uses_sqlite_storage():
+        return get_sqlite_storage().query_history(backup_id=backup_id, limit=limit)
+
+    matches = (lambda entry: entry.get("backup_id") == backup_id) if backup_id is not None else None
+    return get_history_log().query(matches, limit)
+
+def rotate_history_data(select, archive) -> int:
+    """
+    Moves the history entries rejected by `select` out of the backup history, passing them to `archive` first.
+    - `select` is called with every entry, oldest first, and returns whether to keep each of them.
+    - Entries added meanwhile are kept.
+    Returns the amount of moved entries.
+    """
+    if uses_sqlite_storage():
+        rows = get_sqlite_storage().query_history_rows()
+        decisions = select([entry for _, entry in rows])
+
+        rejected_rows = [row for row, is_kept in zip(rows, decisions) if not is_kept]
+        if rejected_rows:
+            archive([entry for _, entry in rejected_rows])
+            get_sqlite_storage().remove_history_entries([entry_id for entry_id, _ in rejected_rows])
+        return len(rejected_rows)
+
+    # The entries are selected from the same snapshot of the log the compaction rewrites, so the decisions can't
+    # land on other entries if the log is replaced meanwhile, and entries appended meanwhile are kept.
+    return get_history_log().compact(archive=archive, select=select)
+
+# ------------------------------------------------------------------------------------ #
+
 def load_or_create_data(filename: str, default_data: dict, folder: Optional[StorageFolder] = StorageFolder.UNDEFINED, file_type: Optional[FileType] = None) -> dict:
     """Loads data from a file or creates it with default data if it doesn't exist."""
     data = load_data(filename, folder, silent=True)
@@ -210,7 +635,11 @@ if enviroment_data.get("FileStructureCompatibilityVersion", 0) != FILE_STRUCTURE
         exit()
 
     else:
+        close_sqlite_storage()
+        close_environment_store()
+        _history_log = None
         shutil.rmtree(get_app_data_path())
+        forget_storage_paths()
         
         enviroment_data = {
             "DO_NOT_CHANGE_THIS_FILE_MANUALLY": 0,
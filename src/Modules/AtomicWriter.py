@@ -0,0 +1,126 @@
+# Writes stored files atomically, so a crash (or another process reading meanwhile) never sees a partially
+# written file, and coalesces concurrent writes of the same file into as few disk writes as possible.
+# Author: https://github.com/matkeg
+# Date: October 19th 2026
+
+import os, time, threading
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Optional
+
+from .FileLock import FileLock
+
+# ------------------------------------------------------------------------------------ #
+
+def writeFileAtomically(file_path: str, content: bytes):
+    """
+    Writes the content into a temporary file next to the target, flushes it to the disk and swaps it with the target.
+    - The temporary file is unique to the process and thread, so concurrent writers don't write into the same one.
+    - Replacing a file another process has open fails on Windows, so the swap is retried for a short while.
+    """
+    temporary_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temporary_path, "wb") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+
+        for attempt in range(10):
+            try:
+                os.replace(temporary_path, file_path)
+                break
+            except PermissionError:
+                if attempt == 9:
+                    raise
+                time.sleep(0.05 * (attempt + 1))
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+    # The rename itself is only durable once the folder is flushed as well, which Windows doesn't allow.
+    if os.name != "nt":
+        folder_descriptor = os.open(os.path.dirname(file_path) or ".", os.O_RDONLY)
+        try:
+            os.fsync(folder_descriptor)
+        finally:
+            os.close(folder_descriptor)
+
+# ------------------------------------------------------------------------------------ #
+
+@dataclass
+class PendingWrite:
+    condition: threading.Condition = field(default_factory=threading.Condition)
+    content: Optional[bytes] = None
+
+    # Each write request gets the next generation, a request is done once a generation at least as new is written.
+    generation: int = 0
+    written_generation: int = 0
+    is_writing: bool = False
+
+class AtomicWriter:
+    """
+    Writes files atomically while holding their file locks, coalescing concurrent writes of the same file.
+    While a file is being written, further writes of it only replace the pending content. The next write then
+    stores the newest content on behalf of every request that queued up meanwhile, which each return once it's
+    on disk, so a burst of writes costs about two disk writes instead of one each.
+    - Locks are always taken in the order file lock, then condition, and the condition is never waited on while
+      holding the file lock, so a caller already holding the file lock (such as edit_data) writes the file itself.
+    """
+    pending: dict[str, PendingWrite] = {}
+    lock = threading.Lock()
+
+    @classmethod
+    def write(cls, file_path: str, content: bytes, file_lock: Optional[FileLock] = None):
+        with cls.lock:
+            state = cls.pending.setdefault(file_path, PendingWrite())
+
+        with state.condition:
+            state.generation += 1
+            generation = state.generation
+            state.content = content
+
+            # The writer might be waiting for the file lock the caller holds, so waiting for it would never end.
+            if file_lock is not None and file_lock.isOwned():
+                state.condition.release()
+                written = False
+                try:
+                    writeFileAtomically(file_path, content)
+                    written = True
+                finally:
+                    state.condition.acquire()
+                    if written:
+                        cls.markWritten(state, generation)
+                    state.condition.notify_all()
+                return
+
+            while state.written_generation < generation:
+                if state.is_writing:
+                    state.condition.wait()
+                    continue
+
+                state.is_writing = True
+                writing_generation = None
+
+                state.condition.release()
+                try:
+                    with file_lock if file_lock is not None else nullcontext():
+                        # The newest content is only taken once the file lock is held, as a caller holding the
+                        # lock meanwhile might have written newer content already, which mustn't be overwritten.
+                        with state.condition:
+                            content, newest_generation = state.content, state.generation
+                        if state.written_generation < newest_generation:
+                            writeFileAtomically(file_path, content)
+                        writing_generation = newest_generation
+                finally:
+                    state.condition.acquire()
+                    state.is_writing = False
+                    if writing_generation is not None:
+                        cls.markWritten(state, writing_generation)
+                    state.condition.notify_all()
+
+    @staticmethod
+    def markWritten(state: PendingWrite, generation: int):
+        """Records that the content of the generation is on disk, the condition has to be held."""
+        state.written_generation = max(state.written_generation, generation)
+        if state.written_generation == state.generation:
+            state.content = None
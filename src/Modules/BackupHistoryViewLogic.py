@@ -4,6 +4,7 @@
 
 import os
 import json
+import threading
 
 from typing import Optional, List
 from PyQt5.QtWidgets import *
@@ -12,15 +13,18 @@ from PyQt5.QtCore import QThread, pyqtSignal, Qt
 from concurrent.futures import ThreadPoolExecutor
 
 
+from ..Features.fetcher import getFFlag
 from .BackupLogic import *
-from .AppDataLogic import load_data, save_data, StorageFolder, FileType, get_storage_folder_path
+from .AppDataLogic import load_data, save_data, StorageFolder, FileType, get_storage_folder_path, append_history_data, query_history_data
+from .IoTelemetry import getTelemetryProperties
+from .HistoryRetention import getHistoryArchive
 from .Utils import error, warn
 from .QtUtils import *
 
 # ------------------------------------------------------------------------------------ #
 
 def saveBackupHistory(history: List[BackupHistoryData]) -> bool:
-    """Saves the backup history to a JSON file."""
+    """Saves the backup history, replacing every logged entry."""
     try:
         history_data = [entry.to_dict() for entry in history]
         return save_data("backup_history", history_data, StorageFolder.LOGS, FileType.JSON)
@@ -28,20 +32,71 @@ def saveBackupHistory(history: List[BackupHistoryData]) -> bool:
         error(f"Error saving backup history: {e}", "saveBackupHistory Error")
         return False
 
-def loadBackupHistory() -> List[BackupHistoryData]:
-    """Loads the backup history from a JSON file."""
+def loadBackupHistory(backup_id: Optional[int] = None, limit: Optional[int] = None) -> List[BackupHistoryData]:
+    """
+    Loads the backup history from the storage.
+    - Passing a backup id only loads the entries of that backup, and a limit only the most recent entries.
+    """
     try:
-        history_data = load_data("backup_history", StorageFolder.LOGS, silent=True) or []
+        if backup_id is None and limit is None:
+            history_data = load_data("backup_history", StorageFolder.LOGS, silent=True) or []
+        else:
+            history_data = query_history_data(backup_id, limit)
         return [BackupHistoryData.from_dict(entry) for entry in history_data]
     except Exception as e:
         error(f"Error loading backup history: {e}", "loadBackupHistory Error")
         return []
 
+def loadRecentBackupHistory(backup_ids: list[int]) -> List[BackupHistoryData]:
+    """
+    Loads the history which estimates and capacity plans are made from, through bounded queries rather than the whole history.
+    - The most recent `HistoryRecentEntries` entries cover the samples of each device and the growth of the backups.
+    - The last runs of each passed backup are added, in case they're older than the most recent entries.
+    """
+    history = loadBackupHistory(limit=getFFlag("HistoryRecentEntries") or 1000)
+    sample_count = getFFlag("BackupPredictorSampleCount") or 10
+
+    # Entries don't have ids, but a backup can't have run twice in the same second.
+    loaded_runs = {(entry.backup_id, entry.get_unix_time()) for entry in history}
+    for backup_id in backup_ids:
+        for entry in loadBackupHistory(backup_id, sample_count):
+            if (entry.backup_id, entry.get_unix_time()) not in loaded_runs:
+                loaded_runs.add((entry.backup_id, entry.get_unix_time()))
+                history.append(entry)
+
+    return history
+
+class RecentBackupHistoryWorker(QThread):
+    """Worker thread for loading the recent backup history without blocking the GUI thread, see `loadRecentBackupHistory`."""
+
+    def __init__(self, backup_ids: list[int]):
+        super().__init__()
+        self.backup_ids = backup_ids
+        self.history: List[BackupHistoryData] = []
+
+    def run(self):
+        """Main method that runs in the thread."""
+        self.history = loadRecentBackupHistory(self.backup_ids)
+
+def loadArchivedBackupHistory(backup_id: Optional[int] = None, since: Optional[int] = None, until: Optional[int] = None) -> List[BackupHistoryData]:
+    """
+    Loads the entries rotated out of the backup history into the archive, such as for audits.
+    - Passing a backup id only loads the entries of that backup, and the times (in seconds since epoch) limit their range.
+    """
+    try:
+        matches = (lambda entry: entry.get("backup_id") == backup_id) if backup_id is not None else None
+        return [BackupHistoryData.from_dict(entry) for entry in getHistoryArchive().iterate(since, until, matches)]
+    except Exception as e:
+        error(f"Error loading archived backup history: {e}", "loadArchivedBackupHistory Error")
+        return []
+
+# Entries can be added from background threads, such as the continuous backup runners.
+history_lock = threading.Lock()
+
 def addBackupHistoryEntry(entry: BackupHistoryData) -> bool:
     """Adds a new entry to the backup history."""
-    history = loadBackupHistory()
-    history.append(entry)
-    return saveBackupHistory(history)
+    with history_lock:
+        return append_history_data(entry.to_dict())
 
 def clearBackupHistory() -> bool:
     """Clears the backup history."""
@@ -50,11 +105,15 @@ def clearBackupHistory() -> bool:
 
 # ------------------------------------------------------------------------------------ #
 
-def populateBackupHistoryView(mainWindow: QMainWindow, tree_widget: QTreeWidget):
-    """Populates the QTreeWidget with backup history data."""
+def populateBackupHistoryView(mainWindow: QMainWindow, tree_widget: QTreeWidget, include_archived: bool = False):
+    """
+    Populates the QTreeWidget with backup history data.
+    - Entries rotated into the archive are only shown when `include_archived` is set, they are older than the rest, so they come first.
+    """
     tree_widget.clear()
+    archived_history = loadArchivedBackupHistory() if include_archived else []
     history = loadBackupHistory()
-    for entry in history:
+    for entry in archived_history + history:
         item = QTreeWidgetItem([
             entry.backup_name,
             entry.backup_time.toString('M/d/yyyy h:mm AP'),
@@ -78,11 +137,22 @@ def populateBackupHistoryView(mainWindow: QMainWindow, tree_widget: QTreeWidget)
 
         tree_widget.addTopLevelItem(item)
 
-    count = tree_widget.topLevelItemCount()
+    # Archived entries are greyed out, as they only remain for audits.
+    for index in range(len(archived_history)):
+        item = tree_widget.topLevelItem(index)
+        for column in range(item.columnCount()):
+            item.setForeground(column, QColor(140, 140, 140))
+            item.setToolTip(column, "Archived by the history retention policy.")
+
+    count = len(history)
     if count == 1:
-        setUnsecureText(mainWindow, "historyCounter", "1 Logged Backup")
+        counter_text = "1 Logged Backup"
     else:
-        setUnsecureText(mainWindow, "historyCounter", f"{count} Logged Backups")
+        counter_text = f"{count} Logged Backups"
+
+    if include_archived:
+        counter_text += f", {len(archived_history)} Archived"
+    setUnsecureText(mainWindow, "historyCounter", counter_text)
             
 
 def displayBackupProperties(tree_widget: QTreeWidget, properties_widget: QTreeWidget, clear: bool = False):
@@ -96,7 +166,10 @@ def displayBackupProperties(tree_widget: QTreeWidget, properties_widget: QTreeWi
             ("Destination Path", "-"),
             ("Date and Time", "-"),
             ("Operation Group", "-"),
-            ("Operation Result", "-")
+            ("Operation Result", "-"),
+            ("Copied Data", "-"),
+            ("Duration", "-"),
+            *getTelemetryProperties(None)
         ]
     else:
         selected_items = tree_widget.selectedItems()
@@ -112,7 +185,12 @@ def displayBackupProperties(tree_widget: QTreeWidget, properties_widget: QTreeWi
             ("Destination Path", entry.destination_folder),
             ("Date and Time", entry.backup_time.toString('M/d/yyyy h:mm AP')),
             ("Operation Group", BackupOperationGroup.represent(entry.operation_group)),
-            ("Operation Result", BackupOperationResult.represent(entry.operation_result))
+            ("Operation Result", BackupOperationResult.represent(entry.operation_result)),
+            ("Copied Data", 
+                f"{formatStorageSize(entry.copied_bytes)} ({entry.copied_files} files)" 
+                if entry.copied_bytes is not None else "-"),
+            ("Duration", formatDuration(entry.duration) if entry.duration is not None else "-"),
+            *getTelemetryProperties(entry.telemetry)
         ]
 
     for prop, value in properties:
@@ -34,6 +34,7 @@ class BackupTriggerType():
     STARTUP = 1
     SCHEDULED = 2
     USER_LOGON = 3
+    CONTINUOUS = 4
 
     @staticmethod
     def represent(value) -> str:
@@ -41,7 +42,8 @@ class BackupTriggerType():
             0: "Never",
             1: "Startup",
             2: "Scheduled",
-            3: "User Logon"
+            3: "User Logon",
+            4: "Continuous"
         }
         return values.get(value, "-")
 
@@ -324,6 +326,7 @@ class BackupOperationGroup:
     STARTUP = 1
     LOGON = 2
     ALONE = 3
+    CONTINUOUS = 4
 
     @staticmethod
     def represent(value) -> str:
@@ -331,7 +334,8 @@ class BackupOperationGroup:
             0: "Unknown",
             1: "Startup",
             2: "Logon",
-            3: "No"
+            3: "No",
+            4: "Continuous"
         }
         return values.get(value, "-")
 
@@ -388,10 +392,13 @@ class BackupHistoryData:
         backup_name: str,
         origin_folder: str,
         destination_folder: str,
-        backup_time: QDateTime,
+        backup_time: QDateTime | int,
         operation_group: BackupOperationGroup,
         operation_result: BackupOperationResult,
-
+        copied_bytes: Optional[int] = None,
+        copied_files: Optional[int] = None,
+        duration: Optional[float] = None,
+        telemetry: Optional[dict] = None,
     ):
         self.backup_id = backup_id
         self.backup_name = backup_name
@@ -401,6 +408,33 @@ class BackupHistoryData:
         self.operation_group = operation_group
         self.operation_result = operation_result
 
+        # Describes the amount of copied data and how long the backup took (in seconds), 
+        # these are None for backups logged before they were recorded.
+        self.copied_bytes = copied_bytes
+        self.copied_files = copied_files
+        self.duration = duration
+
+        # Summary of the disk I/O sampled during the run, see IoTelemetrySampler.summarize.
+        self.telemetry = telemetry
+
+    # Loaded entries keep the backup time as seconds since epoch, and only create its QDateTime once it's
+    # displayed, which would otherwise take a large part of loading a long history.
+    @property
+    def backup_time(self) -> QDateTime:
+        if not isinstance(self._backup_time, QDateTime):
+            self._backup_time = QDateTime.fromSecsSinceEpoch(self._backup_time)
+        return self._backup_time
+
+    @backup_time.setter
+    def backup_time(self, value: QDateTime | int):
+        self._backup_time = value
+
+    def get_unix_time(self) -> int:
+        """Returns the backup time in seconds since epoch, without creating its QDateTime."""
+        if isinstance(self._backup_time, QDateTime):
+            return self._backup_time.toSecsSinceEpoch()
+        return self._backup_time
+
     def to_dict(self) -> dict:
         """Convert the backup history data to a JSON-serializable dictionary."""
         return {
@@ -408,9 +442,13 @@ class BackupHistoryData:
             "backup_name": self.backup_name,
             "origin_folder": self.origin_folder,
             "destination_folder": self.destination_folder,
-            "backup_time": self.backup_time.toSecsSinceEpoch(),
+            "backup_time": self.get_unix_time(),
             "operation_group": self.operation_group,
-            "operation_result": self.operation_result
+            "operation_result": self.operation_result,
+            "copied_bytes": self.copied_bytes,
+            "copied_files": self.copied_files,
+            "duration": self.duration,
+            "telemetry": self.telemetry
         }
     
     @classmethod
@@ -421,9 +459,13 @@ class BackupHistoryData:
             backup_name = data["backup_name"],
             origin_folder = data["origin_folder"],
             destination_folder = data["destination_folder"],
-            backup_time = QDateTime.fromSecsSinceEpoch(data["backup_time"]),
+            backup_time = data["backup_time"],
             operation_group = data["operation_group"],
-            operation_result = data["operation_result"]
+            operation_result = data["operation_result"],
+            copied_bytes = data.get("copied_bytes"),
+            copied_files = data.get("copied_files"),
+            duration = data.get("duration"),
+            telemetry = data.get("telemetry")
         )
 
 
@@ -432,12 +474,8 @@ class BackupHistoryData:
 def remove_backup_data(backup_id: int):
     """Removes a backup schedule data file."""
     try:
-        file_path = find_file_path(f"backup{backup_id}", StorageFolder.BACKUPS)
-
-        if file_path and os.path.exists(file_path):
-            os.remove(file_path)
-            return True
-        return False
+        # Goes through the AppData API, as the backup might be stored in the SQLite storage rather than a file.
+        return remove_data(f"backup{backup_id}", StorageFolder.BACKUPS)
     
     except Exception as e:
         error(
@@ -448,15 +486,13 @@ def remove_backup_data(backup_id: int):
 def find_backup_data(backup_id: int) -> BackupScheduleData:
     """Finds and returns a backup schedule data file."""
     try:
-        file_path = find_file_path(f"backup_{backup_id}", StorageFolder.BACKUPS)
+        backup_data = load_data(f"backup{backup_id}", StorageFolder.BACKUPS, silent=True)
 
-        if not os.path.exists(file_path):
+        if backup_data is None:
             error(f"Backup data for ID: {backup_id} does not exist.", "find_backup_data Error")
             return None
 
-        with open(file_path, 'r', encoding='utf-8') as f:
-            backup_data = json.load(f)
-            return BackupScheduleData.from_dict(backup_data)
+        return BackupScheduleData.from_dict(backup_data)
     
     except Exception as e:
         error(f"Error fetching backup data for ID: {backup_id}.\n\n{e}", "find_backup_data Error")
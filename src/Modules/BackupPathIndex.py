@@ -0,0 +1,118 @@
+# Indexes the origin and destination folders of the registered backups in a trie split on path components,
+# answering which backups contain, are contained by, or equal a path without comparing it to every backup.
+# Author: https://github.com/matkeg
+# Date: October 19th 2026
+
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+
+from .BackupLogic import BackupScheduleData
+from .FileSystemUtils import PathResolver
+from .PartitionAnalyzer import FolderRole
+
+# ------------------------------------------------------------------------------------ #
+
+@dataclass
+class PathIndexEntry:
+    backup: BackupScheduleData
+    role: int
+
+@dataclass
+class PathTrieNode:
+    children: dict[str, "PathTrieNode"] = field(default_factory=dict)
+
+    # Backup folders which end at this node.
+    entries: list[PathIndexEntry] = field(default_factory=list)
+
+class BackupPathIndex:
+    """
+    A prefix trie over the resolved folders of a set of backups, each node being a single path component.
+    - Queries walk down the trie along the components of the queried path, which costs O(depth).
+    - Folders are resolved once when the index is built, queried paths once per query.
+    """
+
+    def __init__(self, backups: Optional[list[BackupScheduleData]] = None):
+        self.root = PathTrieNode()
+        for backup in backups or []:
+            self.addBackup(backup)
+
+    def addBackup(self, backup: BackupScheduleData):
+        for role, path in ((FolderRole.ORIGIN, backup.origin_folder), (FolderRole.DESTINATION, backup.destination_folder)):
+            node = self.root
+            for component in PathResolver.resolve(path):
+                node = node.children.setdefault(component, PathTrieNode())
+            node.entries.append(PathIndexEntry(backup, role))
+
+    def findNode(self, components: tuple[str, ...]) -> Optional[PathTrieNode]:
+        node = self.root
+        for component in components:
+            node = node.children.get(component)
+            if node is None:
+                return None
+        return node
+
+    # --------------------------------------------- #
+
+    def findEqual(self, path: str) -> list[PathIndexEntry]:
+        """Returns the backup folders which are the passed path."""
+        node = self.findNode(PathResolver.resolve(path))
+        return list(node.entries) if node is not None else []
+
+    def findContaining(self, path: str) -> list[PathIndexEntry]:
+        """Returns the backup folders which the passed path is located inside of, the closest folder being last."""
+        entries = []
+        node = self.root
+        for component in PathResolver.resolve(path):
+            entries.extend(node.entries)
+            node = node.children.get(component)
+            if node is None:
+                break
+        return entries
+
+    def findContainedBy(self, path: str) -> list[PathIndexEntry]:
+        """Returns the backup folders which are located inside of the passed path."""
+        node = self.findNode(PathResolver.resolve(path))
+        if node is None:
+            return []
+
+        entries = []
+        pending_nodes = list(node.children.values())
+        while pending_nodes:
+            node = pending_nodes.pop()
+            entries.extend(node.entries)
+            pending_nodes.extend(node.children.values())
+        return entries
+
+    def findOverlapping(self, path: str) -> list[PathIndexEntry]:
+        """Returns the backup folders which are, contain, or are contained by the passed path."""
+        return self.findContaining(path) + self.findEqual(path) + self.findContainedBy(path)
+
+    def findBackupsSharingOrigin(self, backup: BackupScheduleData) -> list[BackupScheduleData]:
+        """
+        Returns the other backups whose origin is, contains, or is contained by the origin of the passed backup.
+        Such backups read the same files, so running them as a group lets the files be read once.
+        """
+        # Backups which aren't registered yet have no id, so they're told apart by their identity.
+        backups = {}
+        for entry in self.findOverlapping(backup.origin_folder):
+            if entry.role == FolderRole.ORIGIN and entry.backup is not backup:
+                backups[id(entry.backup)] = entry.backup
+        return list(backups.values())
+
+# ------------------------------------------------------------------------------------ #
+
+class BackupPathIndexCache:
+    """Keeps the index of the registered backups, rebuilding it only when the backups' folders change."""
+    index: Optional[BackupPathIndex] = None
+    signature = None
+    lock = threading.Lock()
+
+    @classmethod
+    def get(cls, backups: list[BackupScheduleData]) -> BackupPathIndex:
+        signature = tuple((backup.backup_id, backup.origin_folder, backup.destination_folder) for backup in backups)
+
+        with cls.lock:
+            if cls.index is None or cls.signature != signature:
+                cls.index, cls.signature = BackupPathIndex(backups), signature
+            return cls.index
@@ -0,0 +1,222 @@
+# Predicts how long backups will take from their past runs, and finds scheduled backups whose runs would overlap.
+# Author: https://github.com/matkeg
+# Date: October 19th 2026
+
+import os, time, statistics
+from dataclasses import dataclass
+from typing import Optional
+
+from ..Features.fetcher import getFFlag
+from .BackupLogic import (
+    BackupScheduleData, BackupHistoryData, BackupOperationResult,
+    BackupTriggerType, RecurrenceType, RecurrenceStepUnit
+)
+
+# ------------------------------------------------------------------------------------ #
+
+class EstimateSource:
+    """Specifies which past runs an estimate is based on."""
+    BACKUP_HISTORY = 0
+    DEVICE_HISTORY = 1
+
+    @staticmethod
+    def represent(value) -> str:
+        values = {
+            0: "Past runs of this backup",
+            1: "Past runs to the same device"
+        }
+        return values.get(value, "-")
+
+@dataclass
+class BackupEstimate:
+    duration: float = 0.0
+    expected_bytes: int = 0
+    throughput: float = 0.0
+    source: int = EstimateSource.BACKUP_HISTORY
+    sample_count: int = 0
+
+# ------------------------------------------------------------------------------------ #
+
+def getDeviceKey(path: str, device_keys: Optional[dict[str, str]] = None) -> str:
+    """
+    Returns a key identifying the storage device of the passed path, its drive letter or mount point.
+    - The path doesn't have to exist, the closest existing mount point above it is used.
+    - Finding the mount point takes a syscall per parent folder, so callers resolving the same few paths
+      (such as the destinations of a whole history) pass a dictionary, which memoizes the keys by path.
+    """
+    if device_keys is not None:
+        device_key = device_keys.get(path)
+        if device_key is None:
+            device_key = device_keys[path] = getDeviceKey(path)
+        return device_key
+
+    path = os.path.abspath(path)
+
+    drive = os.path.splitdrive(path)[0]
+    if drive:
+        return drive.upper()
+
+    while not os.path.ismount(path):
+        parent_path = os.path.dirname(path)
+        if parent_path == path:
+            break
+        path = parent_path
+
+    return path
+
+def isUsableSample(entry: BackupHistoryData) -> bool:
+    """Checks whether a history entry recorded enough about its run to be used for predictions."""
+    return (
+        entry.operation_result == BackupOperationResult.SUCCESS and
+        entry.copied_bytes is not None and
+        entry.duration is not None and entry.duration > 0
+    )
+
+class HistorySamples:
+    """
+    Holds the usable entries of a history, bucketed by their backup and by their destination device.
+    The history is only filtered and sorted once, however many backups are estimated from it.
+    """
+
+    def __init__(self, history: list[BackupHistoryData]):
+        self.by_backup: dict[int, list[BackupHistoryData]] = {}
+        self.by_device: dict[str, list[BackupHistoryData]] = {}
+        self.device_keys: dict[str, str] = {}
+
+        for entry in sorted((entry for entry in history if isUsableSample(entry)), key=lambda entry: entry.get_unix_time()):
+            self.by_backup.setdefault(entry.backup_id, []).append(entry)
+            self.by_device.setdefault(getDeviceKey(entry.destination_folder, self.device_keys), []).append(entry)
+
+    def getRecentSamples(self, backup_id: Optional[int] = None, device_key: Optional[str] = None) -> list[BackupHistoryData]:
+        """Returns the most recent usable entries of a backup, or of every backup targeting a device."""
+        samples = self.by_backup.get(backup_id, []) if backup_id is not None else self.by_device.get(device_key, [])
+        return samples[-(getFFlag("BackupPredictorSampleCount") or 10):]
+
+# ------------------------------------------------------------------------------------ #
+
+def estimateBackupDuration(
+        backup: BackupScheduleData, planned_bytes: Optional[int] = None,
+        history: Optional[list[BackupHistoryData]] = None, samples: Optional[HistorySamples] = None
+    ) -> Optional[BackupEstimate]:
+    """
+    Estimates how long the next run of the passed backup will take, returns None if there's no data to go off.
+    - Past runs of the backup itself are preferred, since they also tell how much data a run usually copies.
+    - Otherwise, the throughput of past runs to the same destination device is used together with the `planned_bytes`,
+      which should be the size of the origin folder, as a first run copies all of it.
+    - Estimating several backups from the same history should share its bucketed `samples`, built once from the history.
+    """
+    if samples is None:
+        if history is None:
+            from .BackupHistoryViewLogic import loadBackupHistory
+            history = loadBackupHistory()
+        samples = HistorySamples(history)
+
+    recent_samples = samples.getRecentSamples(backup_id=backup.backup_id) if backup.backup_id is not None else []
+    source = EstimateSource.BACKUP_HISTORY
+
+    if recent_samples:
+        expected_bytes = int(statistics.median(entry.copied_bytes for entry in recent_samples))
+    else:
+        recent_samples = samples.getRecentSamples(device_key=getDeviceKey(backup.destination_folder, samples.device_keys))
+        source = EstimateSource.DEVICE_HISTORY
+        expected_bytes = planned_bytes
+
+    if not recent_samples or expected_bytes is None:
+        return None
+
+    # Runs are weighted by their size, small runs are mostly overhead and would underestimate the throughput.
+    throughput = sum(entry.copied_bytes for entry in recent_samples) / sum(entry.duration for entry in recent_samples)
+    if throughput <= 0:
+        return None
+
+    return BackupEstimate(expected_bytes / throughput, expected_bytes, throughput, source, len(recent_samples))
+
+# --- OVERLAPPING SCHEDULES ---------------------------------------------------------- #
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+def getScheduledWindow(backup: BackupScheduleData, estimate: Optional[BackupEstimate]) -> Optional[tuple[int, int]]:
+    """
+    Returns the start and end of a scheduled backup's run as Unix timestamps, or None if it isn't scheduled.
+    Backups without an estimate are assumed to take the minimum window length.
+    """
+    if backup.initiation_type != BackupTriggerType.SCHEDULED or backup.start_time is None:
+        return None
+
+    start = backup.start_time.get_unix_time()
+    if start == 0:
+        return None
+
+    minimum_length = (getFFlag("BackupOverlapMinimumMinutes") or 15) * 60
+    length = max(minimum_length, int(estimate.duration) if estimate is not None else 0)
+    return start, start + length
+
+def getWeekDays(backup: BackupScheduleData) -> Optional[set[int]]:
+    """Returns the weekdays (Monday being 0) a recurring backup runs on, None if it runs on any day."""
+    if backup.recurrence_type != RecurrenceType.RECURRING or backup.recurrence_step_unit != RecurrenceStepUnit.WEEKS:
+        return None
+
+    days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+    return {days.index(day) for day in backup.weekly_init_days} or None
+
+def doWindowsOverlap(backup: BackupScheduleData, window: tuple[int, int], other_backup: BackupScheduleData, other_window: tuple[int, int]) -> bool:
+    """
+    Checks whether the runs of two scheduled backups overlap.
+    - Two single backups are compared by their exact windows.
+    - Once either of them is recurring, their windows are compared by the time of day (on shared weekdays),
+      since the recurring backup will eventually run on the other's day.
+    """
+    if backup.recurrence_type == RecurrenceType.SINGLE and other_backup.recurrence_type == RecurrenceType.SINGLE:
+        return window[0] < other_window[1] and other_window[0] < window[1]
+
+    week_days, other_week_days = getWeekDays(backup), getWeekDays(other_backup)
+    if backup.recurrence_type == RecurrenceType.SINGLE:
+        week_days = {time.localtime(window[0]).tm_wday}
+    if other_backup.recurrence_type == RecurrenceType.SINGLE:
+        other_week_days = {time.localtime(other_window[0]).tm_wday}
+
+    if week_days is not None and other_week_days is not None and not week_days & other_week_days:
+        return False
+
+    def getTimeOfDay(timestamp: int) -> int:
+        local_time = time.localtime(timestamp)
+        return local_time.tm_hour * 3600 + local_time.tm_min * 60 + local_time.tm_sec
+
+    start, other_start = getTimeOfDay(window[0]), getTimeOfDay(other_window[0])
+    end, other_end = start + window[1] - window[0], other_start + other_window[1] - other_window[0]
+
+    # Windows can pass midnight, so they're also compared against the other window of the next day.
+    return any(
+        start < other_end + shift and other_start + shift < end
+        for shift in (-SECONDS_PER_DAY, 0, SECONDS_PER_DAY)
+    )
+
+def findOverlappingBackups(
+        backup: BackupScheduleData, backups: list[BackupScheduleData],
+        history: Optional[list[BackupHistoryData]] = None
+    ) -> list[tuple[BackupScheduleData, Optional[BackupEstimate]]]:
+    """Returns the other scheduled backups whose estimated runs overlap with the run of the passed backup."""
+    # Only scheduled backups have a window, the others aren't worth estimating.
+    if getScheduledWindow(backup, None) is None:
+        return []
+
+    if history is None:
+        from .BackupHistoryViewLogic import loadBackupHistory
+        history = loadBackupHistory()
+
+    samples = HistorySamples(history)
+    window = getScheduledWindow(backup, estimateBackupDuration(backup, samples=samples))
+
+    overlapping_backups = []
+    for other_backup in backups:
+        if other_backup.backup_id is not None and other_backup.backup_id == backup.backup_id:
+            continue
+        if getScheduledWindow(other_backup, None) is None:
+            continue
+
+        other_estimate = estimateBackupDuration(other_backup, samples=samples)
+        other_window = getScheduledWindow(other_backup, other_estimate)
+        if other_window is not None and doWindowsOverlap(backup, window, other_backup, other_window):
+            overlapping_backups.append((other_backup, other_estimate))
+
+    return overlapping_backups
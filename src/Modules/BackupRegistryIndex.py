@@ -0,0 +1,143 @@
+# Keeps the parsed entries of the backup registry in memory, reloading only the entries whose files changed,
+# and tells listeners which backups were added, updated or removed.
+# Author: https://github.com/matkeg
+# Date: October 19th 2026
+
+import os, re, json, time, threading
+from typing import Callable, Optional
+
+from .BackupLogic import BackupScheduleData
+from .AppDataLogic import StorageFolder, get_storage_folder_path, get_folder_files, uses_sqlite_storage, load_all_backup_data, load_file
+
+# Called with the ids of the added, updated and removed backups.
+RegistryChangeListener = Callable[[list[int], list[int], list[int]], None]
+
+# ------------------------------------------------------------------------------------ #
+
+class BackupRegistryIndex:
+    """
+    Holds the parsed entry of every registered backup, keyed by backup id.
+    - Each entry is stored with the modification time and size of its file, only entries whose file changed are parsed again.
+    - Backups are saved by replacing their files, which modifies the Backups folder, so the files are only checked
+      at all when the folder itself was modified since the last refresh.
+    - Listeners are called from whichever thread refreshed the index, GUI code has to pass the changes on through a signal.
+    """
+    backups: dict[int, BackupScheduleData] = {}
+    signatures: dict[int, object] = {}
+    folder_signature = None
+    is_loaded = False
+    lock = threading.RLock()
+
+    listeners: list[RegistryChangeListener] = []
+
+    @classmethod
+    def addListener(cls, listener: RegistryChangeListener):
+        if listener not in cls.listeners:
+            cls.listeners.append(listener)
+
+    @classmethod
+    def removeListener(cls, listener: RegistryChangeListener):
+        if listener in cls.listeners:
+            cls.listeners.remove(listener)
+
+    @classmethod
+    def getBackups(cls) -> list[BackupScheduleData]:
+        """Returns the indexed backups, sorted by their ids."""
+        with cls.lock:
+            return [cls.backups[backup_id] for backup_id in sorted(cls.backups)]
+
+    @classmethod
+    def getBackup(cls, backup_id: int) -> Optional[BackupScheduleData]:
+        with cls.lock:
+            return cls.backups.get(backup_id)
+
+    # --------------------------------------------- #
+
+    @classmethod
+    def scanFiles(cls) -> Optional[dict[int, tuple[object, Callable[[], dict]]]]:
+        """
+        Returns the signature of every stored backup along with a function loading its data,
+        or None if the Backups folder wasn't modified since the last refresh.
+        """
+        if uses_sqlite_storage():
+            # The database is queried as a whole, which is cheap, so the stored data itself is the signature.
+            entries = {}
+            for data in load_all_backup_data():
+                entries[data.get("backup_id")] = (json.dumps(data, sort_keys=True), lambda data=data: data)
+            return entries
+
+        folder_path = get_storage_folder_path(StorageFolder.BACKUPS)
+        modified_at = os.stat(folder_path).st_mtime_ns
+
+        # Folder modifications within the same tick of a coarse timestamp would go unnoticed, so those aren't trusted.
+        folder_signature = modified_at if time.time_ns() - modified_at > 2_000_000_000 else None
+        if folder_signature is not None and folder_signature == cls.folder_signature:
+            return None
+        cls.folder_signature = folder_signature
+
+        entries = {}
+        for filename in get_folder_files(folder_path, revalidate=True):
+            match = re.fullmatch(r"backup(\d+)\.\w+", filename)
+            if not match:
+                continue
+
+            file_path = os.path.join(folder_path, filename)
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                continue
+
+            entries[int(match.group(1))] = ((stat.st_mtime_ns, stat.st_size), lambda file_path=file_path: load_file(file_path))
+        return entries
+
+    @classmethod
+    def refresh(cls, full: Optional[bool] = False) -> tuple[list[int], list[int], list[int]]:
+        """
+        Reloads the entries which changed, and returns (and reports to the listeners) which backups were added, updated and removed.
+        A full refresh checks every file even if the Backups folder wasn't modified, such as after editing files by hand.
+        """
+        with cls.lock:
+            if full:
+                cls.folder_signature = None
+
+            entries = cls.scanFiles()
+            if entries is None:
+                return [], [], []
+
+            added, updated = [], []
+            for backup_id, (signature, loadData) in entries.items():
+                if cls.signatures.get(backup_id) == signature and backup_id in cls.backups:
+                    continue
+
+                try:
+                    backup = BackupScheduleData.from_dict(loadData())
+                except Exception as e:
+                    # The folder is checked again on the next refresh, so the entry is retried.
+                    print(f"Unable to load the registered backup {backup_id}: {e}")
+                    cls.folder_signature = None
+                    continue
+
+                (updated if backup_id in cls.backups else added).append(backup_id)
+                cls.backups[backup_id] = backup
+                cls.signatures[backup_id] = signature
+
+            removed = [backup_id for backup_id in cls.backups if backup_id not in entries]
+            for backup_id in removed:
+                del cls.backups[backup_id]
+                cls.signatures.pop(backup_id, None)
+
+            cls.is_loaded = True
+
+        if added or updated or removed:
+            for listener in list(cls.listeners):
+                listener(added, updated, removed)
+
+        return added, updated, removed
+
+    @classmethod
+    def invalidate(cls):
+        """Forgets every entry, the next refresh loads the whole registry again."""
+        with cls.lock:
+            cls.backups, cls.signatures = {}, {}
+            cls.folder_signature = None
+            cls.is_loaded = False
@@ -2,36 +2,91 @@
 # Author: https://github.com/matkeg
 # Date: January 12th 2025
 
-import os
-import json
-
 from typing import Optional, List
 from PyQt5.QtWidgets import *
-from PyQt5.QtGui import QIcon
-from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtGui import QIcon, QColor, QBrush
+from PyQt5.QtCore import QObject, QThread, QTimer, pyqtSignal
 from concurrent.futures import ThreadPoolExecutor
 
 
+from ..Features.fetcher import getFFlag
 from .BackupLogic import *
-from .AppDataLogic import load_data, StorageFolder, FileType, get_storage_folder_path
+from .AppDataLogic import load_data, FileType
+from .BackupRegistryIndex import BackupRegistryIndex
+from .ChangeJournal import ChangeJournalService
+from .ContinuousBackup import ContinuousBackupService
+from .BackupHistoryViewLogic import loadBackupHistory
+from .BackupPredictor import estimateBackupDuration
+from .FileSystemUtils import pruneFolderStatsCaches
+from .IoTelemetry import IoTelemetrySampler, TelemetryRole
+from .PartitionAnalyzer import PartitionReport, ConflictType, analyzePartitionConflicts, describeConflict
 from .Utils import error, warn
 from .QtUtils import *
 
 # ------------------------------------------------------------------------------------ #
 
 def getRegisteredBackups() -> List[BackupScheduleData]:
-    """Fetches the list of registered backups from the storage."""
-    backups = []
+    """Fetches the list of registered backups from the registry index, which only reloads the backups that changed."""
     try:
-        backups_folder = get_storage_folder_path(StorageFolder.BACKUPS)
-        for filename in os.listdir(backups_folder):
-            file_path = os.path.join(backups_folder, filename)
-            with open(file_path, 'r', encoding='utf-8') as f:
-                backup_data = json.load(f)
-                backups.append(BackupScheduleData.from_dict(backup_data))
+        BackupRegistryIndex.refresh()
     except Exception as e:
         error(f"Error fetching registered backups: {e}", "getRegisteredBackups Error")
-    return backups
+    return BackupRegistryIndex.getBackups()
+
+# ------------------------------------------------------------------------------------ #
+
+class BackupRegistryNotifier(QObject):
+    """
+    Passes the changes of the registry index, which can be refreshed from any thread,
+    on to the GUI thread which owns the backup registry view.
+    """
+    registry_changed = pyqtSignal(list, list, list)
+
+    def onRegistryChanged(self, added: list[int], updated: list[int], removed: list[int]):
+        self.registry_changed.emit(added, updated, removed)
+
+def setBackupTreeEntry(treeEntry: QTreeWidgetItem, entry: BackupScheduleData):
+    """Sets the text, data and icon of a backup registry view row."""
+    # Make the initiation type readable for the user.
+    initiation_at = "NEVER"
+    if entry.initiation_type == BackupTriggerType.STARTUP:
+        initiation_at = "STARTUP"
+    elif entry.initiation_type == BackupTriggerType.SCHEDULED:
+        initiation_at = "SCHEDULE"
+    elif entry.initiation_type == BackupTriggerType.USER_LOGON:
+        initiation_at = "LOGON"
+    elif entry.initiation_type == BackupTriggerType.CONTINUOUS:
+        initiation_at = "CONTINUOUS"
+
+    treeEntry.setText(0, entry.friendly_name)
+    treeEntry.setText(1, get_last_two_subfolders(entry.origin_folder))
+    treeEntry.setText(2, get_last_two_subfolders(entry.destination_folder))
+    treeEntry.setText(3, initiation_at)
+    treeEntry.setData(0, 32, entry)
+    treeEntry.setIcon(0, QIcon("src/Interface/Icons/Folders/linked.ico"))
+
+def syncBackupTreeView(treeWidget: QTreeWidget, backup_ids: list[int]):
+    """
+    Brings the rows of the passed backups in line with the registry index, adding, updating or removing them.
+    Rows of other backups aren't touched, so the selection and scroll position are kept.
+    """
+    existingEntries = {}
+    for index in range(treeWidget.topLevelItemCount()):
+        treeEntry = treeWidget.topLevelItem(index)
+        existingEntries[treeEntry.data(0, 32).backup_id] = treeEntry
+
+    for backup_id in backup_ids:
+        entry = BackupRegistryIndex.getBackup(backup_id)
+        treeEntry = existingEntries.get(backup_id)
+
+        if entry is None:
+            if treeEntry is not None:
+                treeWidget.takeTopLevelItem(treeWidget.indexOfTopLevelItem(treeEntry))
+            continue
+
+        if treeEntry is None:
+            treeEntry = QTreeWidgetItem(treeWidget)
+        setBackupTreeEntry(treeEntry, entry)
 
 # ------------------------------------------------------------------------------------ #
 
@@ -40,13 +95,23 @@ class BackupRegistryPopulationWorker(QThread):
     finished = pyqtSignal()
     status_update = pyqtSignal(str)
     backup_data = pyqtSignal(list)
+    conflict_report = pyqtSignal(object)
 
     def run(self):
         """Main method that runs in the thread."""
         self.status_update.emit("Fetching registered backups...")
         try:
+            # Changed backups reach the view through the registry index listener, the list is for the services.
             backups_data = getRegisteredBackups()
             self.backup_data.emit(backups_data)
+
+            # The analysis is cached, so it's only redone when the backups' folders or the mounts changed.
+            self.conflict_report.emit(analyzePartitionConflicts(backups_data))
+
+            # Folder analyses of folders which no longer belong to any backup are removed once they're old.
+            pruneFolderStatsCaches(
+                [entry.origin_folder for entry in backups_data] + [entry.destination_folder for entry in backups_data]
+            )
             self.finished.emit()
         except Exception as e:
             error(str(e), "Backup Registry Population Error")
@@ -54,13 +119,14 @@ class BackupRegistryPopulationWorker(QThread):
 
 def populateBackupRegistryView(mainWindow: QMainWindow, treeWidget: QTreeWidget):
     """
-    Populates the Backup Registry View by fetching and displaying backup data in a separate thread.
+    Populates the Backup Registry View by refreshing the registry index in a separate thread.
+    - The first population shows every registered backup, afterwards only the rows of changed backups are updated.
     """
-    
-    # Start updating the backup registry view by firstly clearing the treeWidget.
-    treeWidget.clear()
 
     def handleItemSelection():
+        # The live info of the previously selected backup is no longer refreshed.
+        treeWidget.liveInfoTimer.stop()
+
         selectedItems = treeWidget.selectedItems()
         selectedItem = selectedItems[0] if selectedItems else None
         if selectedItem is None:
@@ -92,38 +158,76 @@ def populateBackupRegistryView(mainWindow: QMainWindow, treeWidget: QTreeWidget)
                 initiation_at = "On a Schedule"
             elif associatedEntry.initiation_type == BackupTriggerType.USER_LOGON:
                 initiation_at = "At current user's Logon"
-            setUnsecureText(mainWindow, "InsightsBackupBasicInfo",
-                            f"""
-                            <html><head/><body><p><span style=" color:#a5a5a5;">Triggered On: </span>{initiation_at}<br/>
-                            <span style=" color:#a3a3a3;">Last Backup: </span>--/--/---- --:-- --</p></body></html> 
-                            """
-            )
+            elif associatedEntry.initiation_type == BackupTriggerType.CONTINUOUS:
+                initiation_at = "Continuously, on every change"
 
-    def updateTreeView(backups_data):
-        """Updates the tree view with the processed backup data."""
-        treeWidget.clear()
-        
-        for entry in backups_data:
-            # Make the initiation type readable for the user.
-            initiation_at = "NEVER"
-            if entry.initiation_type == BackupTriggerType.STARTUP:
-                initiation_at = "STARTUP"
-            elif entry.initiation_type == BackupTriggerType.SCHEDULED:
-                initiation_at = "SCHEDULE"
-            elif entry.initiation_type == BackupTriggerType.USER_LOGON:
-                initiation_at = "LOGON"
-
-            # Create the new tree entry
-            newTreeEntry = QTreeWidgetItem(
-                treeWidget, 
-                [
-                    entry.friendly_name, 
-                    get_last_two_subfolders(entry.origin_folder), 
-                    get_last_two_subfolders(entry.destination_folder), 
-                    initiation_at]
-            )
-            newTreeEntry.setData(0, 32, entry)
-            newTreeEntry.setIcon(0, QIcon("src/Interface/Icons/Folders/linked.ico"))
+            # Find the last run and estimate the next one from the backup history.
+            # Only the recent runs are loaded, the full history can hold many thousands of entries.
+            sample_count = getFFlag("BackupPredictorSampleCount") or 10
+            past_runs = loadBackupHistory(associatedEntry.backup_id, sample_count)
+
+            last_backup = "--/--/---- --:-- --"
+            if past_runs:
+                last_run = max(past_runs, key=lambda entry: entry.get_unix_time())
+                last_backup = last_run.backup_time.toString('M/d/yyyy h:mm AP')
+
+            # Backups which never ran are estimated from the recent runs to the same device.
+            estimated_duration = "Unknown"
+            estimate = estimateBackupDuration(associatedEntry, history=past_runs) or \
+                estimateBackupDuration(associatedEntry, history=loadBackupHistory(limit=getFFlag("HistoryRecentEntries") or 1000))
+            if estimate is not None:
+                estimated_duration = f"~{formatDuration(estimate.duration)}"
+
+            def setBasicInfo():
+                live_io = ""
+                sampler = IoTelemetrySampler.getActive(associatedEntry.backup_id)
+                sample = sampler.getLatest() if sampler is not None else None
+                if sample is not None:
+                    for role in (TelemetryRole.ORIGIN, TelemetryRole.DESTINATION):
+                        if role in sample.rates:
+                            live_io += f"""<br/><span style=" color:#a3a3a3;">{TelemetryRole.represent(role)}: </span>{sample.rates[role].describe()}"""
+
+                setUnsecureText(mainWindow, "InsightsBackupBasicInfo",
+                                f"""
+                                <html><head/><body><p><span style=" color:#a5a5a5;">Triggered On: </span>{initiation_at}<br/>
+                                <span style=" color:#a3a3a3;">Last Backup: </span>{last_backup}<br/>
+                                <span style=" color:#a3a3a3;">Next Run Takes: </span>{estimated_duration}{live_io}</p></body></html> 
+                                """
+                )
+
+                if sampler is None:
+                    treeWidget.liveInfoTimer.stop()
+
+            treeWidget.refreshLiveInfo = setBasicInfo
+            treeWidget.liveInfoTimer.start(int((getFFlag("IoTelemetryIntervalSeconds") or 1) * 1000))
+            setBasicInfo()
+
+    def updateServices(backups_data):
+        """Passes the registered backups on to the background services."""
+        # Journal the changes of every registered backup's origin folder.
+        ChangeJournalService.watchFolders([entry.origin_folder for entry in backups_data])
+        ContinuousBackupService.syncBackups(backups_data)
+
+    def updateConflicts(report: PartitionReport):
+        """Highlights the backups whose folders conflict, describing the conflicts in their tooltips."""
+        names = {}
+        for index in range(treeWidget.topLevelItemCount()):
+            entry: BackupScheduleData = treeWidget.topLevelItem(index).data(0, 32)
+            names[entry.backup_id] = entry.friendly_name
+
+        for index in range(treeWidget.topLevelItemCount()):
+            item = treeWidget.topLevelItem(index)
+            conflicts = report.getConflicts(item.data(0, 32).backup_id)
+
+            # Rows are kept between refreshes, so rows which no longer conflict are reset.
+            tooltip = "\n".join(describeConflict(conflict, names) for conflict in conflicts)
+            for column in range(item.columnCount()):
+                item.setToolTip(column, tooltip)
+                item.setBackground(column, QColor(255, 245, 210) if conflicts else QBrush())  # Light yellow color
+
+        if report.hasConflictType(ConflictType.SAME_PARTITION):
+            setLabelTextAdvanced(mainWindow, "infoText", textMode.JSON, "info_same_partition")
+            findObject(mainWindow, "infoLabel").show()
 
     # Currently not used.
     #def updateStatus(message: str):
@@ -136,15 +240,31 @@ def populateBackupRegistryView(mainWindow: QMainWindow, treeWidget: QTreeWidget)
         #findObject(mainWindow, "statusLabel").hide()
         worker.deleteLater()
 
+    # The selection handling and the index listener are only set up once per tree,
+    # since the view is populated again after every edit.
+    if getattr(treeWidget, "registryNotifier", None) is None:
+        # Running backups show their live I/O, refreshed by a single timer for as long as they stay selected and running.
+        treeWidget.liveInfoTimer = QTimer(treeWidget)
+        treeWidget.liveInfoTimer.timeout.connect(lambda: treeWidget.refreshLiveInfo())
+        treeWidget.itemSelectionChanged.connect(handleItemSelection)
+
+        # Backups changed by another window (or process) are shown on the next refresh of the index, wherever it's refreshed.
+        treeWidget.registryNotifier = BackupRegistryNotifier(treeWidget)
+        treeWidget.registryNotifier.registry_changed.connect(
+            lambda added, updated, removed: syncBackupTreeView(treeWidget, added + updated + removed)
+        )
+        BackupRegistryIndex.addListener(treeWidget.registryNotifier.onRegistryChanged)
+
+        # Backups indexed before the view existed are shown right away.
+        syncBackupTreeView(treeWidget, [entry.backup_id for entry in BackupRegistryIndex.getBackups()])
+
     # Create and set up the worker thread
     worker = BackupRegistryPopulationWorker()
     #worker.status_update.connect(updateStatus)
-    worker.backup_data.connect(updateTreeView)
+    worker.backup_data.connect(updateServices)
+    worker.conflict_report.connect(updateConflicts)
     worker.finished.connect(onPopulationFinished)
     
-    # Set up item selection handling
-    treeWidget.itemSelectionChanged.connect(handleItemSelection)
-    
     # Start the worker thread
     worker.start()
 
@@ -0,0 +1,189 @@
+# Plans the capacity of backup destinations, checking whether the backups targeting a device
+# fit into its free space, and projecting when the device fills up as backups keep growing.
+# Author: https://github.com/matkeg
+# Date: October 19th 2026
+
+import os, shutil, time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from ..Features.fetcher import getFFlag
+from .BackupLogic import BackupScheduleData, BackupHistoryData, BackupOperationGroup, BackupOperationResult
+from .BackupPredictor import getDeviceKey
+from .FileSystemUtils import peekFolderSummary, formatStorageSize
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+# ------------------------------------------------------------------------------------ #
+
+@dataclass
+class CapacityPlan:
+    """Describes the planned usage of a single destination device."""
+    device_key: str
+    total_bytes: int = 0
+    free_bytes: int = 0
+
+    # Space kept free on purpose, backups shouldn't fill the device to the last byte.
+    reserved_bytes: int = 0
+
+    # Bytes which still have to be copied, by backups which haven't completed their first run.
+    pending_bytes: int = 0
+
+    # Bytes the backups on the device grow by each day, since backups never delete files.
+    daily_growth: float = 0.0
+
+    # Backups which target the device, and the origins whose size isn't known yet.
+    backups: list[BackupScheduleData] = field(default_factory=list)
+    unknown_origins: list[str] = field(default_factory=list)
+
+    def getAvailableBytes(self) -> int:
+        """Returns the space left once the pending bytes are copied, can be negative."""
+        return self.free_bytes - self.reserved_bytes - self.pending_bytes
+
+    def fits(self) -> bool:
+        return self.getAvailableBytes() >= 0
+
+    def getDaysUntilFull(self) -> Optional[float]:
+        """Returns in how many days the device fills up, or None if the backups on it aren't growing."""
+        if not self.fits():
+            return 0.0
+        if self.daily_growth <= 0:
+            return None
+        return self.getAvailableBytes() / self.daily_growth
+
+    def describe(self) -> str:
+        """Returns a user-facing summary of the plan."""
+        days_until_full = self.getDaysUntilFull()
+        if days_until_full is None:
+            projection = "The backups on this device aren't growing yet."
+        elif days_until_full == 0:
+            projection = f"The device is {formatStorageSize(-self.getAvailableBytes())} short."
+        else:
+            projection = f"At {formatStorageSize(self.daily_growth)} per day, the device is full in {int(days_until_full)} days."
+
+        return (
+            f"Free space on {self.device_key}: {formatStorageSize(self.free_bytes)}\n"
+            f"Backups on this device: {len(self.backups)}\n"
+            f"Still to be copied: {formatStorageSize(self.pending_bytes)}\n"
+            f"Kept in reserve: {formatStorageSize(self.reserved_bytes)}\n\n"
+            f"{projection}"
+        )
+
+# ------------------------------------------------------------------------------------ #
+
+def getDeviceUsage(path: str) -> Optional[tuple[int, int, int]]:
+    """Returns the total, used and free bytes of the device of the passed path, the closest existing folder above it is used."""
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        parent_path = os.path.dirname(path)
+        if parent_path == path:
+            return None
+        path = parent_path
+
+    try:
+        return shutil.disk_usage(path)
+    except OSError as e:
+        print(f"Error reading the disk usage of {path}: {e}")
+        return None
+
+def hasCompletedRun(backup: BackupScheduleData, history: list[BackupHistoryData]) -> bool:
+    """
+    Checks whether the backup has run through before, meaning its destination already holds a copy of the origin.
+    Continuous backups only log full passes, which go through the whole origin even if a few files failed to copy,
+    so any of their logged passes counts.
+    """
+    return any(
+        entry.backup_id == backup.backup_id and (
+            entry.operation_result == BackupOperationResult.SUCCESS or
+            entry.operation_group == BackupOperationGroup.CONTINUOUS
+        )
+        for entry in history
+    )
+
+def getDailyGrowth(backup: BackupScheduleData, history: list[BackupHistoryData]) -> float:
+    """Returns how many bytes per day the backup copied during the last growth window, according to its history."""
+    window_days = getFFlag("CapacityGrowthWindowDays") or 30
+    window_start = time.time() - window_days * SECONDS_PER_DAY
+
+    runs = [
+        entry for entry in history
+        if entry.backup_id == backup.backup_id and entry.copied_bytes is not None and
+        entry.get_unix_time() >= window_start
+    ]
+    if not runs:
+        return 0.0
+
+    # A short history is spread over at least a day, so a single run isn't taken as a day's worth of growth.
+    first_run = min(entry.get_unix_time() for entry in runs)
+    observed_days = max(1.0, (time.time() - first_run) / SECONDS_PER_DAY)
+    return sum(entry.copied_bytes for entry in runs) / observed_days
+
+# ------------------------------------------------------------------------------------ #
+
+def planDeviceCapacity(
+        destination_folder: str, backups: list[BackupScheduleData], history: list[BackupHistoryData],
+        planned_bytes: Optional[dict[int, int]] = None
+    ) -> Optional[CapacityPlan]:
+    """
+    Plans the capacity of the device the passed destination folder is on, returns None if it can't be read.
+    - Only the passed backups targeting the same device are accounted for.
+    - Backups which never completed a run have to copy their whole origin, their size is taken from the `planned_bytes`
+      (keyed by backup id) or from the summary of the origin folder's last analysis. Note that hardlinked origin files are copied
+      as separate files, so the apparent size of the origin is used rather than its on-disk size.
+    - Backups which did complete a run only add their growth, their copies are already part of the used space.
+    """
+    disk_usage = getDeviceUsage(destination_folder)
+    if disk_usage is None:
+        return None
+
+    device_keys = {}
+    device_key = getDeviceKey(destination_folder, device_keys)
+    reserve_percent = getFFlag("CapacityReservePercent") or 5
+
+    plan = CapacityPlan(
+        device_key, disk_usage.total, disk_usage.free,
+        reserved_bytes=int(disk_usage.total * reserve_percent / 100)
+    )
+
+    for backup in backups:
+        if getDeviceKey(backup.destination_folder, device_keys) != device_key:
+            continue
+
+        plan.backups.append(backup)
+        plan.daily_growth += getDailyGrowth(backup, history)
+
+        if hasCompletedRun(backup, history):
+            continue
+
+        origin_size = (planned_bytes or {}).get(backup.backup_id)
+        if origin_size is None:
+            origin_stats = peekFolderSummary(backup.origin_folder)
+            origin_size = origin_stats.total_size if origin_stats is not None else None
+
+        if origin_size is None:
+            plan.unknown_origins.append(backup.origin_folder)
+            continue
+
+        # Files copied by an interrupted first run are already on the device.
+        destination_stats = peekFolderSummary(backup.destination_folder) if os.path.isdir(backup.destination_folder) else None
+        if destination_stats is not None:
+            origin_size = max(0, origin_size - destination_stats.total_size)
+
+        plan.pending_bytes += origin_size
+
+    return plan
+
+def checkRunCapacity(backup: BackupScheduleData, history: list[BackupHistoryData], planned_bytes: Optional[int] = None) -> tuple[bool, Optional[str]]:
+    """
+    Pre-flight check done before a backup runs, returns whether it fits into its destination and an explanation if it doesn't.
+    Unlike `planDeviceCapacity`, other backups aren't accounted for, since they aren't running at the moment.
+    """
+    plan = planDeviceCapacity(
+        backup.destination_folder, [backup], history,
+        {backup.backup_id: planned_bytes} if planned_bytes is not None else None
+    )
+
+    if plan is None or plan.fits():
+        return True, None
+
+    return False, plan.describe()
@@ -0,0 +1,540 @@
+# Keeps track of which directories have changed inside of watched folders, so that scans
+# and backups only have to revisit the changed parts of a folder instead of walking all of it.
+# Author: https://github.com/matkeg
+# Date: October 19th 2026
+
+import os, sys, ctypes, ctypes.util, errno, struct, select, threading, time, hashlib, uuid
+from typing import Optional, Callable
+
+from ..Features.fetcher import getFFlag
+from .AppDataLogic import save_data, load_data, StorageFolder, FileType
+
+# --- INOTIFY ------------------------------------------------------------------------ #
+
+# Constants taken from <sys/inotify.h>.
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_ISDIR = 0x40000000
+
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+    IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW
+)
+
+EVENT_HEADER = struct.Struct("iIII")
+
+class InotifyWatcher:
+    """
+    Recursively watches a folder through inotify (Linux only), in a separate thread.
+    - `on_change` is called with the path of every directory whose entries have changed,
+      and the name of the changed entry (or None if the directory itself has changed).
+    - `on_overflow` is called once events were lost, after which the reported changes are incomplete.
+    - `on_stopped` is called once the watcher has stopped, for any reason.
+    """
+
+    libc = None
+
+    def __init__(
+            self, root_path: str,
+            on_change: Callable[[str, Optional[str]], None],
+            on_overflow: Callable[[], None],
+            on_ready: Optional[Callable[[], None]] = None,
+            on_tick: Optional[Callable[[], None]] = None,
+            on_stopped: Optional[Callable[[], None]] = None
+        ):
+        self.root_path = os.path.normpath(root_path)
+        self.on_change = on_change
+        self.on_overflow = on_overflow
+        self.on_ready = on_ready
+        self.on_tick = on_tick
+        self.on_stopped = on_stopped
+
+        self.file_descriptor = None
+        self.watched_paths: dict[int, str] = {}
+        self.watch_descriptors: dict[str, int] = {}
+
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    @classmethod
+    def getLibc(cls):
+        if cls.libc is None:
+            cls.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            cls.libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+            cls.libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        return cls.libc
+
+    @classmethod
+    def isSupported(cls) -> bool:
+        """Returns whether inotify can be used on the current platform."""
+        if not sys.platform.startswith("linux"):
+            return False
+        try:
+            return hasattr(cls.getLibc(), "inotify_init1")
+        except OSError:
+            return False
+
+    # --------------------------------------------- #
+
+    def start(self):
+        """Starts watching the folder in a separate thread."""
+        self.file_descriptor = self.getLibc().inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.file_descriptor < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, name="ChangeJournalWatcher", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stops watching the folder, waiting for the watcher thread to finish."""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def isRunning(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    # --------------------------------------------- #
+
+    def addWatch(self, directory_path: str) -> bool:
+        """Adds a watch for a single directory, returns False if the directory can't be watched."""
+        watch_descriptor = self.getLibc().inotify_add_watch(
+            self.file_descriptor, os.fsencode(directory_path), WATCH_MASK
+        )
+
+        if watch_descriptor < 0:
+            error_number = ctypes.get_errno()
+
+            # Running out of watches means changes will go unnoticed, so there's no point in watching.
+            if error_number == errno.ENOSPC:
+                print(f"Unable to watch {directory_path}: the inotify watch limit was reached.")
+                self.on_overflow()
+                self.stop_event.set()
+            return False
+
+        self.watched_paths[watch_descriptor] = directory_path
+        self.watch_descriptors[directory_path] = watch_descriptor
+        return True
+
+    def addWatchesRecursively(self, directory_path: str, report_changes: Optional[bool] = False):
+        """
+        Watches the passed directory and all of its subdirectories.
+        - The watch of a directory is added before listing it, so no newly created subdirectory is missed.
+        """
+        pending_paths = [directory_path]
+
+        while pending_paths and not self.stop_event.is_set():
+            current_path = pending_paths.pop()
+            if not self.addWatch(current_path):
+                continue
+
+            if report_changes:
+                self.on_change(current_path, None)
+
+            try:
+                with os.scandir(current_path) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending_paths.append(entry.path)
+            except OSError as e:
+                print(f"Error accessing {current_path}: {e}")
+
+    def removeWatchesRecursively(self, directory_path: str):
+        """Removes the watches of the passed directory and all of its subdirectories."""
+        prefix = directory_path + os.sep
+
+        for watched_path in [path for path in self.watch_descriptors if path == directory_path or path.startswith(prefix)]:
+            watch_descriptor = self.watch_descriptors.pop(watched_path)
+            self.watched_paths.pop(watch_descriptor, None)
+            self.getLibc().inotify_rm_watch(self.file_descriptor, watch_descriptor)
+
+    # --------------------------------------------- #
+
+    def handleEvent(self, watch_descriptor: int, mask: int, name: Optional[str]):
+        if mask & IN_Q_OVERFLOW:
+            self.on_overflow()
+            return
+
+        directory_path = self.watched_paths.get(watch_descriptor)
+        if directory_path is None:
+            return
+
+        if mask & IN_IGNORED:
+            self.watched_paths.pop(watch_descriptor, None)
+            if self.watch_descriptors.get(directory_path) == watch_descriptor:
+                del self.watch_descriptors[directory_path]
+            return
+
+        self.on_change(directory_path, name)
+
+        if name is None or not (mask & IN_ISDIR):
+            return
+
+        entry_path = os.path.join(directory_path, name)
+
+        # Subdirectories moved away keep their watches, which would now report wrong paths.
+        if mask & IN_MOVED_FROM:
+            self.removeWatchesRecursively(entry_path)
+
+        # Whole new subtrees have to be watched, and are changed as a whole.
+        elif mask & (IN_CREATE | IN_MOVED_TO):
+            self.addWatchesRecursively(entry_path, report_changes=True)
+
+    def readEvents(self):
+        try:
+            buffer = os.read(self.file_descriptor, 64 * 1024)
+        except BlockingIOError:
+            return
+
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(buffer):
+            watch_descriptor, mask, _, name_length = EVENT_HEADER.unpack_from(buffer, offset)
+            offset += EVENT_HEADER.size
+
+            name = None
+            if name_length > 0:
+                name = os.fsdecode(buffer[offset:offset + name_length].rstrip(b"\0"))
+            offset += name_length
+
+            self.handleEvent(watch_descriptor, mask, name)
+
+    def run(self):
+        """Main method that runs in the thread."""
+        try:
+            self.addWatchesRecursively(self.root_path)
+            if self.on_ready is not None and not self.stop_event.is_set():
+                self.on_ready()
+
+            while not self.stop_event.is_set():
+                readable, _, _ = select.select([self.file_descriptor], [], [], 1.0)
+                if readable:
+                    self.readEvents()
+
+                if self.on_tick is not None:
+                    self.on_tick()
+
+        except Exception as e:
+            print(f"Error watching {self.root_path}: {e}")
+            self.on_overflow()
+
+        finally:
+            os.close(self.file_descriptor)
+            self.watched_paths.clear()
+            self.watch_descriptors.clear()
+
+            if self.on_stopped is not None:
+                self.on_stopped()
+
+# --- CHANGE JOURNAL ----------------------------------------------------------------- #
+
+# A journal lives for the duration of a watching session. Every recorded change increments the
+# journal's sequence, and each changed directory remembers the sequence of its latest change.
+# Consumers (such as the folder statistics cache or a backup run) keep a checkpoint, made out of
+# the session and the sequence they've last seen, and ask for the changes since that checkpoint.
+# If the session differs, or events were lost after the checkpoint, a full scan is required.
+
+CHANGE_JOURNAL_VERSION = 1
+
+class ChangeJournal:
+    """Persisted record of the directories which have changed inside of a watched folder."""
+
+    # Journals owned by watchers of this process, keyed by their file name.
+    owned_journals: dict[str, 'ChangeJournal'] = {}
+
+    def __init__(self, root_path: str):
+        self.root_path = os.path.normpath(root_path)
+        self.session: Optional[str] = None
+        self.heartbeat = 0.0
+        self.sequence = 0
+        self.overflow_sequence = 0
+        self.changed_directories: dict[str, int] = {}
+        self.run_checkpoints: dict[str, list] = {}
+
+        self.is_owner = False
+        self.has_unsaved_changes = False
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def getJournalName(root_path: str) -> str:
+        """Returns the name of the journal file used for the passed folder."""
+        normalized_path = os.path.normcase(os.path.normpath(root_path))
+        return "change_journal_" + hashlib.sha1(normalized_path.encode("utf-8")).hexdigest()[:16]
+
+    @classmethod
+    def getHeartbeatName(cls, root_path: str) -> str:
+        """Returns the name of the small file which only holds the heartbeat of the passed folder's journal."""
+        return cls.getJournalName(root_path) + "_heartbeat"
+
+    @staticmethod
+    def getRunKey(backup_id: int, destination_folder: str) -> str:
+        """Returns the key of a backup's run checkpoint, a run only got the destination it copied into in sync."""
+        return f"{backup_id}:{os.path.normcase(os.path.normpath(destination_folder))}"
+
+    @classmethod
+    def find(cls, root_path: str) -> Optional['ChangeJournal']:
+        """
+        Returns the journal of the passed folder if it is being watched, either by this or another process.
+        Returns None if nothing is watching the folder.
+        """
+        journal_name = cls.getJournalName(root_path)
+
+        journal = cls.owned_journals.get(journal_name)
+        if journal is None:
+            journal = cls(root_path)
+            journal.load()
+
+        return journal if journal.isLive() else None
+
+    def load(self):
+        """Loads the stored journal, incompatible or foreign journal files are ignored."""
+        data = load_data(self.getJournalName(self.root_path), StorageFolder.GENERAL, silent=True)
+        if not isinstance(data, dict):
+            return
+
+        if data.get("version") != CHANGE_JOURNAL_VERSION or data.get("root_path") != self.root_path:
+            return
+
+        self.session = data.get("session")
+        self.heartbeat = data.get("heartbeat", 0.0)
+        self.sequence = data.get("sequence", 0)
+        self.overflow_sequence = data.get("overflow_sequence", 0)
+        self.changed_directories = data.get("changed_directories", {})
+        self.run_checkpoints = data.get("run_checkpoints", {})
+
+        # Idle journals only refresh their heartbeat file, which is newer than the heartbeat of the journal file.
+        heartbeat = load_data(self.getHeartbeatName(self.root_path), StorageFolder.GENERAL, silent=True)
+        if isinstance(heartbeat, dict) and heartbeat.get("session") == self.session:
+            self.heartbeat = max(self.heartbeat, heartbeat.get("heartbeat", 0.0))
+
+    def save(self) -> bool:
+        """Stores the journal inside the AppData folder, should only be called by the owner."""
+        with self.lock:
+            data = {
+                "version": CHANGE_JOURNAL_VERSION,
+                "root_path": self.root_path,
+                "session": self.session,
+                "heartbeat": self.heartbeat,
+                "sequence": self.sequence,
+                "overflow_sequence": self.overflow_sequence,
+                "changed_directories": dict(self.changed_directories),
+                "run_checkpoints": dict(self.run_checkpoints)
+            }
+            self.has_unsaved_changes = False
+
+        return save_data(self.getJournalName(self.root_path), data, StorageFolder.GENERAL, FileType.JSON, compact=True)
+
+    def saveHeartbeat(self) -> bool:
+        """Stores only the heartbeat, which is all that changes while nothing is recorded."""
+        with self.lock:
+            data = {"session": self.session, "heartbeat": self.heartbeat}
+
+        return save_data(self.getHeartbeatName(self.root_path), data, StorageFolder.GENERAL, FileType.JSON, compact=True)
+
+    # --------------------------------------------- #
+
+    def isLive(self) -> bool:
+        """Returns whether a watcher is currently recording the changes of this journal."""
+        if self.session is None:
+            return False
+
+        if self.is_owner:
+            return True
+
+        # Journals of other processes are only trusted while their heartbeat is recent.
+        heartbeat_timeout = getFFlag("ChangeJournalHeartbeatTimeoutSeconds") or 30
+        return time.time() - self.heartbeat < heartbeat_timeout
+
+    def beginSession(self):
+        """Starts a new watching session, all of the previous checkpoints become invalid."""
+        with self.lock:
+            self.session = uuid.uuid4().hex
+            self.heartbeat = time.time()
+            self.sequence = 0
+            self.overflow_sequence = 0
+            self.changed_directories = {}
+            self.run_checkpoints = {}
+            self.has_unsaved_changes = True
+
+    def endSession(self):
+        """Ends the watching session, changes won't be recorded anymore, so nothing can be trusted."""
+        with self.lock:
+            self.session = None
+            self.changed_directories = {}
+            self.has_unsaved_changes = True
+
+    def recordChange(self, directory_path: str):
+        """Records a change of the passed directory's entries."""
+        with self.lock:
+            self.sequence += 1
+            self.changed_directories[directory_path] = self.sequence
+            self.has_unsaved_changes = True
+
+            # Keep the journal bounded, consumers behind the overflow have to do a full scan.
+            if len(self.changed_directories) > (getFFlag("ChangeJournalMaxEntries") or 100000):
+                self.overflow_sequence = self.sequence
+                self.changed_directories = {}
+
+    def recordOverflow(self):
+        """Records that some changes were lost, consumers behind this point have to do a full scan."""
+        with self.lock:
+            self.sequence += 1
+            self.overflow_sequence = self.sequence
+            self.changed_directories = {}
+            self.has_unsaved_changes = True
+
+    # --------------------------------------------- #
+
+    def getCheckpoint(self) -> Optional[list]:
+        """Returns the current checkpoint, which consumers should store once they've processed the changes."""
+        with self.lock:
+            if self.session is None:
+                return None
+            return [self.session, self.sequence]
+
+    def getChangesSince(self, checkpoint: Optional[list]) -> Optional[set[str]]:
+        """
+        Returns the directories which changed since the passed checkpoint.
+        Returns None if the changes are unknown, in which case a full scan is required.
+        """
+        with self.lock:
+            if checkpoint is None or self.session is None or checkpoint[0] != self.session:
+                return None
+
+            if checkpoint[1] < self.overflow_sequence:
+                return None
+
+            return {path for path, sequence in self.changed_directories.items() if sequence > checkpoint[1]}
+
+    def markRunSucceeded(self, backup_id: int, destination_folder: str, checkpoint: Optional[list]):
+        """Stores the checkpoint taken before a successful run of a backup into the passed destination."""
+        with self.lock:
+            self.run_checkpoints[self.getRunKey(backup_id, destination_folder)] = checkpoint
+            self.has_unsaved_changes = True
+
+        if self.is_owner:
+            self.save()
+
+    def getChangesSinceLastRun(self, backup_id: int, destination_folder: str) -> Optional[set[str]]:
+        """Returns the directories which changed since the last successful run of the passed backup into the destination."""
+        with self.lock:
+            checkpoint = self.run_checkpoints.get(self.getRunKey(backup_id, destination_folder))
+        return self.getChangesSince(checkpoint)
+
+# ------------------------------------------------------------------------------------ #
+
+def getChangedDirectoriesSinceLastRun(origin_folder: str, backup_id: int, destination_folder: str) -> Optional[set[str]]:
+    """
+    Returns the directories of a backup's origin folder which changed since the backup's last successful run.
+    Only the direct entries of the returned directories have to be rescanned, the rest of the origin is unchanged.
+    Returns None if the changes are unknown, in which case the whole origin has to be rescanned.
+    """
+    journal = ChangeJournal.find(origin_folder)
+    if journal is None:
+        return None
+    
+    return journal.getChangesSinceLastRun(backup_id, destination_folder)
+
+# --- CHANGE JOURNAL SERVICE --------------------------------------------------------- #
+
+class ChangeJournalService:
+    """Starts and stops the watchers of the folders whose changes should be journaled."""
+
+    watchers: dict[str, InotifyWatcher] = {}
+    change_listeners: list[Callable[[str, Optional[str]], None]] = []
+    lock = threading.Lock()
+
+    @classmethod
+    def addChangeListener(cls, listener: Callable[[str, Optional[str]], None]):
+        """Registers a function which is called with every changed directory and entry name of any watched folder."""
+        cls.change_listeners.append(listener)
+
+    @classmethod
+    def watchFolders(cls, folder_paths: list[str]):
+        """Watches exactly the passed folders, starting and stopping watchers as needed."""
+        if not InotifyWatcher.isSupported():
+            return
+
+        wanted_roots = {os.path.normpath(path) for path in folder_paths if path and os.path.isdir(path)}
+
+        with cls.lock:
+            for root_path in [root for root in cls.watchers if root not in wanted_roots]:
+                cls.stopWatching(root_path)
+
+            for root_path in wanted_roots:
+                if root_path not in cls.watchers:
+                    cls.startWatching(root_path)
+
+    @classmethod
+    def startWatching(cls, root_path: str):
+        journal = ChangeJournal(root_path)
+        journal.is_owner = True
+
+        def onChange(directory_path: str, name: Optional[str]):
+            journal.recordChange(directory_path)
+            for listener in cls.change_listeners:
+                listener(directory_path, name)
+
+        def onOverflow():
+            journal.recordOverflow()
+
+        def onReady():
+            # Changes are only trusted once the whole folder is being watched.
+            journal.beginSession()
+            journal.save()
+
+        last_flush = [time.monotonic()]
+        def onTick():
+            flush_interval = getFFlag("ChangeJournalFlushSeconds") or 5
+            if time.monotonic() - last_flush[0] >= flush_interval:
+                last_flush[0] = time.monotonic()
+                journal.heartbeat = time.time()
+
+                # The whole journal is only rewritten once something was recorded, idle journals only prove they're alive.
+                if journal.has_unsaved_changes:
+                    journal.save()
+                else:
+                    journal.saveHeartbeat()
+
+        def onStopped():
+            journal.endSession()
+            journal.save()
+
+        watcher = InotifyWatcher(root_path, onChange, onOverflow, onReady, onTick, onStopped)
+        try:
+            watcher.start()
+        except OSError as e:
+            print(f"Unable to watch {root_path}: {e}")
+            return
+
+        cls.watchers[root_path] = watcher
+        ChangeJournal.owned_journals[ChangeJournal.getJournalName(root_path)] = journal
+
+    @classmethod
+    def stopWatching(cls, root_path: str):
+        watcher = cls.watchers.pop(root_path, None)
+        if watcher is not None:
+            watcher.stop()
+
+        ChangeJournal.owned_journals.pop(ChangeJournal.getJournalName(root_path), None)
+
+    @classmethod
+    def stopAll(cls):
+        with cls.lock:
+            for root_path in list(cls.watchers):
+                cls.stopWatching(root_path)
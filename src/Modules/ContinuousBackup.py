@@ -0,0 +1,402 @@
+# Handles continuous backups, which copy the changed files of their origin folder in small,
+# frequent passes instead of copying the whole folder at once.
+# Author: https://github.com/matkeg
+# Date: October 19th 2026
+
+import os, shutil, queue, threading, time
+from typing import Optional
+from PyQt5.QtCore import QDateTime
+
+from ..Features.fetcher import getFFlag
+from .BackupLogic import BackupScheduleData, BackupTriggerType, BackupHistoryData, BackupOperationGroup, BackupOperationResult
+from .BackupHistoryViewLogic import addBackupHistoryEntry, loadBackupHistory
+from .CapacityPlanner import checkRunCapacity
+from .ChangeJournal import ChangeJournal, ChangeJournalService, getChangedDirectoriesSinceLastRun
+from .IoTelemetry import IoTelemetrySampler
+from .TreeSnapshot import scanTreeSnapshot, loadTreeSnapshot, saveTreeSnapshot
+
+# ------------------------------------------------------------------------------------ #
+
+def isPathInside(path: str, folder_path: str) -> bool:
+    """Checks whether the passed path is the passed folder, or is located inside of it."""
+    return path == folder_path or path.startswith(folder_path.rstrip(os.sep) + os.sep)
+
+def needsCopying(origin_path: str, destination_path: str) -> bool:
+    """Checks whether the destination file is missing or differs from the origin file."""
+    try:
+        origin_stat = os.stat(origin_path)
+        destination_stat = os.stat(destination_path)
+    except FileNotFoundError:
+        return True
+
+    return (
+        origin_stat.st_size != destination_stat.st_size or
+        int(origin_stat.st_mtime) != int(destination_stat.st_mtime)
+    )
+
+def copyFile(origin_path: str, destination_path: str) -> int:
+    """
+    Copies a file next to its destination first and then replaces the destination,
+    so a partially copied file is never visible. Returns the amount of copied bytes.
+    """
+    os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+    temporary_path = destination_path + ".rctmp"
+
+    try:
+        shutil.copy2(origin_path, temporary_path)
+        os.replace(temporary_path, destination_path)
+    except BaseException:
+        # A failed copy leaves no partial file behind in the destination.
+        try:
+            os.remove(temporary_path)
+        except OSError:
+            pass
+        raise
+    return os.path.getsize(destination_path)
+
+# ------------------------------------------------------------------------------------ #
+
+class ContinuousBackupRunner:
+    """
+    Keeps the destination of a single continuous backup in sync with its origin.
+    - Changed paths reported by the ChangeJournalService are collected into a bounded queue.
+    - Every few seconds, the collected paths are deduplicated and copied in a small pass.
+    - Once the queue is full, further changes are coalesced into the folders they happened in, each of which is synced as a whole.
+    - If too many folders changed as well, or the journal lost changes, a full sync pass is done instead.
+    """
+
+    def __init__(self, backup: BackupScheduleData):
+        self.backup = backup
+        self.origin_folder = os.path.normpath(backup.origin_folder)
+        self.destination_folder = os.path.normpath(backup.destination_folder)
+
+        self.changed_paths = queue.Queue(maxsize=getFFlag("ContinuousBackupQueueSize") or 10000)
+        self.needs_full_sync = threading.Event()
+        self.needs_full_sync.set()
+
+        # Folders whose changes didn't fit into the queue, and how many changes were coalesced into them so far.
+        self.coalesced_folders: set[str] = set()
+        self.coalesced_lock = threading.Lock()
+        self.coalesced_changes = 0
+
+        self.stop_event = threading.Event()
+        self.thread = None
+
+        # Totals of the passes done since the runner has started.
+        self.copied_bytes = 0
+        self.copied_files = 0
+        self.failed_files = 0
+        self.last_pass_time = None
+
+        # The journal checkpoint which the destination is known to be in sync with.
+        self.checkpoint: Optional[list] = None
+        self.stored_checkpoint: Optional[list] = None
+
+        # Whether a full pass went through the whole origin, after which the destination already holds its copy.
+        self.has_completed_full_pass = False
+
+    # --------------------------------------------- #
+
+    def start(self):
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, name=f"ContinuousBackup{self.backup.backup_id}", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def onChange(self, directory_path: str, name: Optional[str]):
+        """
+        Collects a changed path, called from the watcher thread.
+        The watcher is shared by every journal and runner, so this never blocks. When the passes can't keep up,
+        changes are coalesced into their folders, and only once too many folders changed, into a full sync.
+        """
+        if self.needs_full_sync.is_set():
+            return
+
+        changed_path = directory_path if name is None else os.path.join(directory_path, name)
+        if not isPathInside(changed_path, self.origin_folder):
+            return
+
+        try:
+            self.changed_paths.put_nowait(changed_path)
+        except queue.Full:
+            with self.coalesced_lock:
+                self.coalesced_changes += 1
+                if directory_path in self.coalesced_folders:
+                    return
+                if len(self.coalesced_folders) >= (getFFlag("ContinuousBackupCoalescedFolders") or 1000):
+                    self.needs_full_sync.set()
+                    return
+                self.coalesced_folders.add(directory_path)
+
+    def takeCoalescedFolders(self) -> set[str]:
+        with self.coalesced_lock:
+            coalesced_folders, self.coalesced_folders = self.coalesced_folders, set()
+            return coalesced_folders
+
+    # --------------------------------------------- #
+
+    def getDestinationPath(self, origin_path: str) -> str:
+        return os.path.join(self.destination_folder, os.path.relpath(origin_path, self.origin_folder))
+
+    def syncFile(self, origin_path: str) -> bool:
+        """Copies the passed file if its destination differs, returns whether the destination is in sync."""
+        destination_path = self.getDestinationPath(origin_path)
+        if not needsCopying(origin_path, destination_path):
+            return True
+
+        try:
+            self.copied_bytes += copyFile(origin_path, destination_path)
+            self.copied_files += 1
+            return True
+        except OSError as e:
+            self.failed_files += 1
+            print(f"Error copying {origin_path}: {e}")
+            return False
+
+    def syncDirectory(self, directory_path: str):
+        """Copies the changed files directly inside of the passed directory."""
+        try:
+            with os.scandir(directory_path) as entries:
+                for entry in entries:
+                    if self.stop_event.is_set():
+                        return
+                    if entry.is_file(follow_symlinks=False):
+                        self.syncFile(entry.path)
+        except OSError as e:
+            print(f"Error accessing {directory_path}: {e}")
+
+    def syncTree(self):
+        """
+        Syncs the whole origin, only checking the destination of files which changed since the last whole sync.
+        - The origin is recorded into a tree snapshot, which is compared with the snapshot of the last whole sync,
+          so unchanged files cost a single stat of the origin rather than a stat of both copies.
+        - Files that failed to copy are recorded as changed, so the next whole sync retries them.
+        """
+        previous = loadTreeSnapshot(self.origin_folder, self.destination_folder)
+        try:
+            snapshot = scanTreeSnapshot(self.origin_folder, previous, self.syncFile, self.stop_event.is_set)
+        finally:
+            if previous is not None:
+                previous.close()
+
+        if snapshot is not None:
+            saveTreeSnapshot(snapshot, self.destination_folder)
+
+    def syncPath(self, changed_path: str):
+        # Removed files are kept inside of the destination, a backup never deletes data.
+        if os.path.isfile(changed_path):
+            self.syncFile(changed_path)
+        elif os.path.isdir(changed_path):
+            self.syncDirectory(changed_path)
+
+    # --------------------------------------------- #
+
+    def runFullPass(self, journal: Optional[ChangeJournal]):
+        """Syncs the whole origin, or only the directories which changed since the last in-sync checkpoint."""
+        # Changed paths queued so far are covered by this pass, the queue is drained
+        # before the checkpoint is taken so no change can fall in between.
+        self.needs_full_sync.clear()
+        self.takeCoalescedFolders()
+        while not self.changed_paths.empty():
+            self.changed_paths.get_nowait()
+
+        checkpoint = journal.getCheckpoint() if journal is not None else None
+        if journal is None:
+            changed_directories = None
+        elif self.checkpoint is None:
+            # A restarted runner continues from the last pass which got the destination in sync, if it's still known.
+            changed_directories = getChangedDirectoriesSinceLastRun(self.origin_folder, self.backup.backup_id, self.destination_folder)
+        else:
+            changed_directories = journal.getChangesSince(self.checkpoint)
+
+        if changed_directories is None:
+            self.syncTree()
+        else:
+            for directory_path in changed_directories:
+                if os.path.isdir(directory_path):
+                    self.syncDirectory(directory_path)
+
+        if not self.stop_event.is_set():
+            self.checkpoint = checkpoint
+            self.has_completed_full_pass = True
+
+    def logFullPass(self, started_at: float, copied_bytes: int, copied_files: int, failed_files: int, telemetry: Optional[dict] = None):
+        """
+        Logs a full pass into the backup history, as it's the continuous equivalent of a backup run.
+        Incremental passes aren't logged, they would flood the history with tiny entries.
+        """
+        if copied_files == 0 and failed_files == 0:
+            return
+
+        addBackupHistoryEntry(BackupHistoryData(
+            backup_id = self.backup.backup_id,
+            backup_name = self.backup.friendly_name,
+            origin_folder = self.origin_folder,
+            destination_folder = self.destination_folder,
+            backup_time = QDateTime.fromSecsSinceEpoch(int(started_at)),
+            operation_group = BackupOperationGroup.CONTINUOUS,
+            operation_result = BackupOperationResult.SUCCESS if failed_files == 0 else BackupOperationResult.OTHER,
+            copied_bytes = copied_bytes,
+            copied_files = copied_files,
+            duration = time.time() - started_at,
+            telemetry = telemetry
+        ))
+
+    def runIncrementalPass(self, journal: ChangeJournal):
+        """Syncs a batch of the queued paths, leaving the rest for the next pass."""
+        checkpoint = journal.getCheckpoint()
+        batch_size = getFFlag("ContinuousBackupBatchSize") or 1000
+
+        batch = set()
+        while len(batch) < batch_size:
+            try:
+                batch.add(self.changed_paths.get_nowait())
+            except queue.Empty:
+                break
+
+        for changed_path in batch:
+            if self.stop_event.is_set():
+                return
+            self.syncPath(changed_path)
+
+        # Folders are taken after the batch, so changes coalesced while it was being synced are included.
+        coalesced_folders = self.takeCoalescedFolders()
+        if coalesced_folders:
+            print(
+                f"Continuous backup {self.backup.backup_id} can't keep up with the changes of its origin, "
+                f"syncing {len(coalesced_folders)} folders as a whole ({self.coalesced_changes} changes coalesced so far)."
+            )
+
+        for directory_path in coalesced_folders:
+            if self.stop_event.is_set():
+                # The remaining folders are synced by the next pass.
+                with self.coalesced_lock:
+                    self.coalesced_folders |= coalesced_folders
+                return
+            self.syncDirectory(directory_path)
+
+        # Only a fully drained queue means the destination caught up with the checkpoint.
+        if self.changed_paths.empty() and not self.coalesced_folders:
+            self.checkpoint = checkpoint
+
+    def runPass(self):
+        if not os.path.isdir(self.origin_folder):
+            print(f"Skipping continuous backup {self.backup.backup_id}: the origin folder isn't available.")
+            return
+
+        journal = ChangeJournal.find(self.origin_folder)
+
+        # Without a live journal, changes might go unnoticed, so only full passes can be trusted.
+        if journal is None or self.needs_full_sync.is_set() or journal.getChangesSince(self.checkpoint) is None:
+            # Full passes can copy the whole origin, so they're only started once the destination has room for it.
+            # Once a pass went through (even if unlogged, as it had nothing to copy), only changes are left to copy.
+            history = loadBackupHistory(self.backup.backup_id, getFFlag("HistoryRecentEntries") or 1000)
+            has_room, message = checkRunCapacity(self.backup, history, 0 if self.has_completed_full_pass else None)
+            if not has_room:
+                print(f"Skipping continuous backup {self.backup.backup_id}: the destination is running out of space.\n{message}")
+                return
+
+            started_at = time.time()
+            copied_bytes, copied_files, failed_files = self.copied_bytes, self.copied_files, self.failed_files
+
+            # Full passes are what the history records, so their I/O is sampled to tell what slowed them down.
+            sampler = IoTelemetrySampler(self.backup.backup_id, self.origin_folder, self.destination_folder)
+            sampler.start()
+            try:
+                self.runFullPass(journal)
+            finally:
+                sampler.stop()
+
+            if not self.stop_event.is_set():
+                self.logFullPass(
+                    started_at, self.copied_bytes - copied_bytes,
+                    self.copied_files - copied_files, self.failed_files - failed_files,
+                    sampler.summarize()
+                )
+        else:
+            self.runIncrementalPass(journal)
+
+        self.last_pass_time = time.time()
+        if journal is not None and self.checkpoint is not None and self.checkpoint != self.stored_checkpoint:
+            journal.markRunSucceeded(self.backup.backup_id, self.destination_folder, self.checkpoint)
+            self.stored_checkpoint = self.checkpoint
+
+    def run(self):
+        """Main method that runs in the thread."""
+        while not self.stop_event.is_set():
+            try:
+                self.runPass()
+            except Exception as e:
+                print(f"Error during continuous backup {self.backup.backup_id}: {e}")
+
+            # Without a live journal passes are full scans, so they are done less often.
+            if ChangeJournal.find(self.origin_folder) is None:
+                interval = getFFlag("ContinuousBackupFallbackIntervalSeconds") or 300
+            else:
+                interval = getFFlag("ContinuousBackupIntervalSeconds") or 10
+
+            self.stop_event.wait(interval)
+
+# ------------------------------------------------------------------------------------ #
+
+class ContinuousBackupService:
+    """Starts and stops the runners of the registered continuous backups."""
+
+    runners: dict[int, ContinuousBackupRunner] = {}
+    lock = threading.Lock()
+    is_listening = False
+
+    @classmethod
+    def onChange(cls, directory_path: str, name: Optional[str]):
+        for runner in list(cls.runners.values()):
+            runner.onChange(directory_path, name)
+
+    @classmethod
+    def syncBackups(cls, backups: list[BackupScheduleData]):
+        """Runs exactly the continuous backups among the passed backups, restarting those whose folders changed."""
+        wanted_backups = {
+            backup.backup_id: backup for backup in backups
+            if backup.initiation_type == BackupTriggerType.CONTINUOUS
+        }
+
+        # Runners are only joined once the lock is released, as a pass could be waiting on something which needs it.
+        stopped_runners = []
+
+        with cls.lock:
+            if not cls.is_listening:
+                ChangeJournalService.addChangeListener(cls.onChange)
+                cls.is_listening = True
+
+            for backup_id, runner in list(cls.runners.items()):
+                backup = wanted_backups.get(backup_id)
+                if (
+                    backup is None or
+                    os.path.normpath(backup.origin_folder) != runner.origin_folder or
+                    os.path.normpath(backup.destination_folder) != runner.destination_folder
+                ):
+                    runner.stop_event.set()
+                    stopped_runners.append(runner)
+                    del cls.runners[backup_id]
+
+            for backup_id, backup in wanted_backups.items():
+                if backup_id not in cls.runners:
+                    runner = ContinuousBackupRunner(backup)
+                    cls.runners[backup_id] = runner
+                    runner.start()
+
+        for runner in stopped_runners:
+            runner.stop()
+
+    @classmethod
+    def stopAll(cls):
+        with cls.lock:
+            stopped_runners = list(cls.runners.values())
+            cls.runners.clear()
+
+        for runner in stopped_runners:
+            runner.stop()
@@ -0,0 +1,240 @@
+# Measures how fast drives are, so backup destinations can be chosen and tuned on data rather than guesswork.
+# Results are stored per device in AppData, since benchmarking takes a while and writes to the drive.
+# Author: https://github.com/matkeg
+# Date: October 19th 2026
+
+import os, time, shutil, tempfile, statistics
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from ..Features.fetcher import getFFlag
+from .AppDataLogic import load_data, save_data, StorageFolder, FileType
+from .BackupPredictor import getDeviceKey
+from .FileSystemUtils import formatStorageSize
+
+BLOCK_SIZE = 1024 * 1024
+SMALL_FILE_SIZE = 4096
+MEGABYTE = 1024 * 1024
+
+# ------------------------------------------------------------------------------------ #
+
+@dataclass
+class DriveBenchmarkResult:
+    """Holds the measured speeds of a single device, throughputs are in bytes per second."""
+    device_key: str
+    sequential_read: float = 0.0
+    sequential_write: float = 0.0
+    small_files_per_second: float = 0.0
+    fsync_latency: float = 0.0
+    benchmark_time: float = 0.0
+
+    def getSuggestedWorkers(self) -> int:
+        """
+        Suggests how many files should be copied (or analyzed) at once on this device.
+        - Drives which handle many small operations per second (SSDs) benefit from parallel work.
+        - Spinning disks, USB sticks and network shares mostly slow down when they are made to seek between files.
+        """
+        if self.small_files_per_second >= 2000:
+            return min(8, os.cpu_count() or 1)
+        elif self.small_files_per_second >= 500:
+            return 4
+        elif self.small_files_per_second >= 100:
+            return 2
+        return 1
+
+    def describe(self) -> str:
+        """Returns a user-facing summary of the result."""
+        return (
+            f"Read: {formatStorageSize(self.sequential_read)}/s, Write: {formatStorageSize(self.sequential_write)}/s\n"
+            f"Small Files: {int(self.small_files_per_second)}/s, Sync Latency: {self.fsync_latency * 1000:.1f} ms"
+        )
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DriveBenchmarkResult":
+        return cls(**{key: data[key] for key in cls.__dataclass_fields__ if key in data})
+
+# ------------------------------------------------------------------------------------ #
+
+def dropFileCache(file_descriptor: int):
+    """Asks the OS to drop the cached pages of a file, so reading it back hits the drive rather than memory."""
+    if hasattr(os, "posix_fadvise"):
+        os.posix_fadvise(file_descriptor, 0, 0, os.POSIX_FADV_DONTNEED)
+
+def syncDirectory(folder_path: str):
+    """Flushes the entries of a folder to its drive, which is only possible (and needed) on POSIX systems."""
+    if os.name == "nt":
+        return
+
+    file_descriptor = os.open(folder_path, os.O_RDONLY)
+    try:
+        os.fsync(file_descriptor)
+    finally:
+        os.close(file_descriptor)
+
+def measureSequential(folder_path: str, size: int) -> tuple[float, float]:
+    """Writes and reads back a file of the passed size, returns the write and read throughput."""
+    file_path = os.path.join(folder_path, "sequential.bin")
+    block = os.urandom(BLOCK_SIZE)
+
+    started_at = time.perf_counter()
+    with open(file_path, "wb", buffering=0) as file:
+        for _ in range(size // BLOCK_SIZE):
+            file.write(block)
+        os.fsync(file.fileno())
+        dropFileCache(file.fileno())
+    write_time = time.perf_counter() - started_at
+
+    # Without posix_fadvise (on Windows), part of the file might still be read from memory.
+    started_at = time.perf_counter()
+    with open(file_path, "rb", buffering=0) as file:
+        while file.read(BLOCK_SIZE):
+            pass
+    read_time = time.perf_counter() - started_at
+
+    os.remove(file_path)
+    return size / max(write_time, 1e-6), size / max(read_time, 1e-6)
+
+def measureSmallFiles(folder_path: str, count: int) -> float:
+    """Creates the passed number of small files, returns how many were created per second."""
+    small_files_path = os.path.join(folder_path, "small")
+    os.makedirs(small_files_path)
+    data = os.urandom(SMALL_FILE_SIZE)
+
+    # Creating files is only done once their data and the folder entries reach the drive. Only the benchmarked
+    # files are synced, as os.sync would also wait on every other drive and the unrelated writes pending on them.
+    started_at = time.perf_counter()
+    for index in range(count):
+        with open(os.path.join(small_files_path, f"{index}.bin"), "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+
+    syncDirectory(small_files_path)
+    elapsed = time.perf_counter() - started_at
+
+    shutil.rmtree(small_files_path, ignore_errors=True)
+    return count / max(elapsed, 1e-6)
+
+def measureFsyncLatency(folder_path: str, count: int) -> float:
+    """Writes and syncs a small block the passed number of times, returns the median time a sync took."""
+    data = os.urandom(SMALL_FILE_SIZE)
+    latencies = []
+
+    with open(os.path.join(folder_path, "fsync.bin"), "wb", buffering=0) as file:
+        for _ in range(count):
+            file.seek(0)
+            file.write(data)
+
+            started_at = time.perf_counter()
+            os.fsync(file.fileno())
+            latencies.append(time.perf_counter() - started_at)
+
+    return statistics.median(latencies)
+
+def benchmarkDrive(root_path: str, status: Optional[callable] = None) -> DriveBenchmarkResult:
+    """
+    Benchmarks the drive of the passed path, using temporary files inside a hidden folder which is removed afterwards.
+    - At most a tenth of the free space is used, so benchmarking a nearly full drive doesn't fill it up.
+    - Raises an OSError if the drive can't be written to, or doesn't have enough free space.
+    """
+    status = status or (lambda message: None)
+
+    sequential_size = (getFFlag("DriveBenchmarkFileMegabytes") or 256) * MEGABYTE
+    sequential_size = min(sequential_size, shutil.disk_usage(root_path).free // 10)
+    sequential_size -= sequential_size % BLOCK_SIZE
+    if sequential_size < BLOCK_SIZE * 8:
+        raise OSError(f"Not enough free space on {root_path} to benchmark it.")
+
+    benchmark_path = tempfile.mkdtemp(prefix=f".{getFFlag('ProgramName') or 'RobotCopy'}Benchmark-", dir=root_path)
+    try:
+        result = DriveBenchmarkResult(getDeviceKey(root_path), benchmark_time=time.time())
+
+        status(f"Measuring sequential speeds ({formatStorageSize(sequential_size)})...")
+        result.sequential_write, result.sequential_read = measureSequential(benchmark_path, sequential_size)
+
+        status("Measuring small file creation...")
+        result.small_files_per_second = measureSmallFiles(benchmark_path, getFFlag("DriveBenchmarkSmallFiles") or 500)
+
+        status("Measuring sync latency...")
+        result.fsync_latency = measureFsyncLatency(benchmark_path, getFFlag("DriveBenchmarkSyncCount") or 20)
+
+        return result
+    finally:
+        shutil.rmtree(benchmark_path, ignore_errors=True)
+
+# ------------------------------------------------------------------------------------ #
+
+def loadDriveBenchmarks() -> dict[str, DriveBenchmarkResult]:
+    """Loads the stored benchmark results, keyed by their device keys."""
+    try:
+        data = load_data("drive_benchmarks", StorageFolder.GENERAL, silent=True) or {}
+        return {device_key: DriveBenchmarkResult.from_dict(entry) for device_key, entry in data.items()}
+    except Exception as e:
+        print(f"Error loading drive benchmarks: {e}")
+        return {}
+
+def saveDriveBenchmark(result: DriveBenchmarkResult) -> bool:
+    """Stores the benchmark result, replacing the previous result of its device."""
+    benchmarks = loadDriveBenchmarks()
+    benchmarks[result.device_key] = result
+    return save_data(
+        "drive_benchmarks", {device_key: entry.to_dict() for device_key, entry in benchmarks.items()},
+        StorageFolder.GENERAL, FileType.JSON
+    )
+
+def getDriveBenchmark(path: str, benchmarks: Optional[dict[str, DriveBenchmarkResult]] = None) -> Optional[DriveBenchmarkResult]:
+    """Returns the stored benchmark result of the device the passed path is on, if it was benchmarked."""
+    if benchmarks is None:
+        benchmarks = loadDriveBenchmarks()
+    return benchmarks.get(getDeviceKey(path))
+
+def compareDriveSpeeds(origin: DriveBenchmarkResult, destination: DriveBenchmarkResult) -> Optional[str]:
+    """Returns a warning if the destination is much slower than the origin, meaning backups are held back by it."""
+    ratio = getFFlag("DriveBenchmarkSlowdownRatio") or 4
+
+    problems = []
+    if destination.sequential_write * ratio < origin.sequential_read:
+        problems.append(
+            f"it writes at {formatStorageSize(destination.sequential_write)}/s, "
+            f"while the origin reads at {formatStorageSize(origin.sequential_read)}/s"
+        )
+    if destination.small_files_per_second * ratio < origin.small_files_per_second:
+        problems.append(
+            f"it creates {int(destination.small_files_per_second)} small files per second, "
+            f"while the origin creates {int(origin.small_files_per_second)}"
+        )
+
+    if not problems:
+        return None
+    return f"The destination drive {destination.device_key} is much slower than the origin drive {origin.device_key}, " + " and ".join(problems) + "."
+
+def suggestWorkerCount(origin: Optional[DriveBenchmarkResult], destination: Optional[DriveBenchmarkResult]) -> Optional[int]:
+    """Suggests how many files a backup should copy at once, the slower of the benchmarked drives decides."""
+    suggestions = [result.getSuggestedWorkers() for result in (origin, destination) if result is not None]
+    return min(suggestions) if suggestions else None
+
+# ------------------------------------------------------------------------------------ #
+
+class DriveBenchmarkWorker(QThread):
+    """Worker thread for benchmarking a drive, and storing the result."""
+    status_update = pyqtSignal(str)
+    result = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, root_path: str):
+        super().__init__()
+        self.root_path = root_path
+
+    def run(self):
+        """Main method that runs in the thread."""
+        try:
+            benchmark = benchmarkDrive(self.root_path, self.status_update.emit)
+            saveDriveBenchmark(benchmark)
+            self.result.emit(benchmark)
+        except Exception as e:
+            self.failed.emit(str(e))
@@ -0,0 +1,258 @@
+# Keeps the metadata of the machine's drives cached, updating it whenever drives are plugged in,
+# removed, mounted or unmounted, instead of enumerating every drive on each view refresh.
+# Author: https://github.com/matkeg
+# Date: October 19th 2026
+
+import os, select, threading
+from typing import Optional, Callable
+
+from ..Features.fetcher import getFFlag
+from .DriveProbe import FormattedDiskInfo, getAvailableDrivesData
+
+# Listeners receive the drive letters (or mount points) which were added, updated and removed.
+DriveChangeListener = Callable[[list[str], list[str], list[str]], None]
+
+# ------------------------------------------------------------------------------------ #
+
+class DriveEventSource:
+    """
+    Base class of the drive event sources, which call back whenever the drives might have changed.
+    The callback receives the action (such as "add" or "remove") and the name of the device, if known.
+    """
+    def __init__(self):
+        self.callback: Optional[Callable[[str, Optional[str]], None]] = None
+
+    @staticmethod
+    def isSupported() -> bool:
+        return False
+
+    def start(self, callback: Callable[[str, Optional[str]], None]):
+        self.callback = callback
+
+    def stop(self):
+        self.callback = None
+
+    def emit(self, action: str, device_name: Optional[str] = None):
+        if self.callback is not None:
+            self.callback(action, device_name)
+
+class ManualDriveEventSource(DriveEventSource):
+    """A stand-in event source which only reports the events passed to `emit`, useful for tests."""
+    @staticmethod
+    def isSupported() -> bool:
+        return True
+
+class UdevDriveEventSource(DriveEventSource):
+    """Reports block devices being added, removed or changed, through the udev monitor of pyudev."""
+    def __init__(self):
+        super().__init__()
+        self.observer = None
+
+    @staticmethod
+    def isSupported() -> bool:
+        try:
+            import pyudev
+            return True
+        except ImportError:
+            return False
+
+    def start(self, callback: Callable[[str, Optional[str]], None]):
+        import pyudev
+
+        super().start(callback)
+        monitor = pyudev.Monitor.from_netlink(pyudev.Context())
+        monitor.filter_by(subsystem="block")
+
+        self.observer = pyudev.MonitorObserver(
+            monitor, lambda action, device: self.emit(action, device.sys_name), name="DriveEventObserver"
+        )
+        self.observer.start()
+
+    def stop(self):
+        if self.observer is not None:
+            self.observer.stop()
+            self.observer = None
+        super().stop()
+
+class MountTableEventSource(DriveEventSource):
+    """
+    Reports drives being mounted or unmounted, which udev doesn't see, by polling /proc/self/mountinfo.
+    The kernel flags the file with POLLPRI whenever the mount table changes, so no time based polling is done.
+    """
+    def __init__(self, mount_info_path: str = "/proc/self/mountinfo"):
+        super().__init__()
+        self.mount_info_path = mount_info_path
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    @staticmethod
+    def isSupported() -> bool:
+        return hasattr(select, "poll") and os.path.exists("/proc/self/mountinfo")
+
+    def start(self, callback: Callable[[str, Optional[str]], None]):
+        super().start(callback)
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, name="MountTableObserver", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        super().stop()
+
+    def run(self):
+        """Main method that runs in the thread."""
+        try:
+            with open(self.mount_info_path, "rb") as mount_info:
+                poller = select.poll()
+                poller.register(mount_info, select.POLLPRI | select.POLLERR)
+
+                while not self.stop_event.is_set():
+                    # Wake up periodically, so a stop request doesn't wait for the next mount change.
+                    if poller.poll(500):
+                        mount_info.seek(0)
+                        mount_info.read()
+                        self.emit("mount")
+        except OSError as e:
+            print(f"Error watching the mount table: {e}")
+
+class DriveLetterPollingSource(DriveEventSource):
+    """Reports drive letters appearing or disappearing on Windows, by polling the bitmask of used drive letters."""
+    def __init__(self):
+        super().__init__()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    @staticmethod
+    def isSupported() -> bool:
+        return os.name == "nt"
+
+    def start(self, callback: Callable[[str, Optional[str]], None]):
+        super().start(callback)
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, name="DriveLetterObserver", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        super().stop()
+
+    def run(self):
+        """Main method that runs in the thread."""
+        import win32api
+
+        # A single, cheap call which doesn't touch the drives themselves.
+        last_drives = win32api.GetLogicalDrives()
+        while not self.stop_event.wait(getFFlag("DriveLetterPollingSeconds") or 2):
+            drives = win32api.GetLogicalDrives()
+            if drives != last_drives:
+                self.emit("add" if drives & ~last_drives else "remove")
+                last_drives = drives
+
+# ------------------------------------------------------------------------------------ #
+
+class DriveMetadataCache:
+    """
+    Holds the metadata of every drive, which is enumerated in full only once.
+    - Afterwards, drive events trigger a (debounced) re-enumeration, and listeners are told which drives changed.
+    - Listeners are called from background threads, GUI code has to pass the changes on through a signal.
+    """
+    drives: dict[str, FormattedDiskInfo] = {}
+    is_loaded = False
+    lock = threading.Lock()
+
+    listeners: list[DriveChangeListener] = []
+    event_sources: list[DriveEventSource] = []
+    refresh_timer: Optional[threading.Timer] = None
+
+    @classmethod
+    def addListener(cls, listener: DriveChangeListener):
+        if listener not in cls.listeners:
+            cls.listeners.append(listener)
+
+    @classmethod
+    def removeListener(cls, listener: DriveChangeListener):
+        if listener in cls.listeners:
+            cls.listeners.remove(listener)
+
+    @classmethod
+    def getDrives(cls) -> list[FormattedDiskInfo]:
+        """Returns the cached drives, sorted by their drive letters (or mount points)."""
+        with cls.lock:
+            return [cls.drives[drive_letter] for drive_letter in sorted(cls.drives)]
+
+    # --------------------------------------------- #
+
+    @classmethod
+    def refresh(cls) -> tuple[list[str], list[str], list[str]]:
+        """Enumerates the drives again, and returns (and reports to the listeners) which drives were added, updated and removed."""
+        drives = {drive.driveLetter: drive for drive in getAvailableDrivesData()}
+
+        with cls.lock:
+            added = [drive_letter for drive_letter in drives if drive_letter not in cls.drives]
+            removed = [drive_letter for drive_letter in cls.drives if drive_letter not in drives]
+            updated = [
+                drive_letter for drive_letter, drive in drives.items()
+                if drive_letter in cls.drives and vars(cls.drives[drive_letter]) != vars(drive)
+            ]
+
+            cls.drives = drives
+            cls.is_loaded = True
+
+        if added or updated or removed:
+            for listener in list(cls.listeners):
+                listener(added, updated, removed)
+
+        return added, updated, removed
+
+    @classmethod
+    def onDriveEvent(cls, action: str, device_name: Optional[str] = None):
+        """Schedules a refresh, events come in bursts (a disk and each of its partitions), so they are debounced."""
+        with cls.lock:
+            if cls.refresh_timer is not None:
+                cls.refresh_timer.cancel()
+
+            cls.refresh_timer = threading.Timer(getFFlag("DriveEventDebounceSeconds") or 0.5, cls.refreshSafely)
+            cls.refresh_timer.daemon = True
+            cls.refresh_timer.start()
+
+    @classmethod
+    def refreshSafely(cls):
+        try:
+            cls.refresh()
+        except Exception as e:
+            print(f"Error refreshing the drive metadata: {e}")
+
+    # --------------------------------------------- #
+
+    @classmethod
+    def startMonitoring(cls, event_sources: Optional[list[DriveEventSource]] = None):
+        """Starts listening to the passed event sources, or to every event source supported by the platform."""
+        if event_sources is None:
+            event_sources = [
+                source() for source in (UdevDriveEventSource, MountTableEventSource, DriveLetterPollingSource)
+                if source.isSupported()
+            ]
+
+        for event_source in event_sources:
+            try:
+                event_source.start(cls.onDriveEvent)
+                cls.event_sources.append(event_source)
+            except Exception as e:
+                print(f"Unable to start the drive event source {type(event_source).__name__}: {e}")
+
+    @classmethod
+    def stopMonitoring(cls):
+        for event_source in cls.event_sources:
+            event_source.stop()
+        cls.event_sources.clear()
+
+        with cls.lock:
+            if cls.refresh_timer is not None:
+                cls.refresh_timer.cancel()
+                cls.refresh_timer = None
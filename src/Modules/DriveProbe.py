@@ -0,0 +1,504 @@
+# Enumerates the drives of the machine through platform specific backends, which all describe
+# the drives with the same FormattedDiskInfo model.
+# Author: https://github.com/matkeg
+# Date: October 19th 2026
+
+import os, re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+
+import psutil
+
+from ..Features.fetcher import getFFlag
+from .Utils import error
+from .FileSystemUtils import formatStorageSize
+
+# ------------------------------------------------------------------------------------ #
+
+class FormattedDiskInfo:
+    """A class which holds formated data of a given drive."""
+    def __init__(
+            self,
+            drive_letter: Optional[str] = "?:", drive_name: Optional[str] = "Unknown", formatted_free_space: Optional[str] = "Unknown", file_system: Optional[str] = "Unknown",
+            drive_type: Optional[str] = "Unknown", is_windows: Optional[bool | str] = "Unknown", disk_model: Optional[str] = "Unknown", disk_manufacturer: Optional[str] = "Unknown"
+        ):
+        """Constructor to initialize the formatted disk information, which will be displayed to the user."""
+
+        def frm(value: any) -> str:
+            """Formats a value based on certain hardcoded formatting rules."""
+            # Translate booleans.
+            if isinstance(value, bool):
+                if value is True:
+                    return "Yes"
+                elif value is False:
+                    return "No"
+
+            elif isinstance(value, str) and len(value) <= 0:
+                return "Unknown"
+
+            elif value is not None:
+                return str(value)
+
+            else:
+                return "Unknown"
+
+        self.driveLetter = frm(drive_letter)
+        self.driveName = frm(drive_name)
+        self.driveType = frm(drive_type)
+        self.diskModel = frm(disk_model)
+        self.diskManufacturer = frm(disk_manufacturer)
+
+        self.fileSystem = frm(file_system)
+        self.freeSpace = frm(formatted_free_space)
+
+        self.isWindows = frm(is_windows)
+
+    def __repr__(self):
+        """Return a string representation of the FormattedDiskInfo instance."""
+        return (f"Drive Letter: {self.driveLetter}\nDrive Name: {self.driveName}\n"
+                f"Free Space: {self.freeSpace}\nFile System: {self.fileSystem}\n"
+                f"Drive Type: {self.driveType}\nIs Windows Installation: {self.isWindows}\n"
+                f"Disk Model Name: {self.diskModel}\nDisk Manufacturer: {self.diskManufacturer}")
+
+# --- DISK TOPOLOGY ------------------------------------------------------------------ #
+
+# The topology maps every volume (a drive letter on Windows, a device number on Linux) to the
+# physical disk it's located on. It's built once per refresh by a topology provider, and is
+# then shared by every drive being processed, instead of each drive walking the disks again.
+
+@dataclass
+class PhysicalDisk:
+    name: str = "Unknown"
+    model: Optional[str] = None
+    manufacturer: Optional[str] = None
+
+    # Whether the disk can be unplugged, None if it isn't known.
+    is_removable: Optional[bool] = None
+
+@dataclass
+class DiskTopology:
+    volumes: dict[str, PhysicalDisk] = field(default_factory=dict)
+
+    def getDisk(self, volume_id: str) -> Optional[PhysicalDisk]:
+        return self.volumes.get(volume_id)
+
+class DiskTopologyProvider(ABC):
+    """Base class of the topology providers, `buildTopology` is called once per refresh."""
+    @abstractmethod
+    def buildTopology(self) -> DiskTopology:
+        pass
+
+class StaticDiskTopologyProvider(DiskTopologyProvider):
+    """Provides a fixed topology, useful where the real topology can't be queried (such as tests)."""
+    def __init__(self, topology: Optional[DiskTopology] = None):
+        self.topology = topology or DiskTopology()
+
+    def buildTopology(self) -> DiskTopology:
+        return self.topology
+
+class WmiDiskTopologyProvider(DiskTopologyProvider):
+    """
+    Builds the topology with three WMI queries over a single connection: the disks, their partitions,
+    and the links between partitions and logical disks. Associators aren't walked object by object,
+    since every walk is a query of its own.
+    """
+    def buildTopology(self) -> DiskTopology:
+        import wmi, pythoncom
+
+        pythoncom.CoInitialize()  # Initialize COM in the thread
+        try:
+            connection = wmi.WMI()
+
+            disks = {
+                disk.Index: PhysicalDisk(disk.DeviceID, disk.Model, disk.Manufacturer)
+                for disk in connection.query("SELECT Index, DeviceID, Model, Manufacturer FROM Win32_DiskDrive")
+            }
+            partition_disks = {
+                partition.DeviceID: partition.DiskIndex
+                for partition in connection.query("SELECT DeviceID, DiskIndex FROM Win32_DiskPartition")
+            }
+
+            # References are read as raw object paths, since resolving them would query each object.
+            topology = DiskTopology()
+            for link in connection.query("SELECT * FROM Win32_LogicalDiskToPartition"):
+                partition_id = self.getReferencedId(link.ole_object.Properties_("Antecedent").Value)
+                logical_disk_id = self.getReferencedId(link.ole_object.Properties_("Dependent").Value)
+
+                disk = disks.get(partition_disks.get(partition_id))
+                if logical_disk_id is not None and disk is not None:
+                    topology.volumes[logical_disk_id] = disk
+
+            return topology
+        finally:
+            pythoncom.CoUninitialize()  # Clean up COM in the thread
+
+    @staticmethod
+    def getReferencedId(object_path: str) -> Optional[str]:
+        """Returns the DeviceID of an object path, such as 'Win32_LogicalDisk.DeviceID="C:"'."""
+        match = re.search(r'DeviceID="([^"]*)"', object_path or "")
+        return match.group(1) if match else None
+
+class SysBlockDiskTopologyProvider(DiskTopologyProvider):
+    """Builds the topology from a single walk over /sys/class/block, partitions are mapped to their parent disks."""
+    def __init__(self, sys_path: str = "/sys"):
+        self.sys_path = sys_path
+
+    @staticmethod
+    def readSysValue(path: str) -> Optional[str]:
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def readDisk(self, disk_path: str) -> PhysicalDisk:
+        # USB disks often report themselves as not removable, their device path tells otherwise.
+        is_removable = (
+            self.readSysValue(os.path.join(disk_path, "removable")) == "1" or
+            "/usb" in os.path.realpath(os.path.join(disk_path, "device"))
+        )
+
+        return PhysicalDisk(
+            os.path.basename(disk_path),
+            self.readSysValue(os.path.join(disk_path, "device", "model")),
+            self.readSysValue(os.path.join(disk_path, "device", "vendor")),
+            is_removable
+        )
+
+    def buildTopology(self) -> DiskTopology:
+        topology = DiskTopology()
+        disks: dict[str, PhysicalDisk] = {}
+
+        try:
+            with os.scandir(os.path.join(self.sys_path, "class", "block")) as entries:
+                for entry in entries:
+                    device_path = os.path.realpath(entry.path)
+                    device_number = self.readSysValue(os.path.join(device_path, "dev"))
+                    if device_number is None:
+                        continue
+
+                    disk_path = device_path
+                    if os.path.exists(os.path.join(device_path, "partition")):
+                        disk_path = os.path.dirname(device_path)
+
+                    if disk_path not in disks:
+                        disks[disk_path] = self.readDisk(disk_path)
+                    topology.volumes[device_number] = disks[disk_path]
+        except OSError as e:
+            print(f"Error reading the block devices: {e}")
+
+        return topology
+
+# ------------------------------------------------------------------------------------ #
+
+class DriveProbeBackend(ABC):
+    """
+    Base class of the drive enumeration backends.
+    - `enumerateDrives` must gather every drive in a single batched enumeration, without probing for drives one by one.
+    - Disks are looked up in the topology built by the passed provider, once per enumeration.
+    - Backends only import their platform specific modules once they are used.
+    """
+    name = "Unknown"
+
+    def __init__(self, topology_provider: Optional[DiskTopologyProvider] = None):
+        self.topology_provider = topology_provider or self.getDefaultTopologyProvider()
+
+    @staticmethod
+    def getDefaultTopologyProvider() -> DiskTopologyProvider:
+        return StaticDiskTopologyProvider()
+
+    @abstractmethod
+    def enumerateDrives(self) -> list[FormattedDiskInfo]:
+        pass
+
+    @staticmethod
+    def isSupported() -> bool:
+        return False
+
+# --- WINDOWS ------------------------------------------------------------------------ #
+
+class WindowsDriveProbe(DriveProbeBackend):
+    """Enumerates the drive letters through the Windows API, disk models are fetched through WMI."""
+    name = "Windows"
+
+    @staticmethod
+    def isSupported() -> bool:
+        return os.name == "nt"
+
+    @staticmethod
+    def getDefaultTopologyProvider() -> DiskTopologyProvider:
+        return WmiDiskTopologyProvider()
+
+    def enumerateDrives(self) -> list[FormattedDiskInfo]:
+        import win32api
+
+        # A single call lists every drive letter, unlike probing the letters (which waits on disconnected network drives).
+        drives = [drive for drive in win32api.GetLogicalDriveStrings().split("\0") if drive]
+        partitions = psutil.disk_partitions()
+        topology = self.topology_provider.buildTopology()
+
+        # Use threads for faster data retrival.
+        with ThreadPoolExecutor(thread_name_prefix="DriveDataWorker") as executor:
+            results = executor.map(lambda drive_letter: self.processDrive(drive_letter, partitions, topology), drives)
+
+        # Collect non-None results
+        return [result for result in results if result is not None]
+
+    @staticmethod
+    def processDrive(drive_letter: str, partitions: list, topology: DiskTopology) -> Optional[FormattedDiskInfo]:
+        import win32api, win32file
+
+        try:
+            # Get partition info
+            partition_info = next((p for p in partitions if p.device == drive_letter), None)
+            if not partition_info:
+                return None
+
+            # Get disk usage info
+            usage = psutil.disk_usage(drive_letter)
+
+            # Check for Windows installation
+            is_windows = os.path.exists(os.path.join(drive_letter, "Windows"))
+
+            # Get volume information
+            volume_info = win32api.GetVolumeInformation(drive_letter)
+            drive_name = volume_info[0]
+            file_system = volume_info[4]
+
+            # Determine drive type
+            drive_type_code = win32file.GetDriveType(drive_letter)
+            drive_type_map = {
+                win32file.DRIVE_UNKNOWN: "Unknown",
+                win32file.DRIVE_NO_ROOT_DIR: "Invalid",
+                win32file.DRIVE_REMOVABLE: "Removable",
+                win32file.DRIVE_FIXED: "Fixed",
+                win32file.DRIVE_REMOTE: "Network",
+                win32file.DRIVE_CDROM: "CD-ROM",
+                win32file.DRIVE_RAMDISK: "RAM Disk",
+            }
+            drive_type = drive_type_map.get(drive_type_code, "Unknown")
+
+            # Retrieve disk model and manufacturer from the topology
+            physical_disk = topology.getDisk(drive_letter[0] + ":")
+
+            if physical_disk:
+                disk_model = physical_disk.model
+                disk_manufacturer = physical_disk.manufacturer or "Unknown"
+            else:
+                disk_model = "Unknown"
+                disk_manufacturer = "Unknown"
+
+            # Assembling and returning the data.
+            return FormattedDiskInfo(
+                drive_letter[0] + ":",
+                drive_name,
+                formatStorageSize(usage.free),
+                file_system,
+                drive_type,
+                is_windows,
+                disk_model,
+                disk_manufacturer,
+            )
+        except Exception as e:
+            error(str(e), f"Error processing drive {drive_letter}")
+            return None
+
+# --- LINUX -------------------------------------------------------------------------- #
+
+# File systems of network shares, these are shown as network drives.
+NETWORK_FILE_SYSTEMS = {"nfs", "nfs4", "cifs", "smb3", "smbfs", "fuse.sshfs", "9p", "afs", "ceph", "glusterfs"}
+
+# File systems of optical media.
+OPTICAL_FILE_SYSTEMS = {"iso9660", "udf"}
+
+# Read-only images of packages (such as snaps) are mounted from loop devices, these aren't drives.
+IMAGE_FILE_SYSTEMS = {"squashfs", "erofs"}
+
+class MountInfo:
+    """A single line of /proc/self/mountinfo."""
+    def __init__(self, device_number: str, root: str, mount_point: str, file_system: str, source: str):
+        self.device_number = device_number
+        self.root = root
+        self.mount_point = mount_point
+        self.file_system = file_system
+        self.source = source
+
+def unescapeMountField(value: str) -> str:
+    """Mount fields escape spaces, tabs, newlines and backslashes as octal sequences, such as \\040."""
+    return re.sub(r"\\([0-7]{3})", lambda match: chr(int(match.group(1), 8)), value)
+
+def parseMountInfo(mount_info_text: str) -> list[MountInfo]:
+    """Parses the contents of /proc/self/mountinfo, see proc(5) for its format."""
+    mounts = []
+    for line in mount_info_text.splitlines():
+        fields = line.split(" ")
+        if "-" not in fields or len(fields) < 10:
+            continue
+
+        # Optional fields end with a single "-" separator, the file system and source follow it.
+        separator = fields.index("-", 6)
+        mounts.append(MountInfo(
+            device_number=fields[2],
+            root=unescapeMountField(fields[3]),
+            mount_point=unescapeMountField(fields[4]),
+            file_system=fields[separator + 1],
+            source=unescapeMountField(fields[separator + 2])
+        ))
+    return mounts
+
+class LinuxDriveProbe(DriveProbeBackend):
+    """
+    Enumerates mounted drives from /proc/self/mountinfo, the disks they are on are described by the topology.
+    - Only block devices and network shares are listed, pseudo file systems and package images are skipped.
+    - A device mounted several times (bind mounts, subvolumes) is listed once, at its shortest mount point.
+    - Drives are identified by their mount point, which is used in place of the drive letter.
+    """
+    name = "Linux"
+
+    def __init__(
+            self, topology_provider: Optional[DiskTopologyProvider] = None, 
+            mount_info_path: str = "/proc/self/mountinfo", dev_path: str = "/dev"
+        ):
+        super().__init__(topology_provider)
+        self.mount_info_path = mount_info_path
+        self.dev_path = dev_path
+
+    @staticmethod
+    def isSupported() -> bool:
+        return os.path.exists("/proc/self/mountinfo")
+
+    @staticmethod
+    def getDefaultTopologyProvider() -> DiskTopologyProvider:
+        return SysBlockDiskTopologyProvider()
+
+    # --------------------------------------------- #
+
+    def getDriveMounts(self) -> list[MountInfo]:
+        """Returns the mounts which represent drives, one per device."""
+        with open(self.mount_info_path, "r", encoding="utf-8", errors="surrogateescape") as f:
+            mounts = parseMountInfo(f.read())
+
+        drive_mounts: dict[str, MountInfo] = {}
+        for mount in mounts:
+            is_block_device = mount.source.startswith(self.dev_path + "/")
+            is_network_share = mount.file_system in NETWORK_FILE_SYSTEMS
+
+            if not (is_block_device or is_network_share) or mount.file_system in IMAGE_FILE_SYSTEMS:
+                continue
+
+            # Network shares don't have a backing device, each share is a drive of its own.
+            key = mount.device_number if is_block_device else f"{mount.source}@{mount.mount_point}"
+            current_mount = drive_mounts.get(key)
+            if current_mount is None or len(mount.mount_point) < len(current_mount.mount_point):
+                drive_mounts[key] = mount
+
+        return sorted(drive_mounts.values(), key=lambda mount: mount.mount_point)
+
+    def getVolumeLabels(self) -> dict[str, str]:
+        """Maps the real paths of devices to their labels, through the links inside of /dev/disk/by-label."""
+        labels = {}
+        labels_path = os.path.join(self.dev_path, "disk", "by-label")
+        try:
+            with os.scandir(labels_path) as entries:
+                for entry in entries:
+                    # Link names escape special characters as hexadecimal sequences, such as \x20.
+                    labels[os.path.realpath(entry.path)] = re.sub(
+                        r"\\x([0-9a-fA-F]{2})", lambda match: chr(int(match.group(1), 16)), entry.name
+                    )
+        except OSError:
+            pass
+        return labels
+
+    @staticmethod
+    def getDriveType(mount: MountInfo, disk: Optional[PhysicalDisk]) -> str:
+        if mount.file_system in NETWORK_FILE_SYSTEMS:
+            return "Network"
+        if mount.file_system in OPTICAL_FILE_SYSTEMS:
+            return "CD-ROM"
+        if disk is None:
+            return "Unknown"
+
+        if disk.name.startswith("zram") or disk.name.startswith("ram"):
+            return "RAM Disk"
+        if disk.is_removable:
+            return "Removable"
+        return "Fixed"
+
+    # --------------------------------------------- #
+
+    def enumerateDrives(self) -> list[FormattedDiskInfo]:
+        drives = []
+        labels = self.getVolumeLabels()
+        topology = self.topology_provider.buildTopology()
+
+        for mount in self.getDriveMounts():
+            try:
+                is_network_share = mount.file_system in NETWORK_FILE_SYSTEMS
+                disk = None if is_network_share else topology.getDisk(mount.device_number)
+
+                usage = psutil.disk_usage(mount.mount_point)
+
+                drive_name = labels.get(os.path.realpath(mount.source))
+                if drive_name is None:
+                    drive_name = os.path.basename(mount.mount_point) or "Root"
+
+                disk_model = disk_manufacturer = None
+                if disk is not None:
+                    disk_model = disk.model
+                    disk_manufacturer = disk.manufacturer
+
+                # Network shares aren't checked, since they can take long to respond.
+                is_windows = "Unknown"
+                if not is_network_share:
+                    is_windows = os.path.isdir(os.path.join(mount.mount_point, "Windows", "System32"))
+
+                drives.append(FormattedDiskInfo(
+                    mount.mount_point,
+                    drive_name,
+                    formatStorageSize(usage.free),
+                    mount.file_system,
+                    self.getDriveType(mount, disk),
+                    is_windows,
+                    disk_model,
+                    disk_manufacturer
+                ))
+            except Exception as e:
+                print(f"Error processing drive {mount.mount_point}: {e}")
+
+        return drives
+
+# ------------------------------------------------------------------------------------ #
+
+DRIVE_PROBE_BACKENDS: list[type[DriveProbeBackend]] = [WindowsDriveProbe, LinuxDriveProbe]
+
+def getDriveProbeBackend() -> Optional[DriveProbeBackend]:
+    """
+    Returns the drive enumeration backend of the current platform.
+    The backend can be forced through the "DriveProbeBackend" FFlag, by setting it to the backend's name.
+    """
+    forced_backend = getFFlag("DriveProbeBackend")
+    for backend in DRIVE_PROBE_BACKENDS:
+        if forced_backend:
+            if backend.name == forced_backend:
+                return backend()
+        elif backend.isSupported():
+            return backend()
+
+    return None
+
+def getAvailableDrivesData() -> list[FormattedDiskInfo]:
+    """
+        Retrieves data from all available drives and their disks, which will be shown to the user.
+
+        Returns FormattedDiskInfo objects which hold string formatted disk data.
+
+        Drives are enumerated by the backend of the current platform.
+    """
+    backend = getDriveProbeBackend()
+    if backend is None:
+        error("Drives can't be listed on this operating system.", "getAvailableDrivesData Error")
+        return []
+
+    return backend.enumerateDrives()
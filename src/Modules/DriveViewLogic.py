@@ -2,7 +2,7 @@
 # Author: https://github.com/matkeg
 # Date: December 9th 2024
 
-import psutil, win32api, win32file, wmi, pythoncom, os
+import os
 
 # For custom thread names
 import threading
@@ -10,66 +10,21 @@ import threading
 from typing import Optional
 from PyQt5.QtWidgets import *
 from PyQt5.QtGui import QIcon
-from PyQt5.QtCore import QThread, pyqtSignal
-from concurrent.futures import ThreadPoolExecutor
+from PyQt5.QtCore import QThread, QObject, pyqtSignal
 
 from warnings import deprecated
 
 from ..Features.fetcher import *
-from .Utils import error, info, warn
+from .Utils import error, info, warn, ask, AskAnswer
 from .QtUtils import *
-
-# ------------------------------------------------------------------------------------ #
-
-class FormattedDiskInfo:
-    """A class which holds formated data of a given drive."""
-    def __init__(
-            self, 
-            drive_letter: Optional[str] = "?:", drive_name: Optional[str] = "Unknown", formatted_free_space: Optional[str] = "Unknown", file_system: Optional[str] = "Unknown", 
-            drive_type: Optional[str] = "Unknown", is_windows: Optional[bool | str] = "Unknown", disk_model: Optional[str] = "Unknown", disk_manufacturer: Optional[str] = "Unknown"
-        ):
-        """Constructor to initialize the formatted disk information, which will be displayed to the user."""
-
-        def frm(value: any) -> str:
-            """Formats a value based on certain hardcoded formatting rules."""
-            # Translate booleans.
-            if isinstance(value, bool):  
-                if value is True:
-                    return "Yes"
-                elif value is False:
-                    return "No"
-
-            elif isinstance(value, str) and len(value) <= 0:   
-                return "Unknown"
-            
-            elif value is not None:
-                return str(value)
-            
-            else:
-                return "Unknown"
-
-        self.driveLetter = frm(drive_letter)
-        self.driveName = frm(drive_name)
-        self.driveType = frm(drive_type)
-        self.diskModel = frm(disk_model)
-        self.diskManufacturer = frm(disk_manufacturer)
-
-        self.fileSystem = frm(file_system)
-        self.freeSpace = frm(formatted_free_space)
-
-        self.isWindows = frm(is_windows)
-
-    def __repr__(self):
-        """Return a string representation of the FormattedDiskInfo instance."""
-        return (f"Drive Letter: {self.driveLetter}\nDrive Name: {self.driveName}\n"
-                f"Free Space: {self.freeSpace}\nFile System: {self.fileSystem}\n"
-                f"Drive Type: {self.driveType}\nIs Windows Installation: {self.isWindows}\n"
-                f"Disk Model Name: {self.diskModel}\nDisk Manufacturer: {self.diskManufacturer}")
+from .DriveProbe import FormattedDiskInfo
+from .DriveMonitor import DriveMetadataCache
+from .DriveBenchmark import DriveBenchmarkWorker, DriveBenchmarkResult, getDriveBenchmark
 
 # ------------------------------------------------------------------------------------ #
 
 class DriveViewPopulationWorker(QThread):
-    """Worker thread for fetching drive data and populating the drive view."""
+    """Worker thread for revalidating the drive metadata cache, and populating the drive view."""
     finished = pyqtSignal()
     status_update = pyqtSignal(str)
     drive_data = pyqtSignal(list)
@@ -85,28 +40,80 @@ class DriveViewPopulationWorker(QThread):
         try:
             self.status_update.emit("Fetching available drives...")
             
-            # Get drive data in the thread
-            drives_data = getAvailableDrivesData()
+            # Re-enumerate the drives in the thread, the view is told about the changed drives through the cache listeners.
+            DriveMetadataCache.refresh()
             
             # Emit the collected data
-            self.drive_data.emit(drives_data)
+            self.drive_data.emit(DriveMetadataCache.getDrives())
             self.finished.emit()
             
         except Exception as e:
             error(str(e), "Drive Population Error")
             self.finished.emit()
 
+class DriveViewNotifier(QObject):
+    """
+    Passes the changes of the drive metadata cache, which are reported from the drive event threads,
+    on to the GUI thread which owns the drive view.
+    """
+    drives_changed = pyqtSignal()
+
+    def onDrivesChanged(self, added: list[str], updated: list[str], removed: list[str]):
+        self.drives_changed.emit()
+
+# ------------------------------------------------------------------------------------ #
+
+def setDriveTreeEntry(treeEntry: QTreeWidgetItem, entry: FormattedDiskInfo):
+    """Sets the text, data and icon of a drive view row."""
+    treeEntry.setText(0, f"{entry.driveName} ({entry.driveLetter})")
+    treeEntry.setData(0, 32, entry)
+
+    if entry.isWindows == "Yes":
+        treeEntry.setIcon(0, QIcon("src/Interface/Icons/Drives/DriveInstallation.ico"))
+    elif entry.isWindows == "No":
+        treeEntry.setIcon(0, QIcon("src/Interface/Icons/Drives/Drive.ico"))
+    else:
+        treeEntry.setIcon(0, QIcon("src/Interface/Icons/Drives/DriveUnknown.ico"))
+
+def syncDriveTreeView(treeWidget: QTreeWidget, drives_data: list[FormattedDiskInfo]):
+    """
+    Brings the drive view in line with the passed drives, only the rows of drives which were
+    added, changed or removed are touched, so the selection and scroll position are kept.
+    """
+    drives = {entry.driveLetter: entry for entry in drives_data}
+
+    # Remove the rows of drives which are gone, backwards so the indexes stay valid.
+    for index in reversed(range(treeWidget.topLevelItemCount())):
+        treeEntry = treeWidget.topLevelItem(index)
+        entry: FormattedDiskInfo = treeEntry.data(0, 32)
+        if entry is None or entry.driveLetter not in drives:
+            treeWidget.takeTopLevelItem(index)
+
+    existingEntries = {}
+    for index in range(treeWidget.topLevelItemCount()):
+        treeEntry = treeWidget.topLevelItem(index)
+        existingEntries[treeEntry.data(0, 32).driveLetter] = treeEntry
+
+    for index, (driveLetter, entry) in enumerate(drives.items()):
+        treeEntry = existingEntries.get(driveLetter)
+        if treeEntry is None:
+            treeEntry = QTreeWidgetItem(["", "0", "0", "--/--/---- --:-- --"])
+            treeWidget.insertTopLevelItem(index, treeEntry)
+        elif vars(treeEntry.data(0, 32)) == vars(entry):
+            continue
+
+        setDriveTreeEntry(treeEntry, entry)
+
 def populateDriveView(mainWindow: QMainWindow, treeWidget: QTreeWidget):
     """
-    Populates the Drive View by fetching and displaying drive data in a separate thread.
+    Populates the Drive View from the drive metadata cache, and revalidates the cache in a separate thread.
+    - The first population has to enumerate every drive, and keeps the content disabled until it's done.
+    - Afterwards the cached drives are shown instantly, and the rows of changed drives are updated in place.
     """
     # Check if there is an ongoing view refreshing operation.
     if getFFlag("DYNViewsAreRefreshing") is True:
         return;
 
-    # Start updating the drive view by firstly clearing the treeWidget.
-    treeWidget.clear()
-
     def handleItemSelection():
         selectedItems = treeWidget.selectedItems()
         selectedItem: QTreeWidgetItem = selectedItems[0] if selectedItems else None
@@ -151,26 +158,18 @@ def populateDriveView(mainWindow: QMainWindow, treeWidget: QTreeWidget):
                 f"""<html><head/><body><p><span style=" color:#a3a3a3;">Windows Installation:</span> 
                 {associatedEntry.isWindows}</p></body></html>""")
 
+            setDriveBenchmarkInsights(mainWindow, getDriveBenchmark(getDriveRootPath(associatedEntry.driveLetter)))
+            findObject(mainWindow, "benchmarkDriveButton").setEnabled(getattr(treeWidget, "benchmarkWorker", None) is None)
+
     def updateTreeView(drives_data):
         """Updates the tree view with the processed drive data."""
-        treeWidget.clear()
-        
-        for entry in drives_data:
-            driveFullName = f"{entry.driveName} ({entry.driveLetter})"
-            newTreeEntry = QTreeWidgetItem(treeWidget, [driveFullName, "0", "0", "--/--/---- --:-- --"])
-            newTreeEntry.setData(0, 32, entry)
-
-            if entry.isWindows == "Yes":
-                newTreeEntry.setIcon(0, QIcon("src/Interface/Icons/Drives/DriveInstallation.ico"))
-            elif entry.isWindows == "No":
-                newTreeEntry.setIcon(0, QIcon("src/Interface/Icons/Drives/Drive.ico"))
-            else:
-                newTreeEntry.setIcon(0, QIcon("src/Interface/Icons/Drives/DriveUnknown.ico"))
+        syncDriveTreeView(treeWidget, drives_data)
 
     def updateStatus(message: str):
         """Updates the status label with the current operation."""
-        setUnsecureText(mainWindow, "statusText", message)
-        findObject(mainWindow, "statusLabel").show()
+        if isInitialPopulation:
+            setUnsecureText(mainWindow, "statusText", message)
+            findObject(mainWindow, "statusLabel").show()
 
     def onPopulationFinished():
         """Cleanup after population is complete."""
@@ -182,16 +181,28 @@ def populateDriveView(mainWindow: QMainWindow, treeWidget: QTreeWidget):
 
         setFFlag("DYNViewsAreRefreshing", False)
 
-    # Disable the Content widget during population
-    content_widget = findObject(mainWindow, "Content")
-
-    # Hide labels, and disable the content widget while the population operation is ongoing.
-    warningLabel = findObject(mainWindow, "warningLabel")
-    errorLabel = findObject(mainWindow, "errorLabel")
-    infoLabel = findObject(mainWindow, "infoLabel")
-    executeFunction("hide", errorLabel, warningLabel, infoLabel)
+    # The selection handling and the cache listener are only set up once per tree,
+    # since the view is populated again on every refresh.
+    if getattr(treeWidget, "driveNotifier", None) is None:
+        treeWidget.itemSelectionChanged.connect(handleItemSelection)
+
+        # Drives plugged in or removed while the program runs are shown without a manual refresh.
+        treeWidget.driveNotifier = DriveViewNotifier(treeWidget)
+        treeWidget.driveNotifier.drives_changed.connect(lambda: syncDriveTreeView(treeWidget, DriveMetadataCache.getDrives()))
+        DriveMetadataCache.addListener(treeWidget.driveNotifier.onDrivesChanged)
+
+    isInitialPopulation = not DriveMetadataCache.is_loaded
+    if isInitialPopulation:
+        # Hide labels, and disable the content widget while the population operation is ongoing.
+        warningLabel = findObject(mainWindow, "warningLabel")
+        errorLabel = findObject(mainWindow, "errorLabel")
+        infoLabel = findObject(mainWindow, "infoLabel")
+        executeFunction("hide", errorLabel, warningLabel, infoLabel)
 
-    content_widget.setEnabled(False)
+        findObject(mainWindow, "Content").setEnabled(False)
+    else:
+        # Show the cached drives right away, the worker only updates the rows of drives which changed.
+        syncDriveTreeView(treeWidget, DriveMetadataCache.getDrives())
 
     # Create and set up the worker thread
     worker = DriveViewPopulationWorker()
@@ -199,14 +210,82 @@ def populateDriveView(mainWindow: QMainWindow, treeWidget: QTreeWidget):
     worker.drive_data.connect(updateTreeView)
     worker.finished.connect(onPopulationFinished)
     
-    # Set up item selection handling
-    treeWidget.itemSelectionChanged.connect(handleItemSelection)
-    
     # Start the worker thread
     worker.start()
 
 # ------------------------------------------------------------------------------------ #
 
+def getDriveRootPath(driveLetter: str) -> str:
+    """Returns the root folder of a drive, drive letters (like "C:") need a separator to point to the root rather than the working directory."""
+    if driveLetter.endswith(":"):
+        return driveLetter + os.sep
+    return driveLetter
+
+def setDriveBenchmarkInsights(mainWindow: QMainWindow, benchmark: Optional[DriveBenchmarkResult]):
+    """Shows the stored benchmark result of the selected drive inside the insights panel."""
+    if benchmark is None:
+        readWrite, smallFiles = "-", "-"
+    else:
+        readWrite = f"{formatStorageSize(benchmark.sequential_read)}/s / {formatStorageSize(benchmark.sequential_write)}/s"
+        smallFiles = f"{int(benchmark.small_files_per_second)}/s"
+
+    setUnsecureText(mainWindow, "InsightsDriveBenchmark", 
+        f"""<html><head/><body><p><span style=" color:#a5a5a5;">Read / Write:</span> 
+        {readWrite}<br/><span style=" color:#a3a3a3;">Small Files:</span> 
+        {smallFiles}</p></body></html>""")
+
+    findObject(mainWindow, "InsightsDriveBenchmark").setToolTip(benchmark.describe() if benchmark is not None else "")
+
+def benchmarkSelectedDrive(mainWindow: QMainWindow, treeWidget: QTreeWidget):
+    """Benchmarks the drive selected in the Drive View in a separate thread, after the user confirms it."""
+    selectedItems = treeWidget.selectedItems()
+    if not selectedItems or getattr(treeWidget, "benchmarkWorker", None) is not None:
+        return
+
+    associatedEntry: FormattedDiskInfo = selectedItems[0].data(0, 32)
+    rootPath = getDriveRootPath(associatedEntry.driveLetter)
+
+    if not ask(
+        f"Benchmarking {associatedEntry.driveName} ({associatedEntry.driveLetter}) writes temporary files "
+        "to its free space, and might take a minute on slow drives. Do you want to continue?",
+        "Benchmark Drive",
+        AskAnswer.YES_NO
+    ):
+        return
+
+    benchmarkButton = findObject(mainWindow, "benchmarkDriveButton")
+    benchmarkButton.setEnabled(False)
+
+    def updateStatus(message: str):
+        """Updates the status label with the current operation."""
+        setUnsecureText(mainWindow, "statusText", f"Benchmarking {associatedEntry.driveLetter}: {message}")
+        findObject(mainWindow, "statusLabel").show()
+
+    def onBenchmarkResult(benchmark: DriveBenchmarkResult):
+        # The selection might have moved to another drive while benchmarking.
+        selectedItems = treeWidget.selectedItems()
+        if selectedItems and selectedItems[0].data(0, 32).driveLetter == associatedEntry.driveLetter:
+            setDriveBenchmarkInsights(mainWindow, benchmark)
+
+    def onBenchmarkFinished():
+        """Cleanup after the benchmark is complete."""
+        findObject(mainWindow, "statusLabel").hide()
+        benchmarkButton.setEnabled(bool(treeWidget.selectedItems()))
+        treeWidget.benchmarkWorker = None
+        worker.deleteLater()
+
+    worker = DriveBenchmarkWorker(rootPath)
+    worker.status_update.connect(updateStatus)
+    worker.result.connect(onBenchmarkResult)
+    worker.failed.connect(lambda message: error(message, "Drive Benchmark Error"))
+    worker.finished.connect(onBenchmarkFinished)
+
+    # Keep a reference to the worker, so it isn't collected while running.
+    treeWidget.benchmarkWorker = worker
+    worker.start()
+
+# ------------------------------------------------------------------------------------ #
+
 def formatStorageSize(valueInBytes: int) -> str:
     """Converts a storage size in bytes to the most appropriate unit."""
     units = ["Bytes", "KB", "MB", "GB", "TB", "PB", "EB", "ZB", "YB"]
@@ -242,6 +321,8 @@ def getDriveData(drive_letter) -> FormattedDiskInfo:
        
         Returns a FormattedDiskInfo object which holds string formatted disk data.
     """
+    import psutil, win32api, win32file, wmi
+
     try:
         # Normalize drive letter
         raw_drive_letter = drive_letter.upper()
@@ -307,95 +388,3 @@ def getDriveData(drive_letter) -> FormattedDiskInfo:
     except Exception as e:
         error(str(e), "getDriveData Error")
         return FormattedDiskInfo()
-
-# ------------------------------------------------------------------------------------ #
-
-def getAvailableDrivesData() -> list[FormattedDiskInfo]:
-    """
-        Retrieves data from all available drives and their disks, which will be shown to the user.
-        
-        Returns FormattedDiskInfo objects which hold string formatted disk data. 
-        
-        Uses threading for faster data retrival.
-    """
-    drives_data = []
-    drives = [f"{chr(letter)}:\\" for letter in range(65, 91) if os.path.exists(f"{chr(letter)}:/")]
-
-    def process_drive(drive_letter):
-        try:
-            pythoncom.CoInitialize()  # Initialize COM in the thread
-
-            # Get disk usage info
-            usage = psutil.disk_usage(drive_letter)
-
-            # Get partition info
-            partitions = psutil.disk_partitions()
-            partition_info = next((p for p in partitions if p.device == drive_letter), None)
-            if not partition_info:
-                return None
-
-            # Check for Windows installation
-            is_windows = os.path.exists(os.path.join(drive_letter, "Windows"))
-
-            # Get volume information
-            volume_info = win32api.GetVolumeInformation(drive_letter)
-            drive_name = volume_info[0]
-            file_system = volume_info[4]
-
-            # Determine drive type
-            drive_type_code = win32file.GetDriveType(drive_letter)
-            drive_type_map = {
-                win32file.DRIVE_UNKNOWN: "Unknown",
-                win32file.DRIVE_NO_ROOT_DIR: "Invalid",
-                win32file.DRIVE_REMOVABLE: "Removable",
-                win32file.DRIVE_FIXED: "Fixed",
-                win32file.DRIVE_REMOTE: "Network",
-                win32file.DRIVE_CDROM: "CD-ROM",
-                win32file.DRIVE_RAMDISK: "RAM Disk",
-            }
-            drive_type = drive_type_map.get(drive_type_code, "Unknown")
-
-            # Retrieve disk model and manufacturer using WMI
-            physical_disk = None
-            for disk in wmi.WMI().Win32_DiskDrive():
-                for partition in disk.associators("Win32_DiskDriveToDiskPartition"):
-                    for logical_disk in partition.associators("Win32_LogicalDiskToPartition"):
-                        if logical_disk.DeviceID == drive_letter[0] + ":":
-                            physical_disk = disk
-                            break
-                    if physical_disk:
-                        break
-                if physical_disk:
-                    break
-
-            if physical_disk:
-                disk_model = physical_disk.Model
-                disk_manufacturer = physical_disk.Manufacturer or "Unknown"
-            else:
-                disk_model = "Unknown"
-                disk_manufacturer = "Unknown"
-
-            # Assembling and returning the data.
-            return FormattedDiskInfo(
-                drive_letter[0] + ":",
-                drive_name,
-                formatStorageSize(usage.free),
-                file_system,
-                drive_type,
-                is_windows,
-                disk_model,
-                disk_manufacturer,
-            )
-        except Exception as e:
-            error(str(e), f"Error processing drive {drive_letter}")
-            return None
-        finally:
-            pythoncom.CoUninitialize()  # Clean up COM in the thread
-
-    # Use threads for faster data retrival.
-    with ThreadPoolExecutor(thread_name_prefix="DriveDataWorker") as executor:
-        results = executor.map(process_drive, drives)
-
-    # Collect non-None results
-    drives_data = [result for result in results if result is not None]
-    return drives_data
\ No newline at end of file
@@ -0,0 +1,178 @@
+# Keeps the environment values in memory, writing changes to the environment file in batches, and allocates
+# counters (such as backup ids) under a lock shared by every process of the program.
+# Author: https://github.com/matkeg
+# Date: October 19th 2026
+
+import os, json, time, atexit, threading
+from typing import Optional
+
+from ..Features.fetcher import getFFlag
+from .FileLock import FileLock
+from .AtomicWriter import writeFileAtomically
+
+# ------------------------------------------------------------------------------------ #
+
+class EnvironmentStore:
+    """
+    The environment values, loaded once and served from memory.
+    - Changed values are written together after a short delay, merged into whatever other processes wrote meanwhile.
+    - The file is replaced atomically, so a crash leaves either the previous or the new values, never a partial file.
+    - The file is reloaded when another process changes it, checked at most once per `EnvironmentReloadSeconds`.
+    """
+
+    def __init__(self, file_path: str, file_lock: FileLock):
+        self.file_path = file_path
+        self.file_lock = file_lock
+        self.lock = threading.RLock()
+
+        self.flush_delay = getFFlag("EnvironmentFlushSeconds") or 0.5
+        self.reload_interval = getFFlag("EnvironmentReloadSeconds") or 1
+
+        self.values: dict = {}
+        self.dirty_keys: set[str] = set()
+        self.signature = None
+        self.checked_at = 0.0
+        self.flush_timer: Optional[threading.Timer] = None
+
+        with self.lock:
+            self.reload()
+
+        # Pending values are written when the program exits, as the flush timer doesn't outlive it.
+        atexit.register(self.flush)
+
+    # -- FILE ------------------------------------- #
+
+    def getSignature(self) -> Optional[tuple]:
+        try:
+            stat = os.stat(self.file_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def readFile(self) -> dict:
+        """Reads the values stored in the file, raising if it can't be read rather than losing the stored counters."""
+        if not os.path.exists(self.file_path):
+            return {}
+        with open(self.file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError(f"{self.file_path} doesn't hold an object.")
+        return data
+
+    def writeFile(self, data: dict):
+        writeFileAtomically(self.file_path, json.dumps(data, indent=4).encode('utf-8'))
+        self.signature = self.getSignature()
+
+    def reload(self):
+        """Reloads the values from the file, keeping the values changed in memory which weren't written yet."""
+        try:
+            data = self.readFile()
+        except Exception as e:
+            print(f"Unable to reload the environment values: {e}")
+            return
+
+        data.update({key: self.values[key] for key in self.dirty_keys if key in self.values})
+        self.values = data
+        self.signature = self.getSignature()
+        self.checked_at = time.monotonic()
+
+    def revalidate(self):
+        if time.monotonic() - self.checked_at < self.reload_interval:
+            return
+        self.checked_at = time.monotonic()
+        if self.getSignature() != self.signature:
+            self.reload()
+
+    # -- VALUES ----------------------------------- #
+
+    def get(self, key: str, default_value: any = None) -> any:
+        with self.lock:
+            self.revalidate()
+            return self.values.get(key, default_value)
+
+    def getAll(self) -> dict:
+        with self.lock:
+            self.revalidate()
+            return dict(self.values)
+
+    def set(self, key: str, value: any):
+        with self.lock:
+            self.values[key] = value
+            self.dirty_keys.add(key)
+            self.scheduleFlush()
+
+    def replace(self, data: dict):
+        """Replaces every value at once, written right away."""
+        with self.lock, self.file_lock:
+            self.cancelFlush()
+            self.values = dict(data)
+            self.dirty_keys.clear()
+            self.writeFile(self.values)
+
+    def remove(self):
+        """Removes the environment file, along with every value."""
+        with self.lock, self.file_lock:
+            self.cancelFlush()
+            self.values, self.dirty_keys = {}, set()
+            if os.path.exists(self.file_path):
+                os.remove(self.file_path)
+            self.signature = None
+
+    def allocate(self, key: str, increment: int = 1, default_value: int = 0) -> int:
+        """
+        Increments a counter and returns its new value, which no other caller (in any process) receives.
+        The counter is read from the file and written back while the file lock is held, and the new value is
+        on disk before it's returned, so a crash can't hand out the same value twice.
+        """
+        with self.lock, self.file_lock:
+            self.cancelFlush()
+            data = self.readFile()
+            data.update({key: self.values[key] for key in self.dirty_keys if key in self.values})
+
+            current_value = data.get(key, default_value)
+            if not isinstance(current_value, (int, float)):
+                current_value = default_value
+            data[key] = current_value + increment
+
+            self.writeFile(data)
+            self.values = data
+            self.dirty_keys.clear()
+            return data[key]
+
+    # -- FLUSHING --------------------------------- #
+
+    def scheduleFlush(self):
+        if self.flush_timer is None:
+            self.flush_timer = threading.Timer(self.flush_delay, self.flush)
+            self.flush_timer.daemon = True
+            self.flush_timer.start()
+
+    def cancelFlush(self):
+        if self.flush_timer is not None:
+            self.flush_timer.cancel()
+            self.flush_timer = None
+
+    def flush(self):
+        """Writes the changed values, merged into the values currently in the file."""
+        with self.lock:
+            self.flush_timer = None
+            if not self.dirty_keys:
+                return
+
+            with self.file_lock:
+                try:
+                    data = self.readFile()
+                except Exception as e:
+                    # The values in memory were read from the file before, so they replace the unreadable file.
+                    print(f"Unable to read the environment values, rewriting them from memory: {e}")
+                    data = dict(self.values)
+
+                data.update({key: self.values[key] for key in self.dirty_keys if key in self.values})
+                try:
+                    self.writeFile(data)
+                except OSError as e:
+                    print(f"Unable to write the environment values: {e}")
+                    return
+
+                self.values = data
+                self.dirty_keys.clear()
@@ -0,0 +1,82 @@
+# Advisory file locks, which keep the processes of the program (such as the window and a background scheduler)
+# from modifying the same stored files at the same time.
+# Author: https://github.com/matkeg
+# Date: October 19th 2026
+
+import os, threading
+
+# ------------------------------------------------------------------------------------ #
+
+class FileLock:
+    """
+    An exclusive lock on a lock file, held by the `with` block across processes and the threads of this process.
+    - Uses `flock` on Unix and `msvcrt.locking` on Windows, both released by the system if the process dies.
+    - The lock can be re-entered by the thread holding it.
+    """
+
+    def __init__(self, lock_path: str):
+        self.lock_path = lock_path
+        self.thread_lock = threading.RLock()
+        self.depth = 0
+        self.handle = None
+        self.owner = None
+
+    def acquire(self):
+        self.thread_lock.acquire()
+        if self.depth == 0:
+            try:
+                try:
+                    self.handle = open(self.lock_path, "a+b")
+                except FileNotFoundError:
+                    os.makedirs(os.path.dirname(self.lock_path), exist_ok=True)
+                    self.handle = open(self.lock_path, "a+b")
+                if os.name == "nt":
+                    import msvcrt
+                    self.handle.seek(0)
+                    while True:
+                        try:
+                            # Gives up after about 10 seconds of retrying, so it's retried until the lock is taken.
+                            msvcrt.locking(self.handle.fileno(), msvcrt.LK_LOCK, 1)
+                            break
+                        except OSError:
+                            continue
+                else:
+                    import fcntl
+                    fcntl.flock(self.handle.fileno(), fcntl.LOCK_EX)
+            except BaseException:
+                if self.handle is not None:
+                    self.handle.close()
+                    self.handle = None
+                self.thread_lock.release()
+                raise
+            self.owner = threading.get_ident()
+        self.depth += 1
+
+    def release(self):
+        self.depth -= 1
+        if self.depth == 0:
+            self.owner = None
+            try:
+                if os.name == "nt":
+                    import msvcrt
+                    self.handle.seek(0)
+                    msvcrt.locking(self.handle.fileno(), msvcrt.LK_UNLCK, 1)
+                else:
+                    import fcntl
+                    fcntl.flock(self.handle.fileno(), fcntl.LOCK_UN)
+            finally:
+                self.handle.close()
+                self.handle = None
+        self.thread_lock.release()
+
+    def isOwned(self) -> bool:
+        """Tells whether the calling thread holds the lock."""
+        return self.owner == threading.get_ident()
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+        return False
@@ -2,14 +2,19 @@
 # Author: https://github.com/matkeg
 # Date: January 5th 2025
 
-import os
+import os, hashlib, heapq, threading, time, tempfile
+from collections import OrderedDict
 from enum import Enum
 from concurrent.futures import ThreadPoolExecutor
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Optional, Callable
 from PyQt5.QtWidgets import QLineEdit
+from PyQt5.QtCore import QThread, pyqtSignal
 
+from ..Features.fetcher import getFFlag
 from .Utils import warn, error
+from .AppDataLogic import save_data, load_data, remove_data, get_storage_folder_path, get_folder_files, StorageFolder, FileType
+from .ChangeJournal import ChangeJournal, ChangeJournalService
 
 class FolderData():
     def __init__(
@@ -17,6 +22,8 @@ class FolderData():
             folder_path: Optional[str] = "Unknown", folder_name: Optional[str] = "Unknown", 
             drive_letter: Optional[str] = "?:", folder_size: Optional[str] = "Unknown", 
             number_of_files: Optional[str] = "Unknown", number_of_folders: Optional[str] = "Unknown", 
+            is_partial: Optional[bool] = False, report: Optional['FolderReport'] = None,
+            folder_disk_size: Optional[str] = "Unknown", stats: Optional['FolderStats'] = None
         ):
         """Constructor to initialize the formatted folder data, which will be displayed to the user."""
         self.folder_path = folder_path
@@ -26,10 +33,22 @@ class FolderData():
         self.number_of_files = number_of_files
         self.number_of_folders = number_of_folders
 
+        # Space taken on the disk, with hardlinked files counted only once.
+        self.folder_disk_size = folder_disk_size
+
+        # Partial data comes from an analysis which is still ongoing.
+        self.is_partial = is_partial
+
+        # Largest files, folders and extensions of the folder, if they are known.
+        self.report = report
+
+        # Unformatted statistics the data was made from, if the folder was analyzed.
+        self.stats = stats
+
     def __repr__(self):
         return (
             f"FolderData(Path: {self.folder_path}, Name: {self.folder_name}, Drive: {self.drive_letter}, "
-            f"Size: {self.folder_size}, Files: {self.number_of_files}, Folders: {self.number_of_folders})"
+            f"Size: {self.folder_size}, Disk Size: {self.folder_disk_size}, Files: {self.number_of_files}, Folders: {self.number_of_folders})"
         )
 
 class AccessType(Enum):
@@ -44,15 +63,99 @@ class FolderStats:
     file_count: int = 0
     folder_count: int = 0
 
+    # Unique on-disk size, hardlinked files are counted once. None while it isn't known yet.
+    disk_size: Optional[int] = None
+
+@dataclass
+class FolderReport:
+    """Largest files and folders (as size and path pairs, largest first) and extension totals of a folder."""
+    largest_files: list[tuple[int, str]] = field(default_factory=list)
+    largest_folders: list[tuple[int, str]] = field(default_factory=list)
+
+    # Extensions (lowercase, without the dot) mapped to their file count and total size.
+    extensions: dict[str, list[int]] = field(default_factory=dict)
+
+    def getTopExtensions(self, count: int) -> list[tuple[str, int, int]]:
+        """Returns the extensions taking up the most space, as extension, file count and size."""
+        top_extensions = heapq.nlargest(count, self.extensions.items(), key=lambda item: item[1][1])
+        return [(extension, totals[0], totals[1]) for extension, totals in top_extensions]
+
+def parseFolderReport(data: dict) -> FolderReport:
+    """Rebuilds a folder report from its stored form, JSON turns its size and path pairs into lists."""
+    return FolderReport(
+        [tuple(item) for item in data.get("largest_files", [])],
+        [tuple(item) for item in data.get("largest_folders", [])],
+        data.get("extensions", {})
+    )
+
+class FolderAnalysisCancelled(Exception):
+    """Raised inside of an ongoing folder analysis once its cancellation was requested."""
+
+class FolderAnalysisProgress:
+    """Accumulates the partial totals of an ongoing folder analysis, and reports them at a limited rate."""
+
+    def __init__(
+            self, callback: Optional[Callable[[FolderStats], None]] = None, 
+            cancel_event: Optional[threading.Event] = None, interval: Optional[float] = 0.2
+        ):
+        self.callback = callback
+        self.cancel_event = cancel_event
+        self.interval = interval
+
+        self.stats = FolderStats()
+        self.lock = threading.Lock()
+        self.last_report = 0.0
+
+    def check(self):
+        """Raises FolderAnalysisCancelled if the cancellation of the analysis was requested."""
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise FolderAnalysisCancelled()
+
+    def add(self, total_size: int, file_count: int, folder_count: int):
+        """Adds the passed values to the partial totals, reporting them if enough time has passed."""
+        with self.lock:
+            self.stats.total_size += total_size
+            self.stats.file_count += file_count
+            self.stats.folder_count += folder_count
+
+            now = time.monotonic()
+            if self.callback is None or now - self.last_report < self.interval:
+                return
+            
+            self.last_report = now
+            partial_stats = FolderStats(self.stats.total_size, self.stats.file_count, self.stats.folder_count)
+
+        self.callback(partial_stats)
+
 # ------------------------------------------------------------------------------------ #
 
-def analyzeFolderChunk(chunk_path: str, max_depth: int = 15, current_depth: int = 0) -> FolderStats:
+def getDiskUsage(file_stat: os.stat_result) -> int:
+    """
+    Returns the space a file takes on the disk, which differs from its apparent size for sparse and small files.
+    Where allocated blocks aren't reported (Windows), the apparent size is used instead.
+    """
+    blocks = getattr(file_stat, "st_blocks", None)
+    if blocks is None:
+        return file_stat.st_size
+    return blocks * 512
+
+def isHardlinked(file_stat: os.stat_result) -> bool:
+    """
+    Checks whether other links point to the same file, these files have to be counted only once.
+    Note that `os.DirEntry.stat` always reports zero links on Windows, so hardlinks are only detected elsewhere.
+    """
+    return file_stat.st_nlink > 1
+
+def analyzeFolderChunk(chunk_path: str, max_depth: int = 15, current_depth: int = 0, seen_inodes: Optional[set] = None) -> FolderStats:
     """
     Analyzes a portion of the folder structure.
     - Includes a depth limit to prevent infinite recursion.
     - Handles inaccessible paths gracefully.
+    - Hardlinked files are added to the disk size only once, based on the passed `seen_inodes`.
     """
-    stats = FolderStats()
+    stats = FolderStats(disk_size=0)
+    if seen_inodes is None:
+        seen_inodes = set()
 
     # Prevent infinite recursion by limiting depth
     if current_depth >= max_depth:
@@ -63,36 +166,538 @@ def analyzeFolderChunk(chunk_path: str, max_depth: int = 15, current_depth: int
         with os.scandir(chunk_path) as entries:
             for entry in entries:
                 if entry.is_file(follow_symlinks=False):
+                    file_stat = entry.stat(follow_symlinks=False)
                     stats.file_count += 1
-                    stats.total_size += entry.stat().st_size
+                    stats.total_size += file_stat.st_size
+
+                    if isHardlinked(file_stat):
+                        if (file_stat.st_dev, file_stat.st_ino) in seen_inodes:
+                            continue
+                        seen_inodes.add((file_stat.st_dev, file_stat.st_ino))
+                    stats.disk_size += getDiskUsage(file_stat)
+
                 elif entry.is_dir(follow_symlinks=False):
-                    sub_stats = analyzeFolderChunk(entry.path, max_depth, current_depth + 1)
+                    sub_stats = analyzeFolderChunk(entry.path, max_depth, current_depth + 1, seen_inodes)
+                    stats.folder_count += 1 + sub_stats.folder_count
                     stats.file_count += sub_stats.file_count
-                    stats.folder_count += sub_stats.folder_count
                     stats.total_size += sub_stats.total_size
+                    stats.disk_size += sub_stats.disk_size
     except (PermissionError, FileNotFoundError) as e:
         print(f"Error accessing {chunk_path}: {e}")
     
     return stats
 
+# --- FOLDER STATISTICS CACHE -------------------------------------------------------- #
+
+# Every analyzed folder gets its own cache file inside the AppData "Storage" folder. The cache
+# holds a record for each directory of the analyzed tree, which only describes the entries
+# directly inside of that directory, the totals of a tree are assembled from those records.
+# A directory is only rescanned when its inode or modification time changes, the rest of the
+# tree is revalidated with a single stat call per directory. If the folder is being watched by
+# the ChangeJournal, only the directories it has recorded as changed are revisited at all.
+# Files with several hardlinks are kept aside inside of each record, and are deduplicated
+# by their device and inode once the records of the whole tree are assembled.
+
+FOLDER_STATS_CACHE_VERSION = 3
+
+# Indexes of the values stored inside a directory record, records are stored as lists
+# (instead of dictionaries) in order to keep the cache files small for large trees.
+RECORD_INODE = 0
+RECORD_MTIME = 1
+RECORD_SIZE = 2
+RECORD_FILES = 3
+RECORD_SUBFOLDERS = 4
+RECORD_LARGEST_FILES = 5
+RECORD_EXTENSIONS = 6
+RECORD_DISK_SIZE = 7
+RECORD_HARDLINKS = 8
+
+def getFolderReportSize() -> int:
+    """Returns how many of the largest files and folders are kept by the folder analysis."""
+    return getFFlag("FolderReportEntries") or 10
+
+class FolderStatsCache:
+    """Holds the cached per-directory records of a single analyzed folder."""
+
+    # Caches which were already loaded during this session, keyed by their file name, the least recently used first.
+    # Only `FolderStatsCacheLoadedLimit` of them are kept, the records of a large tree can take a lot of memory.
+    loaded_caches: OrderedDict[str, 'FolderStatsCache'] = OrderedDict()
+    loading_lock = threading.Lock()
+
+    def __init__(self, root_path: str):
+        self.root_path = os.path.normpath(root_path)
+        self.records: dict[str, list] = {}
+        self.totals = FolderStats()
+        self.report = FolderReport()
+        self.lock = threading.Lock()
+
+        # The ChangeJournal checkpoint the records are up to date with.
+        self.journal_checkpoint: Optional[list] = None
+
+        # Directories changed since the checkpoint, only set during a revalidation.
+        self.changed_directories: Optional[set[str]] = None
+
+    @staticmethod
+    def getCacheName(root_path: str) -> str:
+        """Returns the name of the cache file used for the passed folder."""
+        normalized_path = os.path.normcase(os.path.normpath(root_path))
+        return "folder_stats_" + hashlib.sha1(normalized_path.encode("utf-8")).hexdigest()[:16]
+
+    @classmethod
+    def getSummaryName(cls, root_path: str) -> str:
+        """Returns the name of the small file holding only the totals of the passed folder's cache."""
+        return cls.getCacheName(root_path) + "_summary"
+
+    @classmethod
+    def get(cls, root_path: str) -> 'FolderStatsCache':
+        """Returns the cache of the passed folder, loading it from the AppData unless it's among the recently used caches."""
+        cache_name = cls.getCacheName(root_path)
+
+        with cls.loading_lock:
+            cache = cls.loaded_caches.get(cache_name)
+            if cache is None:
+                cache = cls(root_path)
+                cache.load()
+                cls.loaded_caches[cache_name] = cache
+            else:
+                cls.loaded_caches.move_to_end(cache_name)
+
+            cls.evictLoadedCaches()
+
+        return cache
+
+    @classmethod
+    def evictLoadedCaches(cls):
+        """Forgets the least recently used caches above the limit, caches which are being updated are kept until they're done."""
+        limit = getFFlag("FolderStatsCacheLoadedLimit") or 8
+        for cache_name in list(cls.loaded_caches):
+            if len(cls.loaded_caches) <= limit:
+                break
+            if not cls.loaded_caches[cache_name].lock.locked():
+                del cls.loaded_caches[cache_name]
+
+    def load(self):
+        """Loads the stored records, incompatible or foreign cache files are ignored."""
+        data = load_data(self.getCacheName(self.root_path), StorageFolder.GENERAL, silent=True)
+        if not isinstance(data, dict):
+            return
+
+        if data.get("version") != FOLDER_STATS_CACHE_VERSION or data.get("root_path") != self.root_path:
+            return
+
+        self.records = data.get("records", {})
+        self.totals = FolderStats(*data.get("totals", (0, 0, 0, None)))
+
+        self.report = parseFolderReport(data.get("report", {}))
+        self.journal_checkpoint = data.get("journal_checkpoint")
+
+    def getReportData(self) -> dict:
+        return {
+            "largest_files": self.report.largest_files,
+            "largest_folders": self.report.largest_folders,
+            "extensions": self.report.extensions
+        }
+
+    def save(self) -> bool:
+        """Stores the records inside the AppData folder, along with a summary of their totals."""
+        save_data(
+            self.getSummaryName(self.root_path),
+            {
+                "version": FOLDER_STATS_CACHE_VERSION,
+                "root_path": self.root_path,
+                "totals": [self.totals.total_size, self.totals.file_count, self.totals.folder_count, self.totals.disk_size],
+                "report": self.getReportData()
+            },
+            StorageFolder.GENERAL,
+            FileType.JSON,
+            compact=True
+        )
+        return save_data(
+            self.getCacheName(self.root_path),
+            {
+                "version": FOLDER_STATS_CACHE_VERSION,
+                "root_path": self.root_path,
+                "totals": [self.totals.total_size, self.totals.file_count, self.totals.folder_count, self.totals.disk_size],
+                "report": self.getReportData(),
+                "journal_checkpoint": self.journal_checkpoint,
+                "records": self.records
+            },
+            StorageFolder.GENERAL,
+            FileType.JSON,
+            compact=True
+        )
+
+    # --------------------------------------------- #
+
+    @staticmethod
+    def scanDirectory(directory_path: str, directory_stat: os.stat_result) -> list:
+        """
+        Scans the entries directly inside of the passed directory and returns its record.
+        - Besides the totals, the record keeps the directory's largest files and its extension totals.
+        - Hardlinked files aren't added to the disk size, they are listed as device, inode and disk size instead.
+        """
+        record = [directory_stat.st_ino, directory_stat.st_mtime_ns, 0, 0, [], [], {}, 0, []]
+        report_size = getFolderReportSize()
+        largest_files = []
+        extensions = record[RECORD_EXTENSIONS]
+
+        try:
+            with os.scandir(directory_path) as entries:
+                for entry in entries:
+                    if entry.is_file(follow_symlinks=False):
+                        file_stat = entry.stat(follow_symlinks=False)
+                        file_size = file_stat.st_size
+                        record[RECORD_FILES] += 1
+                        record[RECORD_SIZE] += file_size
+
+                        if isHardlinked(file_stat):
+                            record[RECORD_HARDLINKS].append([file_stat.st_dev, file_stat.st_ino, getDiskUsage(file_stat)])
+                        else:
+                            record[RECORD_DISK_SIZE] += getDiskUsage(file_stat)
+
+                        if len(largest_files) < report_size:
+                            heapq.heappush(largest_files, (file_size, entry.name))
+                        elif file_size > largest_files[0][0]:
+                            heapq.heapreplace(largest_files, (file_size, entry.name))
+
+                        extension = os.path.splitext(entry.name)[1][1:].lower()
+                        extension_totals = extensions.setdefault(extension, [0, 0])
+                        extension_totals[0] += 1
+                        extension_totals[1] += file_size
+
+                    elif entry.is_dir(follow_symlinks=False):
+                        record[RECORD_SUBFOLDERS].append(entry.name)
+        except (PermissionError, FileNotFoundError) as e:
+            print(f"Error accessing {directory_path}: {e}")
+
+        record[RECORD_LARGEST_FILES] = [[name, size] for size, name in largest_files]
+        return record
+
+    @staticmethod
+    def buildReport(records: dict[str, list], root_path: str) -> FolderReport:
+        """Assembles the report of a whole tree from its directory records, without touching the disk."""
+        report_size = getFolderReportSize()
+        largest_files = []
+        extensions = {}
+        folder_sizes = {}
+
+        for directory_path, record in records.items():
+            folder_sizes[directory_path] = folder_sizes.get(directory_path, 0) + record[RECORD_SIZE]
+
+            for name, size in record[RECORD_LARGEST_FILES]:
+                if len(largest_files) < report_size:
+                    heapq.heappush(largest_files, (size, os.path.join(directory_path, name)))
+                elif size > largest_files[0][0]:
+                    heapq.heapreplace(largest_files, (size, os.path.join(directory_path, name)))
+
+            for extension, totals in record[RECORD_EXTENSIONS].items():
+                extension_totals = extensions.setdefault(extension, [0, 0])
+                extension_totals[0] += totals[0]
+                extension_totals[1] += totals[1]
+
+        # Add the size of every directory to its parents, deepest directories first.
+        for directory_path in sorted(records, key=lambda path: path.count(os.sep), reverse=True):
+            parent_path = os.path.dirname(directory_path)
+            if parent_path in folder_sizes and parent_path != directory_path:
+                folder_sizes[parent_path] += folder_sizes[directory_path]
+
+        # The analyzed folder isn't one of its own largest folders.
+        largest_folders = heapq.nlargest(
+            report_size, ((size, path) for path, size in folder_sizes.items() if path != root_path)
+        )
+
+        return FolderReport(sorted(largest_files, reverse=True), largest_folders, extensions)
+
+    @staticmethod
+    def sumDiskUsage(records: dict[str, list]) -> int:
+        """Sums the on-disk size of a whole tree from its directory records, counting every hardlinked file once."""
+        disk_size = 0
+        seen_inodes = set()
+
+        for record in records.values():
+            disk_size += record[RECORD_DISK_SIZE]
+
+            for device, inode, file_disk_size in record[RECORD_HARDLINKS]:
+                if (device, inode) not in seen_inodes:
+                    seen_inodes.add((device, inode))
+                    disk_size += file_disk_size
+
+        return disk_size
+
+    def revalidateDirectory(self, directory_path: str, valid_records: dict, progress: Optional[FolderAnalysisProgress] = None) -> Optional[list]:
+        """
+        Revalidates the record of a single directory, rescanning it only if its inode or modification time changed.
+        The revalidated record is added into the passed `valid_records` dictionary.
+        """
+        if progress is not None:
+            progress.check()
+
+        record = self.records.get(directory_path)
+
+        # Directories which the ChangeJournal didn't see changing are trusted without any syscalls.
+        is_trusted = (
+            record is not None and 
+            self.changed_directories is not None and 
+            directory_path not in self.changed_directories
+        )
+
+        if not is_trusted:
+            try:
+                directory_stat = os.stat(directory_path, follow_symlinks=False)
+            except OSError as e:
+                print(f"Error accessing {directory_path}: {e}")
+                return None
+
+            # Changed directories are always rescanned, since files modified in place don't change their mtime.
+            if (
+                record is None or 
+                self.changed_directories is not None or
+                record[RECORD_INODE] != directory_stat.st_ino or 
+                record[RECORD_MTIME] != directory_stat.st_mtime_ns
+            ):
+                record = self.scanDirectory(directory_path, directory_stat)
+
+        valid_records[directory_path] = record
+
+        if progress is not None:
+            progress.add(record[RECORD_SIZE], record[RECORD_FILES], len(record[RECORD_SUBFOLDERS]))
+
+        return record
+
+    def revalidate(
+            self, directory_path: str, valid_records: dict, progress: Optional[FolderAnalysisProgress] = None, 
+            max_depth: int = 15, current_depth: int = 0
+        ) -> FolderStats:
+        """
+        Revalidates the records of the passed directory and all of its subdirectories.
+        - Includes a depth limit to prevent infinite recursion.
+        - Revalidated records are collected into the passed `valid_records` dictionary.
+        """
+        stats = FolderStats()
+
+        # Prevent infinite recursion by limiting depth
+        if current_depth >= max_depth:
+            print(f"Skipping {directory_path}: Max recursion depth reached.")
+            return stats
+
+        record = self.revalidateDirectory(directory_path, valid_records, progress)
+        if record is None:
+            return stats
+
+        stats.total_size += record[RECORD_SIZE]
+        stats.file_count += record[RECORD_FILES]
+
+        for subfolder_name in record[RECORD_SUBFOLDERS]:
+            sub_stats = self.revalidate(
+                os.path.join(directory_path, subfolder_name), valid_records, progress, max_depth, current_depth + 1
+            )
+            stats.folder_count += 1 + sub_stats.folder_count
+            stats.file_count += sub_stats.file_count
+            stats.total_size += sub_stats.total_size
+
+        return stats
+
+    def update(self, max_workers: Optional[int] = None, progress: Optional[FolderAnalysisProgress] = None) -> Optional[FolderStats]:
+        """
+        Revalidates the whole cached tree and stores it if anything has changed.
+        - Returns None if the analysis was cancelled through the passed `progress`, the cache is left untouched.
+        
+        Keep in mind that a directory's modification time only changes when entries are added, 
+        removed or renamed, so unless the folder is watched by the ChangeJournal, files growing 
+        in place are only noticed once their directory changes.
+        """
+        with self.lock:
+            journal = ChangeJournal.find(self.root_path)
+            checkpoint = journal.getCheckpoint() if journal is not None else None
+            self.changed_directories = journal.getChangesSince(self.journal_checkpoint) if journal is not None else None
+
+            try:
+                return self.revalidateTree(max_workers, progress, checkpoint)
+            except FolderAnalysisCancelled:
+                return None
+            finally:
+                self.changed_directories = None
+
+    def revalidateTree(
+            self, max_workers: Optional[int] = None, progress: Optional[FolderAnalysisProgress] = None, 
+            checkpoint: Optional[list] = None
+        ) -> FolderStats:
+        """Revalidates the whole cached tree, should only be called through `update`."""
+        valid_records = {}
+
+        # The root folder is revalidated on its own, so its subfolders can be processed in parallel.
+        root_record = self.revalidateDirectory(self.root_path, valid_records, progress)
+        if root_record is None:
+            return FolderStats()
+
+        root_stats = FolderStats(root_record[RECORD_SIZE], root_record[RECORD_FILES], 0)
+
+        subfolder_paths = [os.path.join(self.root_path, name) for name in root_record[RECORD_SUBFOLDERS]]
+        thread_records = [{} for _ in subfolder_paths]
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="FolderAnalyzer") as executor:
+            results = list(executor.map(
+                lambda path, records: self.revalidate(path, records, progress), subfolder_paths, thread_records
+            ))
+
+        for result in results:
+            root_stats.folder_count += 1 + result.folder_count
+            root_stats.file_count += result.file_count
+            root_stats.total_size += result.total_size
+
+        for records in thread_records:
+            valid_records.update(records)
+
+        root_stats.disk_size = self.sumDiskUsage(valid_records)
+
+        # Records of removed directories are dropped, since they aren't revalidated.
+        has_changed = (
+            len(valid_records) != len(self.records) or
+            root_stats != self.totals or
+            any(self.records.get(path) != record for path, record in valid_records.items())
+        )
+
+        self.records = valid_records
+        self.totals = root_stats
+        self.journal_checkpoint = checkpoint
+
+        if has_changed or not self.report.extensions:
+            self.report = self.buildReport(valid_records, self.root_path)
+
+        if has_changed:
+            self.save()
+
+        return root_stats
+
 # ------------------------------------------------------------------------------------ #
 
+def getCachedFolderStats(folder_path: str, max_workers: Optional[int] = None, progress: Optional[FolderAnalysisProgress] = None) -> Optional[FolderStats]:
+    """Returns the statistics of the passed folder, rescanning only the directories which have changed."""
+    return FolderStatsCache.get(folder_path).update(max_workers, progress)
+
+def getCachedFolderReport(folder_path: str) -> FolderReport:
+    """Returns the report of the passed folder from its last analysis, which is empty if it was never analyzed."""
+    return FolderStatsCache.get(folder_path).report
+
+def loadFolderSummary(folder_path: str) -> Optional[tuple[FolderStats, FolderReport]]:
+    """
+    Returns the totals and the report of the passed folder's last analysis, if there was one, from its summary file.
+    The per-directory records aren't loaded, so this is cheap enough for the GUI thread.
+    """
+    root_path = os.path.normpath(folder_path)
+    cache = FolderStatsCache.loaded_caches.get(FolderStatsCache.getCacheName(root_path))
+    if cache is not None and cache.records:
+        return (
+            FolderStats(cache.totals.total_size, cache.totals.file_count, cache.totals.folder_count, cache.totals.disk_size),
+            cache.report
+        )
+
+    data = load_data(FolderStatsCache.getSummaryName(root_path), StorageFolder.GENERAL, silent=True)
+    if not isinstance(data, dict) or data.get("version") != FOLDER_STATS_CACHE_VERSION or data.get("root_path") != root_path:
+        return None
+    return FolderStats(*data.get("totals", (0, 0, 0, None))), parseFolderReport(data.get("report", {}))
+
+def peekFolderSummary(folder_path: str) -> Optional[FolderStats]:
+    """Returns the totals of the passed folder's last analysis, if there was one, from its summary file."""
+    summary = loadFolderSummary(folder_path)
+    return summary[0] if summary is not None else None
+
+def pruneFolderStatsCaches(folder_paths: list[str]) -> int:
+    """
+    Removes the stored caches (and summaries) of folders which aren't among the passed folders,
+    once they weren't updated for `FolderStatsCacheMaxAgeDays`. Returns the amount of removed files.
+    - Folders analyzed in the setup window are only cached until then, in case they're about to be registered.
+    - Caches loaded during this session are kept, they're still in use.
+    """
+    max_age = (getFFlag("FolderStatsCacheMaxAgeDays") or 30) * 86400
+    kept_names = {FolderStatsCache.getCacheName(folder_path) for folder_path in folder_paths}
+    kept_names |= set(FolderStatsCache.loaded_caches)
+
+    storage_path = get_storage_folder_path(StorageFolder.GENERAL)
+    removed_files = 0
+
+    for file_name in get_folder_files(storage_path):
+        name = os.path.splitext(file_name)[0]
+        if not name.startswith("folder_stats_") or name.removesuffix("_summary") in kept_names:
+            continue
+
+        try:
+            if time.time() - os.stat(os.path.join(storage_path, file_name)).st_mtime < max_age:
+                continue
+        except FileNotFoundError:
+            continue
+
+        if remove_data(name, StorageFolder.GENERAL):
+            removed_files += 1
+
+    return removed_files
+
+# ------------------------------------------------------------------------------------ #
+
+class PathResolver:
+    """
+    Resolves paths (following symbolic links and normalizing their case), caching the results for a short amount of time.
+    Paths are compared while the user types, so the same few paths are resolved over and over again.
+    """
+
+    # Cached resolved paths, keyed by the passed path. Each result holds the time of the resolution and the components.
+    results: dict[str, tuple[float, tuple[str, ...]]] = {}
+    lock = threading.Lock()
+
+    @classmethod
+    def resolve(cls, path: str) -> tuple[str, ...]:
+        """Returns the components of the resolved path, the drive (or root) being the first component."""
+        time_to_live = getFFlag("PathProbeCacheSeconds") or 30
+
+        with cls.lock:
+            result = cls.results.get(path)
+            if result is not None and time.monotonic() - result[0] < time_to_live:
+                return result[1]
+
+        components = splitPathComponents(os.path.normcase(os.path.realpath(path)))
+
+        with cls.lock:
+            # Paths typed character by character would otherwise pile up.
+            if len(cls.results) >= 4096:
+                cls.results.clear()
+            cls.results[path] = (time.monotonic(), components)
+
+        return components
+
+    @classmethod
+    def invalidate(cls):
+        with cls.lock:
+            cls.results.clear()
+
+def splitPathComponents(path: str) -> tuple[str, ...]:
+    """Splits an absolute path into its components, such as ("C:", "Users", "Data") or ("/", "home", "data")."""
+    drive, rest = os.path.splitdrive(path)
+    return (drive or os.sep,) + tuple(part for part in rest.split(os.sep) if part)
+
+def getComparablePath(path: str) -> str:
+    """Resolves the passed path, and normalizes its case on case-insensitive systems, so paths can be compared."""
+    return os.path.normcase(os.path.realpath(path))
+
+def isPathUnderFolder(path: str, folder_path: str) -> bool:
+    """
+    Check if the path is the folder itself, or is located inside of it.
+    Paths are compared by their components, so "C:/Data2" isn't considered to be inside of "C:/Data".
+    """
+    path_components = PathResolver.resolve(path)
+    folder_components = PathResolver.resolve(folder_path)
+    return path_components[:len(folder_components)] == folder_components
+
 def arePathsUnderSameFolder(path1: str, path2: str) -> bool:
     """Check if one path is a subdirectory of the other."""
-    real_path1 = os.path.realpath(path1)
-    real_path2 = os.path.realpath(path2)
-
     # Check if path1 is a subdirectory of path2 or vice versa
-    return real_path1.startswith(real_path2) or real_path2.startswith(real_path1)
+    return isPathUnderFolder(path1, path2) or isPathUnderFolder(path2, path1)
 
 # ------------------------------------------------------------------------------------ #
 
 def arePathsTheSame(path1: str, path2: str) -> bool:
     """Check if two paths point to the same file or directory."""
     try:
-        real_path1 = os.path.realpath(path1)
-        real_path2 = os.path.realpath(path2)
-        return real_path1 == real_path2
+        return PathResolver.resolve(path1) == PathResolver.resolve(path2)
     except Exception as e:
         print(f"Error comparing paths: {e}")
         return None
@@ -109,6 +714,142 @@ def formatStorageSize(valueInBytes: int) -> str:
         valueInBytes /= power
     return f"{valueInBytes:.2f} YB"
 
+def formatDuration(valueInSeconds: float) -> str:
+    """Converts a duration in seconds to a short, readable form, such as "1h 5m"."""
+    valueInSeconds = int(round(valueInSeconds))
+    if valueInSeconds < 60:
+        return f"{valueInSeconds}s"
+    
+    hours, remainder = divmod(valueInSeconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours == 0:
+        return f"{minutes}m {seconds}s"
+    
+    return f"{hours}h {minutes}m"
+
+# ------------------------------------------------------------------------------------ #
+
+class PathProbe:
+    """
+    Probes folders for read and write access, caching the results for a short amount of time.
+    - Cheap checks (`os.access`, reading a single directory entry) are always done first.
+    - A probe file is only written where `os.access` can't tell whether a folder is writable.
+    - Cached results of a folder should be dropped through `invalidate` once the folder changes,
+      changes caused by the probe file itself are ignored, so watching a folder doesn't make it re-probe forever.
+    """
+
+    # Cached probe results, keyed by the normalized path and then by the access type, so a folder's results are dropped at once.
+    # Each result holds the time of the probe, whether access is allowed, and the error message.
+    # Only the `PathProbeCacheEntries` most recently probed folders are kept, like the loaded folder stats caches.
+    results: OrderedDict[str, dict[AccessType, tuple[float, bool, Optional[str]]]] = OrderedDict()
+    lock = threading.Lock()
+
+    # Modification times of the folders right after their probe file was removed, keyed by the normalized path.
+    # A folder which still has the same modification time hasn't changed since, other than by its probe.
+    probe_mtimes: dict[str, int] = {}
+
+    @staticmethod
+    def getCacheKey(folder_path: str) -> str:
+        return os.path.normcase(os.path.normpath(folder_path))
+
+    @classmethod
+    def probe(cls, folder_path: str, accessType: AccessType) -> tuple[bool, Optional[str]]:
+        """Returns whether the folder allows the specified access, and an error message if it does not."""
+        cache_key = cls.getCacheKey(folder_path)
+        time_to_live = getFFlag("PathProbeCacheSeconds") or 30
+
+        with cls.lock:
+            result = cls.results.get(cache_key, {}).get(accessType)
+            if result is not None and time.monotonic() - result[0] < time_to_live:
+                cls.results.move_to_end(cache_key)
+                return result[1], result[2]
+
+        if accessType == AccessType.ReadAndWrite:
+            allowed, message = cls.probe(folder_path, AccessType.Read)
+            if allowed:
+                allowed, message = cls.probe(folder_path, AccessType.Write)
+        else:
+            allowed, message = cls.probeAccess(folder_path, accessType)
+
+        with cls.lock:
+            cls.results.setdefault(cache_key, {})[accessType] = (time.monotonic(), allowed, message)
+            cls.results.move_to_end(cache_key)
+            cls.evictResults()
+
+        return allowed, message
+
+    @classmethod
+    def evictResults(cls):
+        """Drops the results of the least recently probed folders beyond the limit, has to be called while holding the lock."""
+        limit = getFFlag("PathProbeCacheEntries") or 1024
+        while len(cls.results) > limit:
+            cache_key, _ = cls.results.popitem(last=False)
+            cls.probe_mtimes.pop(cache_key, None)
+
+    @staticmethod
+    def getModificationTime(folder_path: str) -> Optional[int]:
+        try:
+            return os.stat(folder_path).st_mtime_ns
+        except OSError:
+            return None
+
+    @classmethod
+    def probeAccess(cls, folder_path: str, accessType: AccessType) -> tuple[bool, Optional[str]]:
+        """Probes the folder without using the cache, AccessType.ReadAndWrite is not handled here."""
+        try:
+            if accessType == AccessType.Read:
+                if not os.access(folder_path, os.R_OK | os.X_OK):
+                    raise PermissionError(f"Permission denied: '{folder_path}'")
+                
+                # Test read access by reading a single directory entry
+                with os.scandir(folder_path) as entries:
+                    next(entries, None)
+                return True, None
+
+            elif accessType == AccessType.Write:
+                if not os.access(folder_path, os.W_OK | os.X_OK):
+                    raise PermissionError(f"Permission denied: '{folder_path}'")
+                
+                # On Windows, os.access ignores ACLs and the read-only attribute of folders, 
+                # so a temporary file has to be created in order to be sure.
+                if os.name == "nt":
+                    file_descriptor, test_file_path = tempfile.mkstemp(prefix="TEMP_write_file", dir=folder_path)
+                    os.close(file_descriptor)
+                    os.remove(test_file_path)
+
+                    with cls.lock:
+                        cls.probe_mtimes[cls.getCacheKey(folder_path)] = cls.getModificationTime(folder_path)
+                return True, None
+
+        except (PermissionError, FileNotFoundError, OSError) as e:
+            return False, str(e)
+        
+        return False, None
+
+    @classmethod
+    def invalidate(cls, folder_path: Optional[str] = None):
+        """Drops the cached results of the passed folder, or of every folder if no folder is passed."""
+        with cls.lock:
+            if folder_path is None:
+                cls.results.clear()
+                cls.probe_mtimes.clear()
+                return
+
+            normalized_path = cls.getCacheKey(folder_path)
+
+            # The probe file itself changes the folder, which is not a reason to probe it again.
+            probe_mtime = cls.probe_mtimes.pop(normalized_path, None)
+            if probe_mtime is not None and probe_mtime == cls.getModificationTime(folder_path):
+                cls.probe_mtimes[normalized_path] = probe_mtime
+                return
+
+            cls.results.pop(normalized_path, None)
+
+# Changes recorded by the ChangeJournal also drop the cached probes of the changed folders.
+ChangeJournalService.addChangeListener(
+    lambda directory_path, name: PathProbe.invalidate(directory_path if name is None else os.path.join(directory_path, name))
+)
+
 # ------------------------------------------------------------------------------------ #
 
 def canAccessFolder(folder_path: str, accessType: Optional[AccessType] = AccessType.ReadAndWrite, noisy: Optional[bool] = False) -> bool:
@@ -116,6 +857,7 @@ def canAccessFolder(folder_path: str, accessType: Optional[AccessType] = AccessT
     Checks whether the passed folder is accessible for the specified type of access.
     - Ensures the folder exists and is a valid directory.
     - Verifies the current user has read, write, or read-and-write permissions.
+    - Results are cached by the PathProbe for a short amount of time.
     """
 
     if not isValidPath(folder_path, False):
@@ -123,40 +865,17 @@ def canAccessFolder(folder_path: str, accessType: Optional[AccessType] = AccessT
             warn(f"The path '{folder_path}' does not lead to a valid directory.", "Target Not Found")
         return False
 
-    try:
-        if accessType == AccessType.Read:
-            # Test read access by attempting to list directory contents
-            with os.scandir(folder_path) as entries:
-                _ = [entry for entry in entries]
-            return True
-
-        elif accessType == AccessType.Write:
-            # Test write access by attempting to create and delete a temporary file
-            test_file_path = os.path.join(folder_path, "TEMP_write_file")
-            with open(test_file_path, "w") as temp_file:
-                temp_file.write("Testing write access.")
-            os.remove(test_file_path)
-            return True
-
-        elif accessType == AccessType.ReadAndWrite:
-            # Test both read and write access
-            return (
-                canAccessFolder(folder_path, AccessType.Read, noisy) and
-                canAccessFolder(folder_path, AccessType.Write, noisy)
-            )
-
-    except (PermissionError, FileNotFoundError, OSError) as e:
-        if noisy is True:
-            error(
-                f"The folder you've selected, {folder_path}, does not allow for {accessType.name.lower()} operations. "
-                f"Please ensure to select a folder which is not {accessType.name.lower()} locked.\n\n"
-                f"{str(e)}",
-                "Access Denied"
-            )
+    allowed, message = PathProbe.probe(folder_path, accessType)
 
-        return False
+    if not allowed and noisy is True:
+        error(
+            f"The folder you've selected, {folder_path}, does not allow for {accessType.name.lower()} operations. "
+            f"Please ensure to select a folder which is not {accessType.name.lower()} locked.\n\n"
+            f"{message or ''}",
+            "Access Denied"
+        )
 
-    return False
+    return allowed
 
 # ------------------------------------------------------------------------------------ #
 
@@ -220,10 +939,11 @@ def isUsingBackupFolder(folder_path: str):
 
 # ------------------------------------------------------------------------------------ #
 
-def getFolderData(input: QLineEdit | str, accessType: Optional[AccessType] = AccessType.ReadAndWrite, max_workers: Optional[int] = None) -> FolderData:
+def validateFolderInput(input: QLineEdit | str, accessType: Optional[AccessType] = AccessType.ReadAndWrite) -> Optional[str]:
     """
-    Analyzes folder content using parallel processing.
-    Returns FolderData object with formatted information.
+    Returns the folder path of the passed input if it can be analyzed, otherwise returns None.
+    - Inaccessible paths are prompted to the user and cleared from the passed QLineEdit.
+    - Must be called from the GUI thread, since it might prompt the user.
     """
     if type(input) is QLineEdit:
         folder_path = input.text()
@@ -233,56 +953,101 @@ def getFolderData(input: QLineEdit | str, accessType: Optional[AccessType] = Acc
     # Check if the folder path is actually passed.
     # We do this to prevent prompts from 'canAccessFolder'.
     if len(folder_path) == 0:
-        return FolderData()
+        return None
 
     if not canAccessFolder(folder_path, accessType, True):
         if type(input) is QLineEdit:
             input.setText("")
 
-        # Return empty folder data for invalid paths.
-        return FolderData()
+        return None
 
     if not os.path.exists(folder_path):
-        return FolderData()
-
-    # Get top-level entries for parallel processing
-    top_level_dirs = []
-    initial_stats = FolderStats()
+        return None
     
-    try:
-        with os.scandir(folder_path) as entries:
-            for entry in entries:
-                if entry.is_file(follow_symlinks=False):
-                    initial_stats.file_count += 1
-                    initial_stats.total_size += entry.stat().st_size
-                elif entry.is_dir(follow_symlinks=False):
-                    initial_stats.folder_count += 1
-                    top_level_dirs.append(entry.path)
-    except PermissionError:
-        return FolderData()
-
-    # Process subdirectories in parallel
-    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="FolderAnalyzer") as executor:
-        results = executor.map(analyzeFolderChunk, top_level_dirs)
+    return folder_path
 
-    # Combine all results
-    for result in results:
-        initial_stats.file_count += result.file_count
-        initial_stats.folder_count += result.folder_count
-        initial_stats.total_size += result.total_size
-
-    # Format the results using existing utility
-    formatted_size = formatStorageSize(initial_stats.total_size)
-    
+def formatFolderData(folder_path: str, stats: FolderStats, is_partial: Optional[bool] = False, report: Optional[FolderReport] = None) -> FolderData:
+    """Formats the passed folder statistics into a FolderData object."""
     return FolderData(
         folder_path=folder_path,
         folder_name=os.path.basename(folder_path),
         drive_letter=os.path.splitdrive(folder_path)[0],
-        folder_size=formatted_size,
-        number_of_files=str(initial_stats.file_count),
-        number_of_folders=str(initial_stats.folder_count)
+        folder_size=formatStorageSize(stats.total_size),
+        number_of_files=str(stats.file_count),
+        number_of_folders=str(stats.folder_count),
+        is_partial=is_partial,
+        report=report,
+        folder_disk_size=formatStorageSize(stats.disk_size) if stats.disk_size is not None else "Unknown",
+        stats=stats
     )
 
+def getFolderData(input: QLineEdit | str, accessType: Optional[AccessType] = AccessType.ReadAndWrite, max_workers: Optional[int] = None) -> FolderData:
+    """
+    Analyzes folder content using parallel processing.
+    Returns FolderData object with formatted information.
+    """
+    folder_path = validateFolderInput(input, accessType)
+
+    # Return empty folder data for invalid paths.
+    if folder_path is None:
+        return FolderData()
+
+    # Revalidate the cached statistics, only changed directories are scanned again.
+    stats = getCachedFolderStats(folder_path, max_workers)
+    return formatFolderData(folder_path, stats, report=getCachedFolderReport(folder_path))
+
+# ------------------------------------------------------------------------------------ #
+
+class FolderAnalysisWorker(QThread):
+    """
+    Worker thread for analyzing a folder without blocking the GUI thread.
+    - The last stored statistics are emitted right away, if there are any.
+    - Otherwise, partial totals are emitted while the folder is being scanned.
+    - The inherited `finished` signal is emitted once the thread has stopped, so the worker can be deleted then.
+    """
+    progress = pyqtSignal(object)
+    folder_data = pyqtSignal(object)
+
+    def __init__(self, folder_path: str, max_workers: Optional[int] = None):
+        super().__init__()
+        self.folder_path = folder_path
+        self.max_workers = max_workers
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        """Requests the cancellation of the analysis, no data will be emitted afterwards."""
+        self.cancel_event.set()
+
+    def isCancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def emitProgress(self, stats: FolderStats, report: Optional[FolderReport] = None):
+        if not self.isCancelled():
+            self.progress.emit(formatFolderData(self.folder_path, stats, True, report))
+
+    def run(self):
+        """Main method that runs in the thread."""
+        try:
+            # The summary is shown right away, the full cache is only loaded to revalidate it.
+            summary = loadFolderSummary(self.folder_path)
+            if summary is not None:
+                self.emitProgress(*summary)
+
+            # Stream partial totals only when there's nothing better to show.
+            progress = FolderAnalysisProgress(
+                self.emitProgress if summary is None else None, 
+                self.cancel_event
+            )
+
+            stats = getCachedFolderStats(self.folder_path, self.max_workers, progress)
+            if stats is not None and not self.isCancelled():
+                self.folder_data.emit(formatFolderData(
+                    self.folder_path, stats, report=getCachedFolderReport(self.folder_path)
+                ))
+
+        except Exception as e:
+            print(f"Error analyzing {self.folder_path}: {e}")
+
 # ------------------------------------------------------------------------------------ #
 
 def get_last_two_subfolders(path: str) -> str:
@@ -0,0 +1,420 @@
+# Stores the backup history as an append-only log, as JSON Lines or as binary record frames, so logging
+# a backup appends a single entry instead of rewriting the whole history.
+# Author: https://github.com/matkeg
+# Date: October 19th 2026
+
+import os, json, struct, threading
+from contextlib import nullcontext
+from typing import BinaryIO, Callable, Iterator, Optional
+
+from ..Features.fetcher import getFFlag
+from .FileLock import FileLock
+from .AtomicWriter import writeFileAtomically
+from .RecordCodec import HISTORY_SCHEMA, LazyRecord, encodeFrame, decodeRecords, iterFrames, recordToDict
+
+INDEX_HEADER = struct.Struct("<4sIII")
+INDEX_MAGIC = b"RCHI"
+INDEX_VERSION = 2
+INDEX_OFFSET = struct.Struct("<Q")
+
+# ------------------------------------------------------------------------------------ #
+
+def isCompleteLine(line: bytes) -> bool:
+    """Tells whether a line holds a whole entry, lines cut short by a crash while appending don't."""
+    return line.startswith(b"{") and line.endswith(b"}\n")
+
+def decodeLines(data: bytes, matches: Optional[Callable[[dict], bool]] = None) -> list[dict]:
+    entries = []
+    for line in data.splitlines():
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(entry, dict) and (matches is None or matches(entry)):
+            entries.append(entry)
+    return entries
+
+def encodeEntry(entry: dict) -> bytes:
+    return json.dumps(entry, separators=(',', ':'), default=recordToDict).encode("utf-8") + b"\n"
+
+# ------------------------------------------------------------------------------------ #
+
+# Frames are the units a log format appends, indexes and reads, a line for JSON Lines and a record frame for binary logs.
+class JsonLinesFormat:
+    """Entries stored as JSON Lines, one entry per line."""
+    merges_frames = False
+    frame_size = 1
+
+    def encode(self, entries: list[dict]) -> bytes:
+        return b"".join(encodeEntry(entry) for entry in entries)
+
+    def decode(self, data: bytes, matches: Optional[Callable[[dict], bool]] = None) -> list[dict]:
+        return decodeLines(data, matches)
+
+    def iterFrames(self, log_file: BinaryIO) -> Iterator[tuple[bytes, int, bool]]:
+        """Yields the (line, entry count, is intact) of each line, a partial last line is either being written or was torn by a crash."""
+        for line in log_file:
+            if not line.endswith(b"\n"):
+                return
+            yield line, 1, isCompleteLine(line)
+
+    def isFrameStart(self, log_file: BinaryIO, offset: int) -> bool:
+        if offset == 0:
+            return True
+        log_file.seek(offset - 1)
+        return log_file.read(1) == b"\n"
+
+class BinaryFormat:
+    """
+    Entries stored as binary record frames (see RecordCodec), which load without parsing any JSON.
+    Each append writes a frame of its own, compactions merge them into frames of `HistoryLogFrameRecords` entries,
+    which share their strings, such as the paths repeating across every entry of a backup.
+    """
+    merges_frames = True
+
+    def __init__(self):
+        self.frame_size = getFFlag("HistoryLogFrameRecords") or 4096
+        self.string_cache = {}
+
+    def encode(self, entries: list[dict]) -> bytes:
+        frames = []
+        for start in range(0, len(entries), self.frame_size):
+            batch = [entry.toDict() if isinstance(entry, LazyRecord) else entry for entry in entries[start:start + self.frame_size]]
+            frames.append(encodeFrame(batch, HISTORY_SCHEMA))
+        return b"".join(frames)
+
+    def decode(self, data: bytes, matches: Optional[Callable[[dict], bool]] = None) -> list[dict]:
+        # The strings are shared across reads as well, there are only as many as there are distinct names and paths.
+        if len(self.string_cache) > 65536:
+            self.string_cache = {}
+        entries = decodeRecords(data, self.string_cache)
+        return entries if matches is None else [entry for entry in entries if matches(entry)]
+
+    def iterFrames(self, log_file: BinaryIO) -> Iterator[tuple[bytes, int, bool]]:
+        """Yields the (frame, entry count, is intact) of each frame, a partial last frame is either being written or was torn by a crash."""
+        return iterFrames(log_file)
+
+    def isFrameStart(self, log_file: BinaryIO, offset: int) -> bool:
+        log_file.seek(offset)
+        return next(self.iterFrames(log_file), (None, 0, False))[2]
+
+# ------------------------------------------------------------------------------------ #
+
+class HistoryLog:
+    """
+    An append-only log of history entries, with a sparse index holding the offset of a frame (see the formats) every N entries.
+    - Appends are a single write to the end of the file, which other processes can append to at the same time.
+    - The index lets the most recent entries be read from the end of the file, without parsing what's before them.
+    - Frames damaged by a crash are skipped when reading, and dropped by a compaction in the background.
+    - Appends and swaps of the log hold its file lock, so another process can't append while the log is swapped.
+    """
+
+    def __init__(self, log_path: str, file_lock: FileLock, log_format: Optional[JsonLinesFormat | BinaryFormat] = None):
+        self.log_path = log_path
+        self.file_lock = file_lock
+        self.format = log_format or JsonLinesFormat()
+        self.index_path = f"{log_path}.idx"
+        self.interval = getFFlag("HistoryLogIndexInterval") or 256
+        self.merge_threshold = getFFlag("HistoryLogMergeFrames") or 1024
+
+        self.lock = threading.RLock()
+        self.compaction_thread: Optional[threading.Thread] = None
+
+        # Offsets of the frames starting each run of N entries, the entries indexed since the last one and where they end.
+        self.checkpoints: list[int] = []
+        self.checkpoint_entries = 0
+        self.end = 0
+        self.file_id = None
+        self.damaged_frames = 0
+
+        # Frames holding a single entry, which a compaction would merge, counted up to the last checkpoint as well.
+        self.single_frames = 0
+        self.checkpoint_single_frames = 0
+
+        with self.lock:
+            self.loadIndex()
+            self.refresh()
+
+    # -- INDEX ------------------------------------ #
+
+    def reset(self):
+        self.checkpoints, self.checkpoint_entries, self.end, self.damaged_frames = [], 0, 0, 0
+        self.single_frames, self.checkpoint_single_frames = 0, 0
+
+    def loadIndex(self):
+        """Loads the saved checkpoints, leaving the index empty (to be rebuilt) if they don't match the log."""
+        self.reset()
+        try:
+            with open(self.index_path, "rb") as index_file:
+                data = index_file.read()
+            magic, version, interval, single_frames = INDEX_HEADER.unpack_from(data)
+            checkpoints = [offset for (offset,) in INDEX_OFFSET.iter_unpack(data[INDEX_HEADER.size:])]
+        except (OSError, struct.error):
+            return
+
+        if magic != INDEX_MAGIC or version != INDEX_VERSION or interval != self.interval or not checkpoints:
+            return
+
+        # The last checkpoint has to start a frame of the log, otherwise the log was rewritten since.
+        last_offset = checkpoints[-1]
+        try:
+            with open(self.log_path, "rb") as log_file:
+                if os.fstat(log_file.fileno()).st_size <= last_offset or not self.format.isFrameStart(log_file, last_offset):
+                    return
+        except OSError:
+            return
+
+        self.checkpoints = checkpoints
+        self.end = last_offset
+        self.single_frames = self.checkpoint_single_frames = single_frames
+
+    def saveIndex(self):
+        try:
+            writeFileAtomically(
+                self.index_path,
+                INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, self.interval, self.checkpoint_single_frames) +
+                b"".join(INDEX_OFFSET.pack(offset) for offset in self.checkpoints)
+            )
+        except OSError as e:
+            print(f"Unable to save the history log index: {e}")
+
+    def refresh(self):
+        """
+        Indexes the frames appended since the last refresh, by this or other processes.
+        The whole index is rebuilt if the log was replaced or truncated, such as by a compaction or a clear.
+        """
+        try:
+            stat = os.stat(self.log_path)
+        except FileNotFoundError:
+            self.reset()
+            self.file_id = None
+            return
+
+        file_id = (stat.st_dev, stat.st_ino)
+        if self.file_id is not None and (file_id != self.file_id or stat.st_size < self.end):
+            self.loadIndex()
+        self.file_id = file_id
+
+        if stat.st_size <= self.end:
+            return
+
+        checkpoint_count = len(self.checkpoints)
+        with open(self.log_path, "rb") as log_file:
+            log_file.seek(self.end)
+            offset = self.end
+            # A partial last frame is left for the next refresh.
+            for frame, entry_count, is_intact in self.format.iterFrames(log_file):
+                if not self.checkpoints or self.checkpoint_entries >= self.interval:
+                    self.checkpoints.append(offset)
+                    self.checkpoint_entries = 0
+                    self.checkpoint_single_frames = self.single_frames
+                if not is_intact:
+                    self.damaged_frames += 1
+                elif self.format.merges_frames and entry_count == 1:
+                    self.single_frames += 1
+
+                self.checkpoint_entries += max(entry_count, 1)
+                offset += len(frame)
+            self.end = offset
+
+        if len(self.checkpoints) != checkpoint_count:
+            self.saveIndex()
+
+        if self.damaged_frames or self.single_frames >= self.merge_threshold:
+            self.compactInBackground()
+
+    # -- READING ---------------------------------- #
+
+    def readRange(self, start: int, end: int) -> bytes:
+        with open(self.log_path, "rb") as log_file:
+            log_file.seek(start)
+            return log_file.read(end - start)
+
+    def iterateFrames(self) -> Iterator[list[dict]]:
+        """Yields the entries of each frame, oldest first, reading the log one frame at a time."""
+        # The log is opened while locked, so a compaction swapping the files meanwhile leaves this read unaffected.
+        with self.lock:
+            self.refresh()
+            end = self.end
+            if end == 0:
+                return
+            log_file = open(self.log_path, "rb")
+
+        with log_file:
+            offset = 0
+            for frame, _, _ in self.format.iterFrames(log_file):
+                offset += len(frame)
+                if offset > end:
+                    break
+                yield self.format.decode(frame)
+
+    def iterate(self) -> Iterator[dict]:
+        for entries in self.iterateFrames():
+            yield from entries
+
+    def read(self) -> list[dict]:
+        entries = []
+        for frame_entries in self.iterateFrames():
+            entries.extend(frame_entries)
+        return entries
+
+    def query(self, matches: Optional[Callable[[dict], bool]] = None, limit: Optional[int] = None) -> list[dict]:
+        """
+        Returns the entries passing the filter, oldest first.
+        With a limit, the log is read backwards one indexed segment at a time, until the most recent matching
+        entries are found, so the cost depends on how far back they are rather than on the size of the log.
+        """
+        if limit is None:
+            return [entry for entry in self.iterate() if matches is None or matches(entry)]
+
+        entries = []
+        with self.lock:
+            self.refresh()
+            boundaries = self.checkpoints + [self.end]
+
+            with open(self.log_path, "rb") if self.end else nullcontext() as log_file:
+                for index in range(len(boundaries) - 2, -1, -1):
+                    log_file.seek(boundaries[index])
+                    segment = log_file.read(boundaries[index + 1] - boundaries[index])
+
+                    entries = self.format.decode(segment, matches) + entries
+                    if len(entries) >= limit:
+                        break
+        return entries[-limit:] if limit > 0 else []
+
+    # -- WRITING ---------------------------------- #
+
+    def append(self, entry: dict):
+        data = self.format.encode([entry])
+
+        with self.lock, self.file_lock:
+            self.refresh()
+
+            # A frame torn by a crash is cut off first, as nothing else appends while the file lock is held,
+            # so the new entry doesn't get read as a part of it.
+            if os.path.exists(self.log_path) and os.path.getsize(self.log_path) > self.end:
+                os.truncate(self.log_path, self.end)
+
+            # A single write in append mode lands at the end of the file, whatever other processes appended.
+            descriptor = os.open(self.log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0))
+            try:
+                os.write(descriptor, data)
+            finally:
+                os.close(descriptor)
+
+            self.refresh()
+
+    def replace(self, entries: list[dict]):
+        """Replaces the whole log with the passed entries."""
+        temporary_path = f"{self.log_path}.tmp"
+        with self.lock, self.file_lock:
+            with open(temporary_path, "wb") as log_file:
+                log_file.write(self.format.encode(list(entries)))
+            self.swapLog(temporary_path)
+
+    def clear(self):
+        self.replace([])
+
+    def swapLog(self, temporary_path: str, tail_start: Optional[int] = None):
+        """
+        Swaps the log with the passed file and rebuilds the index, both locks have to be held.
+        Passing where the log ended when the file was written copies whatever was appended after that as well.
+        """
+        with open(temporary_path, "ab") as log_file:
+            if tail_start is not None:
+                self.refresh()
+                log_file.write(self.readRange(tail_start, self.end))
+
+            log_file.flush()
+            os.fsync(log_file.fileno())
+        os.replace(temporary_path, self.log_path)
+
+        self.reset()
+        self.file_id = None
+        self.refresh()
+        self.saveIndex()
+
+    # -- COMPACTION ------------------------------- #
+
+    def compact(
+            self, keep: Optional[Callable[[dict], bool]] = None, archive: Optional[Callable[[list[dict]], None]] = None,
+            select: Optional[Callable[[list[dict]], list[bool]]] = None
+        ) -> int:
+        """
+        Rewrites the log without its damaged frames (and without the entries `keep` or `select` reject, if passed),
+        merging the frames of binary logs.
+        - `keep` is called with the entries in the order they were logged.
+        - `select` is called once with every compacted entry, oldest first, and returns whether to keep each of them,
+          for rules depending on the whole history. The decisions are applied to the very entries it was passed.
+        - The rejected entries are passed to `archive` before the logs are swapped, so they're never lost.
+        - The log is read without holding the locks, appends made meanwhile are carried over when the logs are swapped.
+        Returns the amount of rejected entries.
+        """
+        with self.lock:
+            self.refresh()
+            compacted_id, compacted_end = self.file_id, self.end
+        if compacted_id is None:
+            return 0
+
+        rejected_entries = []
+        temporary_path = f"{self.log_path}.compacting"
+        try:
+            with open(self.log_path, "rb") as log_file, open(temporary_path, "wb") as temporary_file:
+                entries = self.iterateSnapshot(log_file, compacted_end)
+                if select is not None:
+                    entries = list(entries)
+                    decisions = select(entries)
+                    if all(decisions) and not self.damaged_frames:
+                        return 0
+                    remaining_decisions = iter(decisions)
+                    keep = lambda entry: next(remaining_decisions, True)
+
+                kept_entries = []
+                for entry in entries:
+                    if keep is None or keep(entry):
+                        kept_entries.append(entry)
+                    else:
+                        rejected_entries.append(entry)
+
+                    # Entries are written in batches, so binary logs get merged frames without holding the whole log.
+                    if len(kept_entries) >= max(self.format.frame_size, 4096):
+                        temporary_file.write(self.format.encode(kept_entries))
+                        kept_entries = []
+                temporary_file.write(self.format.encode(kept_entries))
+
+            with self.lock, self.file_lock:
+                # The log was replaced while compacting (such as by a clear), the compacted entries are outdated.
+                self.refresh()
+                if self.file_id != compacted_id:
+                    return 0
+
+                if rejected_entries and archive is not None:
+                    archive(rejected_entries)
+                self.swapLog(temporary_path, compacted_end)
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+
+        return len(rejected_entries)
+
+    def iterateSnapshot(self, log_file: BinaryIO, end: int) -> Iterator[dict]:
+        """Yields the entries of the opened log up to the passed end, which is where the log ended when it was opened."""
+        offset = 0
+        for frame, _, _ in self.format.iterFrames(log_file):
+            offset += len(frame)
+            if offset > end:
+                break
+            yield from self.format.decode(frame)
+
+    def compactInBackground(self):
+        if self.compaction_thread is not None and self.compaction_thread.is_alive():
+            return
+
+        def run():
+            try:
+                self.compact()
+            except Exception as e:
+                print(f"Unable to compact the history log: {e}")
+
+        self.compaction_thread = threading.Thread(target=run, name="HistoryLogCompaction", daemon=True)
+        self.compaction_thread.start()
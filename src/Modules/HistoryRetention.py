@@ -0,0 +1,176 @@
+# Keeps the backup history small by rotating old entries, according to the retention policy, into compressed
+# archive segments, which are never modified again and can still be queried for audits.
+# Author: https://github.com/matkeg
+# Date: October 19th 2026
+
+import os, re, gzip, json, time, uuid, threading
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional
+
+from ..Features.fetcher import getFFlag
+from .AppDataLogic import StorageFolder, get_storage_folder_path, get_environment_value, set_environment_value, rotate_history_data
+from .AtomicWriter import writeFileAtomically
+from .RecordCodec import recordToDict
+from .BackupLogic import BackupOperationResult
+
+SEGMENT_PATTERN = re.compile(r"history_(\d+)_(\d+)_[0-9a-f]+\.jsonl\.gz")
+
+# ------------------------------------------------------------------------------------ #
+
+@dataclass
+class RetentionPolicy:
+    """
+    Tells which history entries stay in the backup history, None disabling a rule.
+    - max_age_days: Entries older than this are rotated out.
+    - max_entries_per_backup: Only this many of the most recent entries of each backup are kept.
+    - failures_only_after_days: Past this age, only the entries of failed backups are kept.
+    """
+    max_age_days: Optional[float] = None
+    max_entries_per_backup: Optional[int] = None
+    failures_only_after_days: Optional[float] = None
+
+    @classmethod
+    def fromFFlags(cls) -> "RetentionPolicy":
+        # Setting a rule's flag to 0 disables the rule.
+        return cls(
+            getFFlag("HistoryRetentionMaxAgeDays") or None,
+            getFFlag("HistoryRetentionEntriesPerBackup") or None,
+            getFFlag("HistoryRetentionFailuresOnlyAfterDays") or None
+        )
+
+    def isEnabled(self) -> bool:
+        return any(rule is not None for rule in (self.max_age_days, self.max_entries_per_backup, self.failures_only_after_days))
+
+    def select(self, entries: list[dict], now: Optional[float] = None) -> list[bool]:
+        """Returns whether to keep each of the passed entries, which are ordered oldest first."""
+        now = now if now is not None else time.time()
+        decisions = [True] * len(entries)
+        kept_counts: dict[int, int] = {}
+
+        # Walks from the newest entry, so the per-backup limit keeps the most recent entries.
+        for index in reversed(range(len(entries))):
+            entry = entries[index]
+            age_days = (now - (entry.get("backup_time") or now)) / 86400
+
+            if self.max_age_days is not None and age_days > self.max_age_days:
+                decisions[index] = False
+            elif self.failures_only_after_days is not None and age_days > self.failures_only_after_days and \
+                    entry.get("operation_result") == BackupOperationResult.SUCCESS:
+                decisions[index] = False
+            elif self.max_entries_per_backup is not None:
+                backup_id = entry.get("backup_id")
+                kept_counts[backup_id] = kept_counts.get(backup_id, 0) + 1
+                decisions[index] = kept_counts[backup_id] <= self.max_entries_per_backup
+
+        return decisions
+
+# ------------------------------------------------------------------------------------ #
+
+@dataclass
+class ArchiveSegment:
+    path: str
+    first_time: int
+    last_time: int
+
+class HistoryArchive:
+    """
+    Rotated history entries, stored as gzip compressed JSON Lines segments.
+    Each segment is named after the time range of its entries, so queries only open the segments overlapping their range.
+    """
+
+    def __init__(self, folder_path: str):
+        self.folder_path = folder_path
+
+    def getSegments(self) -> list[ArchiveSegment]:
+        """Returns the segments, sorted by the time of their oldest entry."""
+        if not os.path.isdir(self.folder_path):
+            return []
+
+        segments = []
+        for filename in os.listdir(self.folder_path):
+            match = SEGMENT_PATTERN.fullmatch(filename)
+            if match:
+                segments.append(ArchiveSegment(os.path.join(self.folder_path, filename), int(match.group(1)), int(match.group(2))))
+        return sorted(segments, key=lambda segment: (segment.first_time, segment.last_time))
+
+    def addSegment(self, entries: list[dict]) -> str:
+        """Writes the entries into a new segment, which is complete on disk before this returns."""
+        times = [entry.get("backup_time") or 0 for entry in entries]
+        filename = f"history_{min(times)}_{max(times)}_{uuid.uuid4().hex[:8]}.jsonl.gz"
+
+        os.makedirs(self.folder_path, exist_ok=True)
+        content = b"".join(json.dumps(entry, separators=(',', ':'), default=recordToDict).encode("utf-8") + b"\n" for entry in entries)
+        segment_path = os.path.join(self.folder_path, filename)
+        writeFileAtomically(segment_path, gzip.compress(content))
+        return segment_path
+
+    def iterate(
+            self, since: Optional[int] = None, until: Optional[int] = None,
+            matches: Optional[Callable[[dict], bool]] = None
+        ) -> Iterator[dict]:
+        """Yields the archived entries within the time range which pass the filter, segment by segment, oldest segment first."""
+        for segment in self.getSegments():
+            if (since is not None and segment.last_time < since) or (until is not None and segment.first_time > until):
+                continue
+
+            with gzip.open(segment.path, "rb") as segment_file:
+                for line in segment_file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+
+                    backup_time = entry.get("backup_time") or 0
+                    if (since is not None and backup_time < since) or (until is not None and backup_time > until):
+                        continue
+                    if matches is None or matches(entry):
+                        yield entry
+
+def getHistoryArchive() -> HistoryArchive:
+    return HistoryArchive(os.path.join(get_storage_folder_path(StorageFolder.LOGS), "HistoryArchive"))
+
+# ------------------------------------------------------------------------------------ #
+
+def rotateBackupHistory(policy: Optional[RetentionPolicy] = None) -> int:
+    """Rotates the history entries rejected by the retention policy into a new archive segment, returns how many were rotated."""
+    policy = policy or RetentionPolicy.fromFFlags()
+    if not policy.isEnabled():
+        return 0
+
+    archive = getHistoryArchive()
+    rotated_count = rotate_history_data(policy.select, archive.addSegment)
+    set_environment_value("LastHistoryRotation", int(time.time()))
+    return rotated_count
+
+def getHistoryRotationInterval() -> float:
+    return (getFFlag("HistoryRotationIntervalHours") or 24) * 3600
+
+def isHistoryRotationDue() -> bool:
+    return time.time() - (get_environment_value("LastHistoryRotation", 0) or 0) >= getHistoryRotationInterval()
+
+_rotation_thread: Optional[threading.Thread] = None
+
+def startHistoryRotation():
+    """
+    Rotates the backup history in a background thread whenever it wasn't rotated within the rotation interval,
+    for as long as the program runs. The last rotation is stored, so restarts don't rotate any sooner.
+    """
+    global _rotation_thread
+    if _rotation_thread is not None and _rotation_thread.is_alive():
+        return
+
+    def run():
+        while True:
+            try:
+                if isHistoryRotationDue():
+                    rotated_count = rotateBackupHistory()
+                    if rotated_count:
+                        print(f"Rotated {rotated_count} backup history entries into the archive.")
+            except Exception as e:
+                print(f"Unable to rotate the backup history: {e}")
+
+            # Checked at least hourly, so another process rotating meanwhile delays the next rotation accordingly.
+            time.sleep(min(getHistoryRotationInterval(), 3600))
+
+    _rotation_thread = threading.Thread(target=run, name="HistoryRotation", daemon=True)
+    _rotation_thread.start()
@@ -0,0 +1,284 @@
+# Samples the disk I/O of the origin and destination devices while a backup runs, so a slow backup
+# can be pinned on the device it reads from, the device it writes to, or the copying itself.
+# Author: https://github.com/matkeg
+# Date: October 19th 2026
+
+import os, time, struct, threading
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+import psutil
+
+from ..Features.fetcher import getFFlag
+from .FileSystemUtils import formatStorageSize
+
+# A device which is busy for more than this share of the time can't take more work.
+SATURATED_BUSY_PERCENT = 80
+
+class TelemetryRole:
+    """Specifies whose I/O a sample describes."""
+    ORIGIN = "origin"
+    DESTINATION = "destination"
+    PROCESS = "process"
+
+    @staticmethod
+    def represent(value) -> str:
+        values = {
+            "origin": "Origin Device",
+            "destination": "Destination Device",
+            "process": "Backup Engine"
+        }
+        return values.get(value, "-")
+
+# ------------------------------------------------------------------------------------ #
+
+@dataclass
+class IoRates:
+    """I/O done per second during a single sampling interval, the busy percent is None where it isn't reported."""
+    read_rate: float = 0.0
+    write_rate: float = 0.0
+    iops: float = 0.0
+    busy_percent: Optional[float] = None
+
+    def describe(self) -> str:
+        busy = f", {self.busy_percent:.0f}% busy" if self.busy_percent is not None else ""
+        return (
+            f"R {formatStorageSize(self.read_rate)}/s, W {formatStorageSize(self.write_rate)}/s, "
+            f"{int(self.iops)} IOPS{busy}"
+        )
+
+@dataclass
+class IoSample:
+    timestamp: float
+    rates: dict[str, IoRates]
+
+# ------------------------------------------------------------------------------------ #
+
+def getDiskCounterName(path: str) -> Optional[str]:
+    """
+    Returns the name psutil reports the I/O counters of the passed path's device under, or None if it can't be found.
+    - On Linux, the device number of the path leads to its block device (such as "sda1" or "nvme0n1p2") through sysfs.
+    - On Windows, the counters are per physical disk ("PhysicalDriveN"), so the disk number of the drive letter is queried.
+    """
+    try:
+        if os.name == "nt":
+            import win32file
+
+            drive = os.path.splitdrive(os.path.abspath(path))[0]
+            handle = win32file.CreateFile(
+                f"\\\\.\\{drive}", 0, win32file.FILE_SHARE_READ | win32file.FILE_SHARE_WRITE,
+                None, win32file.OPEN_EXISTING, 0, None
+            )
+            try:
+                # IOCTL_STORAGE_GET_DEVICE_NUMBER returns the device type, disk number and partition number.
+                device_number = win32file.DeviceIoControl(handle, 0x2D1080, None, 12)
+            finally:
+                handle.Close()
+            return f"PhysicalDrive{struct.unpack('<III', device_number)[1]}"
+
+        device = os.stat(path).st_dev
+        device_path = os.path.realpath(f"/sys/dev/block/{os.major(device)}:{os.minor(device)}")
+        if os.path.isdir(device_path):
+            return os.path.basename(device_path)
+    except Exception as e:
+        print(f"Unable to find the I/O counters of {path}: {e}")
+
+    return None
+
+def getDeviceCounters(counter_names: set[str]) -> dict[str, tuple]:
+    """Reads the cumulative counters of the passed devices, as (read bytes, write bytes, operations, busy milliseconds)."""
+    counters = {}
+    for name, disk in (psutil.disk_io_counters(perdisk=True) or {}).items():
+        if name not in counter_names:
+            continue
+
+        # Only Linux reports the busy time, the read and write times elsewhere add up the queued requests instead.
+        busy_time = getattr(disk, "busy_time", None)
+        counters[name] = (disk.read_bytes, disk.write_bytes, disk.read_count + disk.write_count, busy_time)
+    return counters
+
+def getProcessCounters(process: psutil.Process) -> Optional[tuple]:
+    """Reads the cumulative I/O counters of the passed process, in the same shape as the device counters."""
+    try:
+        io = process.io_counters()
+    except (psutil.Error, AttributeError):
+        return None
+    return (io.read_bytes, io.write_bytes, io.read_count + io.write_count, None)
+
+def getRates(previous: tuple, current: tuple, elapsed: float) -> IoRates:
+    """Turns two cumulative counter readings into the rates in between."""
+    busy_percent = None
+    if previous[3] is not None and current[3] is not None:
+        busy_percent = min(100.0, (current[3] - previous[3]) / 10 / elapsed)
+
+    return IoRates(
+        (current[0] - previous[0]) / elapsed,
+        (current[1] - previous[1]) / elapsed,
+        (current[2] - previous[2]) / elapsed,
+        busy_percent
+    )
+
+# ------------------------------------------------------------------------------------ #
+
+class IoTelemetrySampler:
+    """
+    Samples the I/O of a running backup at a fixed interval into a ring buffer, in a separate thread.
+    - The origin and destination devices are sampled through their disk counters, which include I/O of other programs.
+    - The process counters tell how much of that I/O is done by this program.
+    - Samplers register themselves by backup id while running, so views can show the live rates.
+    """
+    active: dict[int, "IoTelemetrySampler"] = {}
+    lock = threading.Lock()
+
+    def __init__(self, backup_id: int, origin_folder: str, destination_folder: str):
+        self.backup_id = backup_id
+        self.interval = getFFlag("IoTelemetryIntervalSeconds") or 1
+        self.samples: deque[IoSample] = deque(maxlen=getFFlag("IoTelemetryBufferSize") or 600)
+
+        self.counter_names = {
+            TelemetryRole.ORIGIN: getDiskCounterName(origin_folder),
+            TelemetryRole.DESTINATION: getDiskCounterName(destination_folder)
+        }
+        self.process = psutil.Process()
+
+        self.started_at = None
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def readCounters(self) -> dict[str, tuple]:
+        device_counters = getDeviceCounters({name for name in self.counter_names.values() if name is not None})
+
+        counters = {
+            role: device_counters[name] for role, name in self.counter_names.items()
+            if name in device_counters
+        }
+
+        process_counters = getProcessCounters(self.process)
+        if process_counters is not None:
+            counters[TelemetryRole.PROCESS] = process_counters
+        return counters
+
+    def start(self):
+        self.started_at = time.time()
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, name=f"IoTelemetry{self.backup_id}", daemon=True)
+        self.thread.start()
+
+        with IoTelemetrySampler.lock:
+            IoTelemetrySampler.active[self.backup_id] = self
+
+    def stop(self):
+        with IoTelemetrySampler.lock:
+            if IoTelemetrySampler.active.get(self.backup_id) is self:
+                del IoTelemetrySampler.active[self.backup_id]
+
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def run(self):
+        """Main method that runs in the thread."""
+        previous_time, previous = time.monotonic(), self.readCounters()
+
+        # The last sample is taken once stopped, so runs shorter than the interval are still sampled.
+        while True:
+            is_stopping = self.stop_event.wait(self.interval)
+            current_time, current = time.monotonic(), self.readCounters()
+            elapsed = max(current_time - previous_time, 1e-6)
+
+            rates = {role: getRates(previous[role], counters, elapsed) for role, counters in current.items() if role in previous}
+            with IoTelemetrySampler.lock:
+                self.samples.append(IoSample(time.time(), rates))
+
+            if is_stopping:
+                break
+            previous_time, previous = current_time, current
+
+    # --------------------------------------------- #
+
+    def getSamples(self) -> list[IoSample]:
+        with IoTelemetrySampler.lock:
+            return list(self.samples)
+
+    def getLatest(self) -> Optional[IoSample]:
+        with IoTelemetrySampler.lock:
+            return self.samples[-1] if self.samples else None
+
+    @classmethod
+    def getActive(cls, backup_id: int) -> Optional["IoTelemetrySampler"]:
+        with cls.lock:
+            return cls.active.get(backup_id)
+
+    def summarize(self) -> Optional[dict]:
+        """
+        Summarizes the samples, to be stored with the history entry of the run. Returns None if nothing was sampled.
+        The samples are averaged down to a fixed amount of points, so long runs don't bloat the history.
+        """
+        samples = self.getSamples()
+        if not samples:
+            return None
+
+        point_count = getFFlag("IoTelemetryPersistedSamples") or 60
+        bucket_size = -(-len(samples) // point_count)
+        points = [
+            {"time": round(bucket[0].timestamp - self.started_at, 1), "rates": averageRates(bucket)}
+            for bucket in (samples[index:index + bucket_size] for index in range(0, len(samples), bucket_size))
+        ]
+
+        average = averageRates(samples)
+        return {
+            "interval": self.interval,
+            "average": average,
+            "bottleneck": findBottleneck({role: IoRates(**rates) for role, rates in average.items()}),
+            "samples": points
+        }
+
+def averageRates(samples: list[IoSample]) -> dict[str, dict]:
+    """Averages the rates of each role over the passed samples, as dictionaries ready to be stored."""
+    roles = {role for sample in samples for role in sample.rates}
+
+    averages = {}
+    for role in roles:
+        rates = [sample.rates[role] for sample in samples if role in sample.rates]
+        busy = [entry.busy_percent for entry in rates if entry.busy_percent is not None]
+        averages[role] = asdict(IoRates(
+            sum(entry.read_rate for entry in rates) / len(rates),
+            sum(entry.write_rate for entry in rates) / len(rates),
+            sum(entry.iops for entry in rates) / len(rates),
+            sum(busy) / len(busy) if busy else None
+        ))
+    return averages
+
+def findBottleneck(rates: dict[str, IoRates]) -> str:
+    """
+    Tells which role held the backup back, the busiest saturated device or otherwise the backup engine.
+    Without busy times (on Windows), the device can't be told apart from the engine, so "unknown" is returned.
+    """
+    devices = {
+        role: rates[role].busy_percent for role in (TelemetryRole.ORIGIN, TelemetryRole.DESTINATION)
+        if role in rates and rates[role].busy_percent is not None
+    }
+    if not devices:
+        return "unknown"
+
+    busiest_role = max(devices, key=devices.get)
+    if devices[busiest_role] >= SATURATED_BUSY_PERCENT:
+        return busiest_role
+    return TelemetryRole.PROCESS
+
+def getTelemetryProperties(telemetry: Optional[dict]) -> list[tuple[str, str]]:
+    """Returns the stored telemetry as property rows, to be shown next to the rest of a history entry."""
+    if not telemetry:
+        return [("Origin I/O", "-"), ("Destination I/O", "-"), ("Limited By", "-")]
+
+    average = telemetry.get("average", {})
+    def describeRole(role: str) -> str:
+        return IoRates(**average[role]).describe() if role in average else "-"
+
+    return [
+        ("Origin I/O", describeRole(TelemetryRole.ORIGIN)),
+        ("Destination I/O", describeRole(TelemetryRole.DESTINATION)),
+        ("Limited By", TelemetryRole.represent(telemetry.get("bottleneck")))
+    ]
@@ -0,0 +1,217 @@
+# Finds conflicts between the folders of every registered backup at once, such as backups whose origin and
+# destination share a partition, or backups which write into the folders other backups read from.
+# Author: https://github.com/matkeg
+# Date: October 19th 2026
+
+import os, zlib, threading
+from dataclasses import dataclass, field
+from typing import Optional
+
+from .BackupLogic import BackupScheduleData
+from .FileSystemUtils import getComparablePath, splitPathComponents
+
+class ConflictType:
+    """Specifies how the folders of backups conflict."""
+    SAME_PARTITION = 0
+    NESTED = 1
+    CHAINED = 2
+    SHARED_DESTINATION = 3
+
+    @staticmethod
+    def represent(value) -> str:
+        values = {
+            0: "Origin and destination are on the same partition",
+            1: "Origin and destination are nested within one another",
+            2: "Copies data into the origin of another backup",
+            3: "Shares its destination with another backup"
+        }
+        return values.get(value, "-")
+
+class FolderRole:
+    ORIGIN = 0
+    DESTINATION = 1
+
+# ------------------------------------------------------------------------------------ #
+
+@dataclass
+class PartitionConflict:
+    conflict_type: int
+    backup_id: int
+    path: str
+    other_backup_id: Optional[int] = None
+    other_path: Optional[str] = None
+
+@dataclass
+class PartitionReport:
+    """Holds the conflicts found among the analyzed backups, indexed by the ids of the backups involved."""
+    conflicts: list[PartitionConflict] = field(default_factory=list)
+    by_backup: dict[int, list[PartitionConflict]] = field(default_factory=dict)
+
+    def addConflict(self, conflict: PartitionConflict):
+        self.conflicts.append(conflict)
+        self.by_backup.setdefault(conflict.backup_id, []).append(conflict)
+        if conflict.other_backup_id is not None and conflict.other_backup_id != conflict.backup_id:
+            self.by_backup.setdefault(conflict.other_backup_id, []).append(conflict)
+
+    def getConflicts(self, backup_id: int) -> list[PartitionConflict]:
+        return self.by_backup.get(backup_id, [])
+
+    def hasConflictType(self, conflict_type: int) -> bool:
+        return any(conflict.conflict_type == conflict_type for conflict in self.conflicts)
+
+@dataclass
+class ResolvedFolder:
+    backup_id: int
+    role: int
+    path: str
+    components: tuple[str, ...]
+
+# ------------------------------------------------------------------------------------ #
+
+def getPartitionId(path: str) -> Optional[int]:
+    """
+    Returns an id of the partition (file system) the passed path is on, the closest existing folder above it is used.
+    On Windows this is the volume serial number, elsewhere the device number. Returns None for unavailable drives.
+    """
+    while not os.path.exists(path):
+        parent_path = os.path.dirname(path)
+        if parent_path == path:
+            return None
+        path = parent_path
+
+    try:
+        return os.stat(path).st_dev
+    except OSError:
+        return None
+
+def getMountSignature() -> Optional[int]:
+    """Returns a checksum of the mounted partitions, which changes whenever a partition is mounted or unmounted."""
+    try:
+        if os.name == "nt":
+            import win32api
+            return win32api.GetLogicalDrives()
+
+        with open("/proc/self/mountinfo", "rb") as mount_info:
+            return zlib.crc32(mount_info.read())
+    except Exception:
+        return None
+
+def describeConflict(conflict: PartitionConflict, names: dict[int, str]) -> str:
+    """Returns a user-facing description of the conflict, the names are the friendly names of the backups by id."""
+    description = ConflictType.represent(conflict.conflict_type)
+    if conflict.other_backup_id is not None and conflict.other_backup_id != conflict.backup_id:
+        description += f" ({names.get(conflict.backup_id, '-')} and {names.get(conflict.other_backup_id, '-')})"
+    return description
+
+# ------------------------------------------------------------------------------------ #
+
+def findPartitionConflicts(backups: list[BackupScheduleData]) -> PartitionReport:
+    """
+    Finds the conflicts among the passed backups in a single pass.
+    - Every distinct folder is resolved (and its partition looked up) only once, however many backups share it.
+    - Nested folders are found by sorting the folders by their path components, which places every folder right
+      before the folders inside of it. A stack of the folders containing the current one then yields every nested
+      pair without comparing each folder with every other one.
+    """
+    report = PartitionReport()
+    resolved_paths: dict[str, str] = {}
+    partition_ids: dict[str, Optional[int]] = {}
+
+    def resolve(path: str) -> str:
+        if path not in resolved_paths:
+            resolved_paths[path] = getComparablePath(path)
+        return resolved_paths[path]
+
+    def getPartition(resolved_path: str) -> Optional[int]:
+        if resolved_path not in partition_ids:
+            partition_ids[resolved_path] = getPartitionId(resolved_path)
+        return partition_ids[resolved_path]
+
+    folders: list[ResolvedFolder] = []
+    for backup in backups:
+        origin_path = resolve(backup.origin_folder)
+        destination_path = resolve(backup.destination_folder)
+
+        for role, path in ((FolderRole.ORIGIN, origin_path), (FolderRole.DESTINATION, destination_path)):
+            folders.append(ResolvedFolder(
+                backup.backup_id, role, path, splitPathComponents(path)
+            ))
+
+        origin_partition = getPartition(origin_path)
+        if origin_partition is not None and origin_partition == getPartition(destination_path):
+            report.addConflict(PartitionConflict(
+                ConflictType.SAME_PARTITION, backup.backup_id, origin_path, backup.backup_id, destination_path
+            ))
+
+    folders.sort(key=lambda folder: folder.components)
+
+    containing_folders: list[ResolvedFolder] = []
+    for folder in folders:
+        while containing_folders and folder.components[:len(containing_folders[-1].components)] != containing_folders[-1].components:
+            containing_folders.pop()
+
+        for outer_folder in containing_folders:
+            conflict_type = getNestingConflictType(outer_folder, folder)
+            if conflict_type is None:
+                continue
+
+            # Chained conflicts are reported by the backup which writes into the other backup's origin.
+            writer, reader = outer_folder, folder
+            if conflict_type == ConflictType.CHAINED and outer_folder.role == FolderRole.ORIGIN:
+                writer, reader = folder, outer_folder
+
+            report.addConflict(PartitionConflict(
+                conflict_type, writer.backup_id, writer.path, reader.backup_id, reader.path
+            ))
+
+        containing_folders.append(folder)
+
+    return report
+
+def getNestingConflictType(outer_folder: ResolvedFolder, inner_folder: ResolvedFolder) -> Optional[int]:
+    """Tells how two nested (or equal) folders conflict, None if they don't, as with two backups of the same origin."""
+    if outer_folder.backup_id == inner_folder.backup_id:
+        return ConflictType.NESTED if outer_folder.role != inner_folder.role else None
+
+    if outer_folder.role == FolderRole.DESTINATION and inner_folder.role == FolderRole.DESTINATION:
+        return ConflictType.SHARED_DESTINATION
+    elif outer_folder.role != inner_folder.role:
+        return ConflictType.CHAINED
+    return None
+
+# ------------------------------------------------------------------------------------ #
+
+class PartitionConflictAnalyzer:
+    """Caches the conflict report of the registered backups, until their folders or the mounted partitions change."""
+    report: Optional[PartitionReport] = None
+    signature = None
+    lock = threading.Lock()
+
+    @classmethod
+    def analyze(cls, backups: list[BackupScheduleData]) -> PartitionReport:
+        signature = (
+            tuple((backup.backup_id, backup.origin_folder, backup.destination_folder) for backup in backups),
+            getMountSignature()
+        )
+
+        with cls.lock:
+            if cls.report is not None and cls.signature == signature:
+                return cls.report
+
+        report = findPartitionConflicts(backups)
+
+        with cls.lock:
+            cls.report, cls.signature = report, signature
+        return report
+
+    @classmethod
+    def invalidate(cls):
+        with cls.lock:
+            cls.report, cls.signature = None, None
+
+def analyzePartitionConflicts(backups: Optional[list[BackupScheduleData]] = None) -> PartitionReport:
+    """Returns the conflicts among the passed backups, or among every registered backup."""
+    if backups is None:
+        from .BackupRegistryViewLogic import getRegisteredBackups
+        backups = getRegisteredBackups()
+    return PartitionConflictAnalyzer.analyze(backups)
@@ -0,0 +1,380 @@
+# Encodes history and registry records into compact binary frames, with fixed-width fields for ids, timestamps
+# and enum codes and a table of interned strings, so large histories load without parsing JSON.
+# Author: https://github.com/matkeg
+# Date: October 19th 2026
+
+import os, json, math, struct, zlib
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import BinaryIO, Iterable, Iterator, Optional
+
+# Frames start with their magic, the size of their payload, the amount of records and the CRC32 of the payload.
+FRAME_HEADER = struct.Struct("<4sIII")
+FRAME_MAGIC = b"RCR1"
+PAYLOAD_HEADER = struct.Struct("<BII")
+
+# Every record starts with a mask of its present fields and the index of its extra fields (or NO_EXTRAS).
+RECORD_HEADER = struct.Struct("<II")
+NO_EXTRAS = 0xFFFFFFFF
+
+# Values standing for None in each kind of fixed-width field, string and JSON fields hold an index into their table.
+INT_NONE = -2 ** 63
+ENUM_NONE = -2 ** 15
+INDEX_NONE = 0xFFFFFFFF
+FIELD_FORMATS = {"int": "q", "enum": "h", "float": "d", "string": "I", "json": "I"}
+NONE_VALUES = {"int": INT_NONE, "enum": ENUM_NONE, "float": math.nan, "string": INDEX_NONE, "json": INDEX_NONE}
+MISSING = object()
+
+# ------------------------------------------------------------------------------------ #
+
+class RecordSchema:
+    """
+    The fixed-width fields of a kind of record, as (key, kind) pairs, kinds being "int", "enum", "float", "string" or "json".
+    Keys outside of the schema, and values the fixed-width fields can't hold, are stored as JSON along with the record.
+    """
+
+    def __init__(self, schema_id: int, fields: list[tuple[str, str]]):
+        self.schema_id = schema_id
+        self.fields = fields
+        self.keys = [key for key, _ in fields]
+        self.indexes = {key: index for index, (key, _) in enumerate(fields)}
+        self.none_values = [NONE_VALUES[kind] for _, kind in fields]
+
+        self.record_struct = struct.Struct("<II" + "".join(FIELD_FORMATS[kind] for _, kind in fields))
+        self.field_structs = []
+        offset = RECORD_HEADER.size
+        for _, kind in fields:
+            field_struct = struct.Struct("<" + FIELD_FORMATS[kind])
+            self.field_structs.append((field_struct, offset))
+            offset += field_struct.size
+
+    @staticmethod
+    def fits(kind: str, value: any) -> bool:
+        """Tells whether a value other than None can be stored in a field of that kind, and read back unchanged."""
+        if kind == "int":
+            return type(value) is int and INT_NONE < value < 2 ** 63
+        elif kind == "enum":
+            return type(value) is int and ENUM_NONE < value < 2 ** 15
+        elif kind == "float":
+            return type(value) is float and not math.isnan(value)
+        elif kind == "string":
+            return type(value) is str
+        return True
+
+HISTORY_SCHEMA = RecordSchema(1, [
+    ("backup_id", "int"),
+    ("backup_time", "int"),
+    ("operation_group", "enum"),
+    ("operation_result", "enum"),
+    ("copied_bytes", "int"),
+    ("copied_files", "int"),
+    ("duration", "float"),
+    ("backup_name", "string"),
+    ("origin_folder", "string"),
+    ("destination_folder", "string"),
+    ("telemetry", "json"),
+])
+
+REGISTRY_SCHEMA = RecordSchema(2, [
+    ("backup_id", "int"),
+    ("start_time", "int"),
+    ("initiation_type", "enum"),
+    ("recurrence_type", "enum"),
+    ("recurrence_step_unit", "enum"),
+    ("recurrence_step", "int"),
+    ("friendly_name", "string"),
+    ("origin_folder", "string"),
+    ("destination_folder", "string"),
+])
+
+# Records of any other kind are stored entirely as JSON.
+GENERIC_SCHEMA = RecordSchema(0, [])
+
+SCHEMAS = {schema.schema_id: schema for schema in (GENERIC_SCHEMA, HISTORY_SCHEMA, REGISTRY_SCHEMA)}
+
+def getSchemaFor(record: Mapping) -> RecordSchema:
+    """Returns the schema holding the most keys of the record in fixed-width fields."""
+    best_schema, best_count = GENERIC_SCHEMA, 0
+    for schema in SCHEMAS.values():
+        count = sum(1 for key in schema.keys if key in record)
+        if count > best_count:
+            best_schema, best_count = schema, count
+    return best_schema
+
+# ------------------------------------------------------------------------------------ #
+
+def packTable(items: list[bytes]) -> bytes:
+    """Packs byte strings as their end offsets followed by their contents."""
+    offsets, end = array("I"), 0
+    for item in items:
+        end += len(item)
+        offsets.append(end)
+    return offsets.tobytes() + b"".join(items)
+
+def unpackTable(payload: bytes, offset: int, count: int) -> tuple[list[bytes], int]:
+    """Unpacks a table packed by packTable, returns its items and where the table ends."""
+    offsets = array("I")
+    offsets.frombytes(payload[offset:offset + count * 4])
+    offset += count * 4
+
+    items, start = [], offset
+    for end in offsets:
+        items.append(payload[start:offset + end])
+        start = offset + end
+    return items, start
+
+def encodeFrame(records: list[Mapping], schema: Optional[RecordSchema] = None) -> bytes:
+    """Encodes the records into a single frame, every string of the frame being stored only once."""
+    schema = schema or (getSchemaFor(records[0]) if records else GENERIC_SCHEMA)
+    strings: dict[str, int] = {}
+    extras: list[bytes] = []
+    packed_records = []
+
+    for record in records:
+        mask, values, extra = 0, [], {}
+        for index, (key, kind) in enumerate(schema.fields):
+            value = record.get(key, MISSING)
+            if value is MISSING:
+                values.append(0)
+                continue
+            elif value is None:
+                values.append(schema.none_values[index])
+            elif kind == "string" and type(value) is str:
+                values.append(strings.setdefault(value, len(strings)))
+            elif kind == "json":
+                values.append(len(extras))
+                extras.append(json.dumps(value, separators=(',', ':'), default=recordToDict).encode("utf-8"))
+            elif schema.fits(kind, value):
+                values.append(value)
+            else:
+                extra[key] = value
+                values.append(0)
+                continue
+            mask |= 1 << index
+
+        # Any key not handled by the fields above is outside of the schema.
+        if len(extra) + bin(mask).count("1") < len(record):
+            extra.update((key, value) for key, value in record.items() if key not in schema.indexes)
+        extras_index = NO_EXTRAS
+        if extra:
+            extras_index = len(extras)
+            extras.append(json.dumps(extra, separators=(',', ':'), default=recordToDict).encode("utf-8"))
+
+        packed_records.append(schema.record_struct.pack(mask, extras_index, *values))
+
+    payload = b"".join([
+        PAYLOAD_HEADER.pack(schema.schema_id, len(strings), len(extras)),
+        packTable([string.encode("utf-8") for string in strings]),
+        packTable(extras),
+        *packed_records
+    ])
+    return FRAME_HEADER.pack(FRAME_MAGIC, len(payload), len(records), zlib.crc32(payload)) + payload
+
+def encodeRecords(records: Iterable[Mapping], frame_size: int = 4096) -> bytes:
+    """Encodes the records into frames of up to `frame_size` records each."""
+    frames, batch = [], []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= frame_size:
+            frames.append(encodeFrame(batch))
+            batch = []
+    if batch:
+        frames.append(encodeFrame(batch))
+    return b"".join(frames)
+
+# ------------------------------------------------------------------------------------ #
+
+class RecordFrame(Sequence):
+    """
+    The decoded records of a frame. The records stay packed in the payload, only their strings are decoded
+    up front, and each record is a view reading its fields from the payload when accessed.
+    """
+
+    def __init__(self, payload: bytes, record_count: int, string_cache: Optional[dict] = None):
+        schema_id, string_count, extras_count = PAYLOAD_HEADER.unpack_from(payload)
+        self.schema = SCHEMAS.get(schema_id)
+        if self.schema is None:
+            raise ValueError(f"Unknown record schema {schema_id}.")
+
+        # Strings repeating across the frames of a file are shared, rather than held once per frame.
+        string_cache = string_cache if string_cache is not None else {}
+        strings, offset = unpackTable(payload, PAYLOAD_HEADER.size, string_count)
+        self.strings = [string_cache.setdefault(string, string) for string in (item.decode("utf-8") for item in strings)]
+        self.extras, offset = unpackTable(payload, offset, extras_count)
+
+        self.payload = payload
+        self.records_start = offset
+        self.record_count = record_count
+        if len(payload) != offset + record_count * self.schema.record_struct.size:
+            raise ValueError("The frame's size doesn't match its records.")
+
+    def __len__(self) -> int:
+        return self.record_count
+
+    def __iter__(self) -> Iterator["LazyRecord"]:
+        record_size = self.schema.record_struct.size
+        end = self.records_start + self.record_count * record_size
+        return iter([LazyRecord(self, offset) for offset in range(self.records_start, end, record_size)])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.record_count))]
+        if index < 0:
+            index += self.record_count
+        if not 0 <= index < self.record_count:
+            raise IndexError(index)
+        return LazyRecord(self, self.records_start + index * self.schema.record_struct.size)
+
+    def unpackRecord(self, offset: int) -> dict:
+        mask, extras_index, *values = self.schema.record_struct.unpack_from(self.payload, offset)
+        record = {}
+        for index, (key, kind) in enumerate(self.schema.fields):
+            if mask & (1 << index):
+                record[key] = self.convert(kind, values[index])
+        if extras_index != NO_EXTRAS:
+            record.update(json.loads(self.extras[extras_index]))
+        return record
+
+    def convert(self, kind: str, value: any) -> any:
+        if kind == "string":
+            return None if value == INDEX_NONE else self.strings[value]
+        elif kind == "json":
+            return None if value == INDEX_NONE else json.loads(self.extras[value])
+        elif kind == "float":
+            return None if math.isnan(value) else value
+        elif kind == "enum":
+            return None if value == ENUM_NONE else value
+        return None if value == INT_NONE else value
+
+class LazyRecord(Mapping):
+    """A read-only record, its fields are only unpacked (and its JSON fields parsed) when accessed."""
+    __slots__ = ("frame", "offset")
+
+    def __init__(self, frame: RecordFrame, offset: int):
+        self.frame = frame
+        self.offset = offset
+
+    def getExtras(self) -> Optional[dict]:
+        (extras_index,) = struct.unpack_from("<I", self.frame.payload, self.offset + 4)
+        return json.loads(self.frame.extras[extras_index]) if extras_index != NO_EXTRAS else None
+
+    def __getitem__(self, key: str) -> any:
+        frame = self.frame
+        index = frame.schema.indexes.get(key)
+        if index is not None:
+            (mask,) = struct.unpack_from("<I", frame.payload, self.offset)
+            if mask & (1 << index):
+                field_struct, field_offset = frame.schema.field_structs[index]
+                (value,) = field_struct.unpack_from(frame.payload, self.offset + field_offset)
+                return frame.convert(frame.schema.fields[index][1], value)
+
+        # Keys outside of the schema, and values which didn't fit their field, are only found in the JSON fields.
+        extras = self.getExtras()
+        if extras is None or key not in extras:
+            raise KeyError(key)
+        return extras[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.toDict())
+
+    def __len__(self) -> int:
+        return len(self.toDict())
+
+    def toDict(self) -> dict:
+        return self.frame.unpackRecord(self.offset)
+
+    def __repr__(self) -> str:
+        return f"LazyRecord({self.toDict()!r})"
+
+def recordToDict(value: any) -> dict:
+    """Passed as the `default` of json.dumps, so records decoded from binary files can be stored as JSON."""
+    if isinstance(value, LazyRecord):
+        return value.toDict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+# ------------------------------------------------------------------------------------ #
+
+def readFrameHeader(data: bytes, offset: int = 0) -> Optional[tuple[int, int, int]]:
+    """Returns the payload size, record count and checksum of the frame at the offset, None if no frame starts there."""
+    if len(data) - offset < FRAME_HEADER.size:
+        return None
+    magic, payload_size, record_count, checksum = FRAME_HEADER.unpack_from(data, offset)
+    if magic != FRAME_MAGIC:
+        return None
+    return payload_size, record_count, checksum
+
+def decodeRecords(data: bytes, string_cache: Optional[dict] = None) -> list[LazyRecord]:
+    """Decodes the records of every whole, intact frame within the data."""
+    string_cache = string_cache if string_cache is not None else {}
+    records, offset = [], 0
+    while True:
+        header = readFrameHeader(data, offset)
+        if header is None:
+            break
+        payload_size, record_count, checksum = header
+
+        payload_start = offset + FRAME_HEADER.size
+        payload = data[payload_start:payload_start + payload_size]
+        offset = payload_start + payload_size
+        if len(payload) < payload_size:
+            break
+        if zlib.crc32(payload) != checksum:
+            continue
+
+        try:
+            records.extend(RecordFrame(payload, record_count, string_cache))
+        except (ValueError, struct.error, UnicodeDecodeError):
+            continue
+    return records
+
+def iterFrames(file: BinaryIO) -> Iterator[tuple[bytes, int, bool]]:
+    """
+    Streams the frames of a file from its current position, as (frame, record count, is intact) tuples.
+    - A frame cut short by the end of the file ends the stream, it's either being written or was torn by a crash.
+    - Data not starting with a frame (which only a damaged disk leaves) is yielded as a damaged frame,
+      up to the next frame, from which the stream carries on.
+    """
+    while True:
+        header_data = file.read(FRAME_HEADER.size)
+        if len(header_data) < FRAME_HEADER.size:
+            return
+
+        header = readFrameHeader(header_data)
+        if header is None:
+            data = header_data + file.read()
+            next_frame = data.find(FRAME_MAGIC, 1)
+            if next_frame == -1:
+                yield data, 0, False
+                return
+            file.seek(next_frame - len(data), os.SEEK_CUR)
+            yield data[:next_frame], 0, False
+            continue
+
+        payload_size, record_count, checksum = header
+        payload = file.read(payload_size)
+        if len(payload) < payload_size:
+            return
+        yield header_data + payload, record_count, zlib.crc32(payload) == checksum
+
+# ------------------------------------------------------------------------------------ #
+
+# Stored files of the Binary file type start with this header, telling whether they hold a list of records or a single one.
+FILE_HEADER = struct.Struct("<4sB")
+FILE_MAGIC = b"RCRF"
+
+def encodeFile(data: Mapping | list[Mapping]) -> bytes:
+    is_list = isinstance(data, list)
+    return FILE_HEADER.pack(FILE_MAGIC, is_list) + encodeRecords(data if is_list else [data])
+
+def decodeFile(data: bytes) -> dict | list[LazyRecord]:
+    """Decodes a stored file, a single record is returned as a regular (editable) dictionary."""
+    magic, is_list = FILE_HEADER.unpack_from(data)
+    if magic != FILE_MAGIC:
+        raise ValueError("The file doesn't hold binary records.")
+
+    records = decodeRecords(data[FILE_HEADER.size:])
+    if is_list:
+        return records
+    if not records:
+        raise ValueError("The file's record is damaged.")
+    return records[0].toDict()
@@ -0,0 +1,234 @@
+# Stores the backup registry, the backup history and the environment values in a single SQLite database,
+# used by AppDataLogic in place of the JSON files when the SQLite storage backend is selected.
+# Author: https://github.com/matkeg
+# Date: October 19th 2026
+
+import json, sqlite3, weakref, threading
+from typing import Optional
+
+from .RecordCodec import recordToDict
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS backups (
+    backup_id INTEGER PRIMARY KEY,
+    origin_folder TEXT,
+    destination_folder TEXT,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS history (
+    entry_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    backup_id INTEGER,
+    backup_time INTEGER,
+    operation_result INTEGER,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS history_backup_time ON history (backup_id, backup_time);
+CREATE INDEX IF NOT EXISTS history_time ON history (backup_time);
+CREATE INDEX IF NOT EXISTS history_result ON history (operation_result, backup_time);
+
+CREATE TABLE IF NOT EXISTS environment (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# ------------------------------------------------------------------------------------ #
+
+class ThreadConnection:
+    """Holds the connection of a thread inside its thread-local data, which is dropped once the thread ends."""
+    __slots__ = ("connection", "__weakref__")
+
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+
+class SQLiteStorage:
+    """
+    A single SQLite database in WAL mode, so the views can read while a backup writes its history entry.
+    - Each thread uses its own connection, as SQLite connections can't be shared between threads.
+      Workers are short-lived threads, so a connection is closed as soon as its thread ends.
+    - Whole records are stored as JSON, only the columns which are queried or indexed are split out.
+    """
+
+    def __init__(self, database_path: str):
+        self.database_path = database_path
+        self.local = threading.local()
+        self.connections: set[sqlite3.Connection] = set()
+        self.lock = threading.Lock()
+
+        connection = self.get_connection()
+        connection.executescript(SCHEMA)
+        connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def get_connection(self) -> sqlite3.Connection:
+        holder = getattr(self.local, "holder", None)
+        if holder is None:
+            # Only the owning thread uses the connection, the check is disabled so it can be closed after the thread ended.
+            connection = sqlite3.connect(self.database_path, timeout=10, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            connection.execute("PRAGMA foreign_keys = ON")
+
+            holder = ThreadConnection(connection)
+            weakref.finalize(holder, self.release_connection, connection)
+            self.local.holder = holder
+            with self.lock:
+                self.connections.add(connection)
+        return holder.connection
+
+    def release_connection(self, connection: sqlite3.Connection):
+        """Closes the connection of a thread which ended."""
+        with self.lock:
+            self.connections.discard(connection)
+        try:
+            connection.close()
+        except sqlite3.Error:
+            pass
+
+    def transaction(self) -> "SQLiteTransaction":
+        return SQLiteTransaction(self.get_connection())
+
+    def close(self):
+        """Closes the connections of every thread, the database can't be used afterwards."""
+        with self.lock:
+            connections, self.connections = self.connections, set()
+        for connection in connections:
+            try:
+                connection.close()
+            except sqlite3.Error:
+                pass
+        self.local = threading.local()
+
+    # -- BACKUPS ---------------------------------- #
+
+    def save_backup(self, backup_id: int, data: dict):
+        with self.transaction() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO backups (backup_id, origin_folder, destination_folder, data) VALUES (?, ?, ?, ?)",
+                (backup_id, data.get("origin_folder"), data.get("destination_folder"), json.dumps(data, default=recordToDict))
+            )
+
+    def load_backup(self, backup_id: int) -> Optional[dict]:
+        row = self.get_connection().execute("SELECT data FROM backups WHERE backup_id = ?", (backup_id,)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def remove_backup(self, backup_id: int) -> bool:
+        with self.transaction() as connection:
+            return connection.execute("DELETE FROM backups WHERE backup_id = ?", (backup_id,)).rowcount > 0
+
+    def list_backups(self) -> list[dict]:
+        rows = self.get_connection().execute("SELECT data FROM backups ORDER BY backup_id").fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    # -- HISTORY ---------------------------------- #
+
+    @staticmethod
+    def get_history_row(entry: dict) -> tuple:
+        return entry.get("backup_id"), entry.get("backup_time"), entry.get("operation_result"), json.dumps(entry, default=recordToDict)
+
+    def append_history(self, entry: dict):
+        with self.transaction() as connection:
+            connection.execute(
+                "INSERT INTO history (backup_id, backup_time, operation_result, data) VALUES (?, ?, ?, ?)",
+                self.get_history_row(entry)
+            )
+
+    def save_history(self, entries: list[dict]):
+        """Replaces the whole history, used by the `save_data` API which always writes every entry."""
+        with self.transaction() as connection:
+            connection.execute("DELETE FROM history")
+            connection.executemany(
+                "INSERT INTO history (backup_id, backup_time, operation_result, data) VALUES (?, ?, ?, ?)",
+                (self.get_history_row(entry) for entry in entries)
+            )
+
+    def query_history(
+            self, backup_id: Optional[int] = None, since: Optional[int] = None, until: Optional[int] = None,
+            operation_result: Optional[int] = None, limit: Optional[int] = None
+        ) -> list[dict]:
+        """
+        Returns the history entries matching the passed filters, oldest first.
+        With a limit, only the most recent matching entries are returned (still oldest first).
+        """
+        conditions, parameters = [], []
+        for column, operator, value in (
+            ("backup_id", "=", backup_id), ("backup_time", ">=", since),
+            ("backup_time", "<=", until), ("operation_result", "=", operation_result)
+        ):
+            if value is not None:
+                conditions.append(f"{column} {operator} ?")
+                parameters.append(value)
+
+        query = "SELECT data FROM history"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY backup_time DESC, entry_id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            parameters.append(limit)
+
+        rows = self.get_connection().execute(query, parameters).fetchall()
+        return [json.loads(row[0]) for row in reversed(rows)]
+
+    def query_history_rows(self) -> list[tuple[int, dict]]:
+        """Returns every history entry along with its row id, in the order they were logged."""
+        rows = self.get_connection().execute("SELECT entry_id, data FROM history ORDER BY entry_id").fetchall()
+        return [(entry_id, json.loads(data)) for entry_id, data in rows]
+
+    def remove_history_entries(self, entry_ids: list[int]):
+        with self.transaction() as connection:
+            connection.executemany("DELETE FROM history WHERE entry_id = ?", ((entry_id,) for entry_id in entry_ids))
+
+    # -- ENVIRONMENT ------------------------------ #
+
+    def load_environment(self) -> dict:
+        rows = self.get_connection().execute("SELECT key, value FROM environment").fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def save_environment(self, data: dict):
+        """Replaces every environment value, used by the `save_data` API which always writes the whole file."""
+        with self.transaction() as connection:
+            connection.execute("DELETE FROM environment")
+            connection.executemany(
+                "INSERT INTO environment (key, value) VALUES (?, ?)",
+                ((key, json.dumps(value)) for key, value in data.items())
+            )
+
+    def get_environment_value(self, key: str, default_value: any = None) -> any:
+        row = self.get_connection().execute("SELECT value FROM environment WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row is not None else default_value
+
+    def set_environment_value(self, key: str, value: any):
+        with self.transaction() as connection:
+            connection.execute("INSERT OR REPLACE INTO environment (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def increment_environment_value(self, key: str, increment: int = 1, default_value: int = 0) -> int:
+        """Increments a numeric value inside a single write transaction, so concurrent increments can't get lost."""
+        with self.transaction() as connection:
+            row = connection.execute("SELECT value FROM environment WHERE key = ?", (key,)).fetchone()
+            current_value = json.loads(row[0]) if row is not None else default_value
+            if not isinstance(current_value, (int, float)):
+                current_value = default_value
+
+            new_value = current_value + increment
+            connection.execute("INSERT OR REPLACE INTO environment (key, value) VALUES (?, ?)", (key, json.dumps(new_value)))
+            return new_value
+
+class SQLiteTransaction:
+    """Runs the statements inside of the `with` block in a single write transaction, rolling it back on errors."""
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+
+    def __enter__(self) -> sqlite3.Connection:
+        # Taking the write lock up front keeps read-then-write transactions from failing halfway.
+        self.connection.execute("BEGIN IMMEDIATE")
+        return self.connection
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.connection.execute("COMMIT")
+        else:
+            self.connection.execute("ROLLBACK")
+        return False
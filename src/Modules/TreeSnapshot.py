@@ -0,0 +1,318 @@
+# Compact, columnar snapshots of whole folder trees, which hold per-entry data (names, sizes,
+# modification times, inodes) for millions of entries without creating an object per entry.
+# Author: https://github.com/matkeg
+# Date: October 19th 2026
+
+import os, sys, mmap, struct, hashlib
+from array import array
+from typing import Optional, Iterator, Callable
+
+from ..Features.fetcher import getFFlag
+from .AppDataLogic import get_data_file_path, StorageFolder, FileType
+
+# ------------------------------------------------------------------------------------ #
+
+# Every entry of a snapshot is identified by its index, and is described by the values
+# stored at that index in each of the columns below. Paths aren't stored, instead every
+# entry stores the index of its parent (-1 for the root) and the index of its name.
+# Names are stored once inside of a single UTF-8 blob, repeated names are interned.
+# The entries directly inside of a folder are always stored next to each other, so the
+# children of a folder can be found without storing any per-file lookup structure.
+
+SNAPSHOT_MAGIC = b"RCTS"
+SNAPSHOT_VERSION = 1
+
+# Magic, version, entry count, name count, name blob length, root path length.
+SNAPSHOT_HEADER = struct.Struct("<4sHxxQQQI")
+
+# Column names and their array type codes, in the order they are stored in.
+SNAPSHOT_COLUMNS = (
+    ("parents", "i"),
+    ("name_indexes", "I"),
+    ("sizes", "q"),
+    ("mtimes", "q"),
+    ("inodes", "Q"),
+    ("kinds", "B"),
+)
+
+KIND_FILE = 0
+KIND_FOLDER = 1
+
+def alignOffset(offset: int, alignment: int = 8) -> int:
+    return (offset + alignment - 1) // alignment * alignment
+
+# ------------------------------------------------------------------------------------ #
+
+class TreeSnapshot:
+    """
+    Holds the entries of a folder tree as typed arrays.
+    - Snapshots being built use `array` columns, loaded snapshots use memory-mapped `memoryview` columns.
+    - Loaded snapshots are read-only and decode names only when they are asked for.
+    """
+
+    def __init__(self, root_path: str):
+        self.root_path = os.path.normpath(root_path)
+
+        self.parents = array("i")
+        self.name_indexes = array("I")
+        self.sizes = array("q")
+        self.mtimes = array("q")
+        self.inodes = array("Q")
+        self.kinds = array("B")
+
+        # Names are stored as a blob with the offset of each name, plus one final offset.
+        self.name_blob = bytearray()
+        self.name_offsets = array("Q", [0])
+        self.name_ids: dict[str, int] = {}
+        self.interned_names_limit = getFFlag("TreeSnapshotInternedNames") or 1 << 18
+
+        self.mapped_file = None
+
+        # The range of the entries directly inside of each folder, only built once a folder's children are asked for.
+        self.child_ranges: Optional[dict[int, tuple[int, int]]] = None
+
+    def __len__(self) -> int:
+        return len(self.parents)
+
+    # --------------------------------------------- #
+
+    def internName(self, name: str) -> int:
+        """Returns the index of the passed name, storing it if needed."""
+        name_index = self.name_ids.get(name)
+        if name_index is not None:
+            return name_index
+
+        name_index = len(self.name_offsets) - 1
+        self.name_blob += name.encode("utf-8", "surrogateescape")
+        self.name_offsets.append(len(self.name_blob))
+
+        # The interning table is bounded, since most file names are unique anyway.
+        if len(self.name_ids) < self.interned_names_limit:
+            self.name_ids[name] = name_index
+
+        return name_index
+
+    def addEntry(self, parent: int, name: str, size: int, mtime: int, inode: int, kind: int) -> int:
+        """Adds an entry to the snapshot, returning its index."""
+        self.parents.append(parent)
+        self.name_indexes.append(self.internName(name))
+        self.sizes.append(size)
+        self.mtimes.append(mtime)
+        self.inodes.append(inode)
+        self.kinds.append(kind)
+        return len(self.parents) - 1
+
+    # --------------------------------------------- #
+
+    def getName(self, index: int) -> str:
+        name_index = self.name_indexes[index]
+        return bytes(self.name_blob[self.name_offsets[name_index]:self.name_offsets[name_index + 1]]).decode("utf-8", "surrogateescape")
+
+    def getPath(self, index: int) -> str:
+        """Returns the full path of an entry, by walking up its parents."""
+        names = []
+        while index > 0:
+            names.append(self.getName(index))
+            index = self.parents[index]
+
+        return os.path.join(self.root_path, *reversed(names))
+
+    def isFolder(self, index: int) -> bool:
+        return self.kinds[index] == KIND_FOLDER
+
+    def iterFiles(self) -> Iterator[int]:
+        """Yields the indexes of all file entries."""
+        for index, kind in enumerate(self.kinds):
+            if kind == KIND_FILE:
+                yield index
+
+    def getTotalSize(self) -> int:
+        return sum(self.sizes)
+
+    def getChildren(self, folder_index: int) -> dict[str, int]:
+        """Returns the indexes of the entries directly inside of the passed folder, keyed by their names."""
+        if self.child_ranges is None:
+            # Children of a folder are contiguous, so a single pass over the parents finds where each range ends.
+            self.child_ranges = {}
+            start = 1
+            for index in range(2, len(self.parents) + 1):
+                if index == len(self.parents) or self.parents[index] != self.parents[start]:
+                    self.child_ranges[self.parents[start]] = (start, index)
+                    start = index
+
+        start, end = self.child_ranges.get(folder_index, (0, 0))
+        return {self.getName(index): index for index in range(start, end)}
+
+    def isUnchanged(self, index: int, size: int, mtime: int, inode: int, kind: int) -> bool:
+        """Checks whether the passed entry still has the same kind, size, modification time and inode."""
+        return (
+            self.kinds[index] == kind and
+            self.sizes[index] == size and
+            self.mtimes[index] == mtime and
+            self.inodes[index] == inode
+        )
+
+    # --------------------------------------------- #
+
+    def save(self, file_path: str):
+        """
+        Stores the snapshot into a binary file, which can later be memory-mapped by `load`.
+        The file is written next to its destination first, so a snapshot is never partially written.
+        """
+        root_path = self.root_path.encode("utf-8", "surrogateescape")
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        temporary_path = file_path + ".tmp"
+
+        with open(temporary_path, "wb") as f:
+            f.write(SNAPSHOT_HEADER.pack(
+                SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(self), len(self.name_offsets) - 1, len(self.name_blob), len(root_path)
+            ))
+            f.write(root_path)
+
+            # Each column starts at an offset aligned to 8 bytes, so it can be cast in place.
+            columns = [getattr(self, column_name) for column_name, _ in SNAPSHOT_COLUMNS]
+            columns.append(self.name_offsets)
+
+            for column in columns:
+                f.write(b"\0" * (alignOffset(f.tell()) - f.tell()))
+                if sys.byteorder != "little":
+                    column = array(column.typecode, column)
+                    column.byteswap()
+                column.tofile(f)
+
+            f.write(self.name_blob)
+
+        os.replace(temporary_path, file_path)
+
+    @classmethod
+    def load(cls, file_path: str) -> 'TreeSnapshot':
+        """Memory-maps a stored snapshot, only its header and root path are read right away."""
+        with open(file_path, "rb") as f:
+            mapped_file = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, entry_count, name_count, blob_length, root_length = SNAPSHOT_HEADER.unpack_from(mapped_file, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            mapped_file.close()
+            raise ValueError(f"{file_path} is not a compatible tree snapshot.")
+
+        if sys.byteorder != "little":
+            mapped_file.close()
+            raise ValueError("Tree snapshots can only be memory-mapped on little-endian machines.")
+
+        offset = SNAPSHOT_HEADER.size
+        snapshot = cls(bytes(mapped_file[offset:offset + root_length]).decode("utf-8", "surrogateescape"))
+        snapshot.mapped_file = mapped_file
+        offset += root_length
+
+        view = memoryview(mapped_file)
+        columns = [(column_name, typecode, entry_count) for column_name, typecode in SNAPSHOT_COLUMNS]
+        columns.append(("name_offsets", "Q", name_count + 1))
+
+        for column_name, typecode, length in columns:
+            offset = alignOffset(offset)
+            byte_length = length * array(typecode).itemsize
+            setattr(snapshot, column_name, view[offset:offset + byte_length].cast(typecode))
+            offset += byte_length
+
+        snapshot.name_blob = view[offset:offset + blob_length]
+        snapshot.name_ids = {}
+        return snapshot
+
+    def close(self):
+        """Releases the memory-mapped file of a loaded snapshot."""
+        if self.mapped_file is None:
+            return
+
+        for column_name, _ in SNAPSHOT_COLUMNS:
+            getattr(self, column_name).release()
+        self.name_offsets.release()
+        self.name_blob.release()
+
+        self.mapped_file.close()
+        self.mapped_file = None
+
+# ------------------------------------------------------------------------------------ #
+
+def scanTreeSnapshot(
+        root_path: str, previous: Optional[TreeSnapshot] = None,
+        on_changed_file: Optional[Callable[[str], bool]] = None, is_cancelled: Optional[Callable[[], bool]] = None
+    ) -> Optional[TreeSnapshot]:
+    """
+    Walks the passed folder once, recording every file and folder into a new snapshot.
+    - Files which are new or changed since the passed previous snapshot (every file, without one) are passed to
+      `on_changed_file`, files it returns False for are recorded as changed, so they're passed again next time.
+    - Returns None if the walk was cancelled through `is_cancelled`.
+    """
+    snapshot = TreeSnapshot(root_path)
+
+    root_stat = os.stat(snapshot.root_path)
+    root_index = snapshot.addEntry(-1, "", 0, root_stat.st_mtime_ns, root_stat.st_ino, KIND_FOLDER)
+    pending_folders = [(root_index, snapshot.root_path, 0 if previous is not None else None)]
+
+    while pending_folders:
+        if is_cancelled is not None and is_cancelled():
+            return None
+
+        parent_index, folder_path, previous_index = pending_folders.pop()
+        previous_children = previous.getChildren(previous_index) if previous_index is not None else {}
+
+        try:
+            with os.scandir(folder_path) as entries:
+                for entry in entries:
+                    try:
+                        previous_child = previous_children.get(entry.name)
+
+                        if entry.is_file(follow_symlinks=False):
+                            entry_stat = entry.stat(follow_symlinks=False)
+                            size, mtime, inode = entry_stat.st_size, entry_stat.st_mtime_ns, entry.inode()
+
+                            is_changed = previous_child is None or not previous.isUnchanged(previous_child, size, mtime, inode, KIND_FILE)
+                            if is_changed and on_changed_file is not None and not on_changed_file(entry.path):
+                                mtime = -1
+
+                            snapshot.addEntry(parent_index, entry.name, size, mtime, inode, KIND_FILE)
+
+                        elif entry.is_dir(follow_symlinks=False):
+                            entry_stat = entry.stat(follow_symlinks=False)
+                            folder_index = snapshot.addEntry(
+                                parent_index, entry.name, 0,
+                                entry_stat.st_mtime_ns, entry.inode(), KIND_FOLDER
+                            )
+
+                            if previous_child is not None and previous.kinds[previous_child] != KIND_FOLDER:
+                                previous_child = None
+                            pending_folders.append((folder_index, entry.path, previous_child))
+                    except OSError as e:
+                        print(f"Error accessing {entry.path}: {e}")
+        except (PermissionError, FileNotFoundError) as e:
+            print(f"Error accessing {folder_path}: {e}")
+
+    return snapshot
+
+def getTreeSnapshotPath(root_path: str, destination_path: Optional[str] = None) -> str:
+    """
+    Returns where the snapshot of the passed folder is stored inside of the AppData folder.
+    Snapshots describing what was copied into a destination are stored separately for each destination.
+    """
+    normalized_path = os.path.normcase(os.path.normpath(root_path))
+    if destination_path is not None:
+        normalized_path += "\0" + os.path.normcase(os.path.normpath(destination_path))
+
+    snapshot_name = "tree_snapshot_" + hashlib.sha1(normalized_path.encode("utf-8", "surrogateescape")).hexdigest()[:16]
+    return get_data_file_path(snapshot_name, StorageFolder.GENERAL, FileType.TreeSnapshot)
+
+def saveTreeSnapshot(snapshot: TreeSnapshot, destination_path: Optional[str] = None):
+    """Stores the passed snapshot inside of the AppData folder, replacing the previous snapshot of its folder."""
+    snapshot.save(getTreeSnapshotPath(snapshot.root_path, destination_path))
+
+def loadTreeSnapshot(root_path: str, destination_path: Optional[str] = None) -> Optional[TreeSnapshot]:
+    """Loads the stored snapshot of the passed folder, returns None if there isn't a compatible one."""
+    snapshot_path = getTreeSnapshotPath(root_path, destination_path)
+    if not os.path.exists(snapshot_path):
+        return None
+
+    try:
+        return TreeSnapshot.load(snapshot_path)
+    except (OSError, ValueError) as e:
+        print(f"Unable to load the tree snapshot of {root_path}: {e}")
+        return None
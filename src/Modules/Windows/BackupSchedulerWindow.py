@@ -146,6 +146,9 @@ class BackupSchedulerWindow(QMainWindow):
         elif index == 3: # AT CURRENT USER'S LOGON
             self.timeSettingsGroup.setEnabled(False)
 
+        elif index == 4: # CONTINUOUSLY
+            self.timeSettingsGroup.setEnabled(False)
+
 
     def onRecurrenceUnitChange(self, index: int):
         if index == 0: # DAYS...
@@ -4,7 +4,7 @@
 
 # PyQt5 Libraries
 from PyQt5.QtWidgets import QApplication, QFileDialog, QMainWindow, QPushButton, QLineEdit, QWidget, QTreeWidgetItem
-from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtCore import pyqtSignal, QFileSystemWatcher
 from typing import Optional
 
 # Asset Resources and Utilities
@@ -19,6 +19,14 @@ from src.Modules.Windows.BackupSchedulerWindow import BackupSchedulerWindow
 from ..BackupLogic import *
 from ..AppDataLogic import *
 from ..FileSystemUtils import arePathsTheSame, isUsingBackupFolder
+from ..BackupPredictor import estimateBackupDuration, findOverlappingBackups, EstimateSource
+from ..BackupHistoryViewLogic import RecentBackupHistoryWorker
+from ..BackupRegistryViewLogic import getRegisteredBackups
+from ..CapacityPlanner import planDeviceCapacity
+from ..PartitionAnalyzer import ConflictType, FolderRole, findPartitionConflicts, describeConflict
+from ..BackupPathIndex import BackupPathIndexCache
+from ..DriveBenchmark import loadDriveBenchmarks, getDriveBenchmark, compareDriveSpeeds, suggestWorkerCount
+from ..Utils import ask, AskAnswer
 
 
 # ------------------------------------------------------------------------------------ #
@@ -97,6 +105,46 @@ class BackupSetupWindow(QMainWindow):
 
         self.triggerInfoTree: QTreeWidget = findObject(self, "triggerInfoTree")
 
+        # --- SETUP FOLDER ANALYSIS --------------- #
+        # Folders are analyzed in the background, one worker per folder input.
+        self.folderWorkers: dict[str, FolderAnalysisWorker] = {}
+
+        # Cached access probes of the selected folders are dropped once the folders change.
+        self.folderWatcher = QFileSystemWatcher(self)
+        self.folderWatcher.directoryChanged.connect(PathProbe.invalidate)
+        self.watchedFolders: dict[str, Optional[str]] = {}
+
+        self.fromFolderLocationInput.textChanged.connect(
+            lambda text: self.cancelFolderAnalysis("fromFolder", text)
+        )
+        self.toFolderLocationInput.textChanged.connect(
+            lambda text: self.cancelFolderAnalysis("toFolder", text)
+        )
+
+        # Typed folders are looked up among the folders of the registered backups as the user types.
+        self.fromFolderLocationInput.textChanged.connect(
+            lambda text: self.updatePathOverlaps(self.fromFolderLocationInput, text)
+        )
+        self.toFolderLocationInput.textChanged.connect(
+            lambda text: self.updatePathOverlaps(self.toFolderLocationInput, text)
+        )
+
+        # --- SETUP DURATION ESTIMATES ----------- #
+        # The recent history is loaded once in the background, estimates are refreshed once it's loaded,
+        # and whenever the origin folder is analyzed.
+        self.backupHistory: list[BackupHistoryData] = []
+        self.registeredBackups = getRegisteredBackups()
+        self.pathIndex = BackupPathIndexCache.get(self.registeredBackups)
+        self.originFolderStats: Optional[FolderStats] = None
+        self.originFolderStatsPath: Optional[str] = None
+
+        # Benchmarked drives tell whether the destination holds the backup back, and how many files to handle at once.
+        self.driveBenchmarks = loadDriveBenchmarks()
+
+        self.historyWorker = RecentBackupHistoryWorker([backup.backup_id for backup in self.registeredBackups])
+        self.historyWorker.finished.connect(self.onBackupHistoryLoaded)
+        self.historyWorker.start()
+
         # --- SETUP DATA UPDATE SIGNAL ------------ #
         self.currentDataUpdated.connect(self.updateUiData)
 
@@ -268,9 +316,11 @@ class BackupSetupWindow(QMainWindow):
             print("Data collection successful")
             print("--- DATA SAVING START --------------------------------------")
         
-         # Find the appropriate backup id for the backup.
+         # Find the appropriate backup id for the backup. New backups get a provisional id for the checks below,
+         # their actual id is only allocated once the backup is saved.
         backupId = get_environment_value("TotalBackups", 0) + 1
-        if self.CurrentBackupData["backup_id"] is not None: 
+        isNewBackup = self.CurrentBackupData["backup_id"] is None
+        if not isNewBackup: 
             backupId = self.CurrentBackupData["backup_id"]
 
 
@@ -297,10 +347,83 @@ class BackupSetupWindow(QMainWindow):
             backup_id = backupId
         )
 
+        # Warn about scheduled backups which would still be running, or start while this one runs.
+        if windowAction is BackupSetupAction.REGISTER or windowAction is BackupSetupAction.EDIT:
+            # The overlaps are estimated from the history, which might still be loading.
+            if self.historyWorker is not None:
+                self.historyWorker.wait()
+                self.backupHistory = self.historyWorker.history
+
+            overlappingBackups = findOverlappingBackups(scheduleData, getRegisteredBackups(), self.backupHistory)
+            if overlappingBackups:
+                overlappingNames = "\n".join(
+                    f"{backup.friendly_name} ({formatDuration(estimate.duration) if estimate else 'no estimate'})"
+                    for backup, estimate in overlappingBackups
+                )
+                if not ask(
+                    "This backup is scheduled to run at the same time as the following backups, "
+                    "running them together will slow all of them down:\n\n"
+                    f"{overlappingNames}\n\nDo you want to save it anyway?",
+                    "Overlapping Backups",
+                    AskAnswer.YES_NO
+                ):
+                    return
+
+        # Warn about backups which would copy into each other's folders, or share a destination.
+        if windowAction is BackupSetupAction.REGISTER or windowAction is BackupSetupAction.EDIT:
+            backups = [backup for backup in getRegisteredBackups() if backup.backup_id != scheduleData.backup_id]
+            conflicts = [
+                conflict for conflict in findPartitionConflicts(backups + [scheduleData]).getConflicts(scheduleData.backup_id)
+                if conflict.conflict_type in (ConflictType.CHAINED, ConflictType.SHARED_DESTINATION)
+            ]
+            if conflicts:
+                names = {backup.backup_id: backup.friendly_name for backup in backups}
+                names[scheduleData.backup_id] = scheduleData.friendly_name or "This backup"
+                if not ask(
+                    "The folders of this backup conflict with other registered backups:\n\n"
+                    + "\n".join(describeConflict(conflict, names) for conflict in conflicts) +
+                    "\n\nDo you want to save it anyway?",
+                    "Conflicting Backups",
+                    AskAnswer.YES_NO
+                ):
+                    return
+
+        # Make sure the destination device has room for this backup and the others targeting it.
+        capacityPlan = self.planDestinationCapacity(scheduleData)
+        if capacityPlan is not None and not capacityPlan.fits():
+            if not ask(
+                "The destination device doesn't have enough free space for this backup, "
+                "the backup will fail once the device fills up.\n\n"
+                f"{capacityPlan.describe()}\n\nDo you want to save it anyway?",
+                "Not Enough Space",
+                AskAnswer.YES_NO
+            ):
+                return
+
+        # Warn about destinations which are much slower than the origin, if both drives were benchmarked.
+        speedWarning = self.getDriveSpeedWarning(scheduleData)
+        if speedWarning is not None:
+            if not ask(
+                f"{speedWarning}\n\nBackups will take longer than the origin drive allows, "
+                "consider choosing a faster destination. Do you want to continue anyway?",
+                "Slow Destination",
+                AskAnswer.YES_NO
+            ):
+                return
+
         # Based on which backup setup action is provided, we will send the data accordingly.
         print(windowAction)
         success = False
         if windowAction is BackupSetupAction.REGISTER or windowAction is BackupSetupAction.EDIT:
+            # Allocating the id is atomic, so backups registered at the same time (even by another process)
+            # never end up with the same id.
+            if isNewBackup:
+                backupId = increment_environment_value("TotalBackups", 1, 0)
+                if backupId is None:
+                    error("Unable to allocate an id for the backup. Please try again.")
+                    return
+                scheduleData.backup_id = backupId
+
             success = edit_data(
                 "backup"+str(backupId),
                 scheduleData.to_dict(),
@@ -313,8 +436,6 @@ class BackupSetupWindow(QMainWindow):
             success = False
             
         if success:
-            increment_environment_value("TotalBackups", 1, 0)
-
             if debuggingEnabled: 
                 print("Data saving successful")
                 print("--- DATA PROCESSED SUCCESSFULLY ----------------------------")
@@ -440,44 +561,177 @@ class BackupSetupWindow(QMainWindow):
     # --------------------------------------------- #
 
     def updateFolderInfo(self):
-        """Sets the folder info inside the UI"""
-        fromFolderData = getFolderData(self.fromFolderLocationInput, AccessType.Read)
-        toFolderData = getFolderData(self.toFolderLocationInput, AccessType.Write)
+        """Validates the folder inputs and starts analyzing them in the background."""
+        self.startFolderAnalysis("fromFolder", self.fromFolderLocationInput, AccessType.Read)
+        self.startFolderAnalysis("toFolder", self.toFolderLocationInput, AccessType.Write)
+
+    def startFolderAnalysis(self, prefix: str, input: QLineEdit, accessType: AccessType):
+        """
+        Starts analyzing the folder of the passed input, displaying its insights as they come.
+        - Repeated requests for a folder which is already being analyzed are coalesced.
+        """
+        folder_path = validateFolderInput(input, accessType)
+        currentWorker = self.folderWorkers.get(prefix)
+
+        self.watchSelectedFolder(prefix, folder_path)
+
+        # The size of the previous origin folder doesn't say anything about the new one.
+        if prefix == "fromFolder" and folder_path != self.originFolderStatsPath:
+            self.resetOriginFolderStats()
+
+        if folder_path is None:
+            self.cancelFolderAnalysis(prefix)
+            self.setFolderInsights(prefix, FolderData())
+            return
+
+        if currentWorker is not None and currentWorker.folder_path == folder_path and not currentWorker.isCancelled():
+            return
+
+        self.cancelFolderAnalysis(prefix)
+        self.setFolderInsights(prefix, FolderData(
+            folder_path, os.path.basename(folder_path), os.path.splitdrive(folder_path)[0], is_partial=True
+        ))
+
+        # Benchmarked drives are analyzed with as many workers as they handle well.
+        benchmark = getDriveBenchmark(folder_path, self.driveBenchmarks)
+        worker = FolderAnalysisWorker(folder_path, benchmark.getSuggestedWorkers() if benchmark is not None else None)
+        worker.progress.connect(lambda data: self.onFolderAnalysisUpdate(prefix, worker, data))
+        worker.folder_data.connect(lambda data: self.onFolderAnalysisUpdate(prefix, worker, data))
+        worker.finished.connect(lambda: self.onFolderAnalysisFinished(prefix, worker))
+
+        self.folderWorkers[prefix] = worker
+        worker.start()
+
+    def watchSelectedFolder(self, prefix: str, folder_path: Optional[str]):
+        """Watches the folder selected in the passed input, and stops watching folders which are no longer selected."""
+        self.watchedFolders[prefix] = folder_path
+
+        selected_folders = {path for path in self.watchedFolders.values() if path is not None}
+        watched_folders = set(self.folderWatcher.directories())
+
+        if watched_folders - selected_folders:
+            self.folderWatcher.removePaths(list(watched_folders - selected_folders))
+        if selected_folders - watched_folders:
+            self.folderWatcher.addPaths(list(selected_folders - watched_folders))
+
+    def cancelFolderAnalysis(self, prefix: str, new_path: Optional[str] = None):
+        """Cancels the ongoing analysis of a folder, unless it is still analyzing the passed path."""
+        worker = self.folderWorkers.get(prefix)
+        if worker is None or (new_path is not None and worker.folder_path == new_path):
+            return
         
-        backupFolderSuffix = ""
-        if self.backupFolderCheck.isChecked():
-            backupFolderSuffix = " / Backups"
+        worker.cancel()
+        del self.folderWorkers[prefix]
+
+    def onFolderAnalysisUpdate(self, prefix: str, worker: FolderAnalysisWorker, folderData: FolderData):
+        # Ignore data of cancelled or replaced workers.
+        if self.folderWorkers.get(prefix) is worker and not worker.isCancelled():
+            self.setFolderInsights(prefix, folderData)
+
+            # The size of the origin folder is what a first run of the backup copies,
+            # while the size of the destination tells how much of it is already copied.
+            if not folderData.is_partial:
+                if prefix == "fromFolder":
+                    self.originFolderStats = folderData.stats
+                    self.originFolderStatsPath = worker.folder_path
+                self.updateTriggerInfoTree()
+
+    def resetOriginFolderStats(self):
+        """Forgets the size of the analyzed origin folder, refreshing the estimates which were based on it."""
+        if self.originFolderStats is None:
+            return
+
+        self.originFolderStats = None
+        self.originFolderStatsPath = None
+        self.updateTriggerInfoTree()
+
+    def onFolderAnalysisFinished(self, prefix: str, worker: FolderAnalysisWorker):
+        # Connected to QThread.finished, so the thread has fully stopped and the worker can be deleted.
+        if self.folderWorkers.get(prefix) is worker:
+            del self.folderWorkers[prefix]
+        worker.deleteLater()
+
+    def onBackupHistoryLoaded(self):
+        self.backupHistory = self.historyWorker.history
+        self.historyWorker.deleteLater()
+        self.historyWorker = None
+        self.updateTriggerInfoTree()
+
+    def closeEvent(self, event):
+        for prefix in list(self.folderWorkers):
+            self.cancelFolderAnalysis(prefix)
+
+        # The history loads within a moment, and its thread can't be destroyed while it's running.
+        if self.historyWorker is not None:
+            self.historyWorker.wait()
+        super().closeEvent(event)
+
+    # --------------------------------------------- #
+
+    def setFolderInsights(self, prefix: str, folderData: FolderData):
+        """Sets the folder insights inside the UI, the prefix specifies which folder's labels are used."""
+        folderNameSuffix = ""
+        if prefix == "toFolder" and self.backupFolderCheck.isChecked():
+            folderNameSuffix = " / Backups"
+
+        # Partial data is still being updated by the folder analysis.
+        partialSuffix = ""
+        if folderData.is_partial:
+            partialSuffix = " (Scanning...)"
+
+        # Hardlinked, sparse and small files make the apparent size differ from the used space.
+        diskSizeSuffix = ""
+        if folderData.folder_disk_size not in ("Unknown", folderData.folder_size):
+            diskSizeSuffix = f" ({folderData.folder_disk_size} on disk)"
 
         # ---- Setting the name --------------------------------------#
-        setUnsecureText(self, "fromFolderInsightsName", 
-            f"""<html><head/><body><p><span style=" font-weight:600;">
-            {truncateWithDots(fromFolderData.folder_name, 25)}</span></p></body></html>""")
-        
-        setUnsecureText(self, "toFolderInsightsName", 
+        setUnsecureText(self, f"{prefix}InsightsName", 
             f"""<html><head/><body><p><span style=" font-weight:600;">
-            {truncateWithDots(toFolderData.folder_name, 25)}{backupFolderSuffix}</span></p></body></html>""")
+            {truncateWithDots(folderData.folder_name, 25)}{folderNameSuffix}</span></p></body></html>""")
 
         # ---- Setting the general info ------------------------------#
-        setUnsecureText(self, "fromFolderInsightsInfo", 
-            f"""<html><head/><body><p><span style=" color:#a5a5a5;">Drive:</span> 
-            {fromFolderData.drive_letter}<br/><span style=" color:#a3a3a3;">Size:</span> 
-            {fromFolderData.folder_size}</p></body></html>""")
-        
-        setUnsecureText(self, "toFolderInsightsInfo", 
+        setUnsecureText(self, f"{prefix}InsightsInfo", 
             f"""<html><head/><body><p><span style=" color:#a5a5a5;">Drive:</span> 
-            {toFolderData.drive_letter}<br/><span style=" color:#a3a3a3;">Size:</span> 
-            {toFolderData.folder_size}</p></body></html>""")
+            {folderData.drive_letter}<br/><span style=" color:#a3a3a3;">Size:</span> 
+            {folderData.folder_size}{diskSizeSuffix}{partialSuffix}</p></body></html>""")
         
         # ---- Setting the counter info ------------------------------#
-        setUnsecureText(self, "fromFolderInsightsCounter", 
+        setUnsecureText(self, f"{prefix}InsightsCounter", 
             f"""<html><head/><body><p><span style=" color:#a5a5a5;">Files:</span> 
-            {fromFolderData.number_of_files}<br/><span style=" color:#a3a3a3;">Folders:</span> 
-            {fromFolderData.number_of_folders}</p></body></html>""")
+            {folderData.number_of_files}<br/><span style=" color:#a3a3a3;">Folders:</span> 
+            {folderData.number_of_folders}</p></body></html>""")
+
+        # ---- Setting the report ------------------------------------#
+        reportText = self.formatFolderReport(folderData.report)
+        findObject(self, f"{prefix}InsightsInfo").setToolTip(reportText)
+        findObject(self, f"{prefix}InsightsCounter").setToolTip(reportText)
+
+    @staticmethod
+    def formatFolderReport(report: Optional[FolderReport]) -> str:
+        """Formats the largest files, folders and extensions of a folder, to be shown as a tooltip."""
+        if report is None or not report.extensions:
+            return ""
         
-        setUnsecureText(self, "toFolderInsightsCounter", 
-            f"""<html><head/><body><p><span style=" color:#a5a5a5;">Files:</span> 
-            {toFolderData.number_of_files}<br/><span style=" color:#a3a3a3;">Folders:</span> 
-            {toFolderData.number_of_folders}</p></body></html>""")
+        entryCount = FFlag("FolderReportDisplayedEntries") or 5
+
+        def formatEntries(entries: list[tuple[int, str]]) -> str:
+            return "<br/>".join(
+                f"{formatStorageSize(size)} - {truncateWithDots(get_last_two_subfolders(path), 60)}"
+                for size, path in entries[:entryCount]
+            ) or "-"
+
+        extensions = "<br/>".join(
+            f"{('.' + extension) if extension else 'No extension'} - {formatStorageSize(size)} ({count} files)"
+            for extension, count, size in report.getTopExtensions(entryCount)
+        )
+
+        return (
+            f"""<html><head/><body><p><span style=" font-weight:600;">Largest Files</span><br/>"""
+            f"""{formatEntries(report.largest_files)}</p>"""
+            f"""<p><span style=" font-weight:600;">Largest Folders</span><br/>"""
+            f"""{formatEntries(report.largest_folders)}</p>"""
+            f"""<p><span style=" font-weight:600;">Extensions</span><br/>{extensions}</p></body></html>"""
+        )
 
     def updateInputsToData(self):
         """Updates the inputs to the current backup data."""
@@ -515,7 +769,7 @@ class BackupSetupWindow(QMainWindow):
             week_days = "-"
 
         # Adjust fields based on initiation type
-        if initiation_type in ["NEVER", "STARTUP", "USER LOGON"]:
+        if initiation_type in ["NEVER", "STARTUP", "USER LOGON", "CONTINUOUS"]:
             recurrence_type = "-"
             week_days = "-"
 
@@ -523,13 +777,116 @@ class BackupSetupWindow(QMainWindow):
         start_time_item = QTreeWidgetItem(["Starting On", start_time])
         recurrence_item = QTreeWidgetItem(["Recurring", recurrence_type])
         week_days_item = QTreeWidgetItem(["On Days", week_days])
+        duration_item = QTreeWidgetItem(["Est. Duration", self.getEstimatedDuration()])
+        capacity_item = QTreeWidgetItem(["Disk Full In", self.getDaysUntilFull()])
+        workers_item = QTreeWidgetItem(["Copy Workers", self.getSuggestedWorkers()])
 
         self.triggerInfoTree.addTopLevelItem(initiation_item)
         self.triggerInfoTree.addTopLevelItem(start_time_item)
         self.triggerInfoTree.addTopLevelItem(recurrence_item)
         self.triggerInfoTree.addTopLevelItem(week_days_item)
+        self.triggerInfoTree.addTopLevelItem(duration_item)
+        self.triggerInfoTree.addTopLevelItem(capacity_item)
+        self.triggerInfoTree.addTopLevelItem(workers_item)
+
+    def planDestinationCapacity(self, scheduleData: BackupScheduleData):
+        """Plans the capacity of the destination device, accounting for every registered backup targeting it."""
+        backups = [backup for backup in self.registeredBackups if backup.backup_id != scheduleData.backup_id]
+        backups.append(scheduleData)
+
+        plannedBytes = None
+        if self.originFolderStats is not None:
+            plannedBytes = {scheduleData.backup_id: self.originFolderStats.total_size}
+
+        return planDeviceCapacity(scheduleData.destination_folder, backups, self.backupHistory, plannedBytes)
 
+    def getDaysUntilFull(self) -> str:
+        """Projects when the destination device fills up, to be shown in the triggerInfoTree."""
+        if self.inputIsInvalid(self.CurrentBackupData["destination_folder"], str):
+            return "-"
+
+        capacityPlan = self.planDestinationCapacity(self.getCurrentScheduleData())
+        if capacityPlan is None:
+            return "-"
+
+        daysUntilFull = capacityPlan.getDaysUntilFull()
+        if daysUntilFull is None:
+            return "NOT GROWING"
+        elif daysUntilFull == 0:
+            return "NOT ENOUGH SPACE"
+        return f"{int(daysUntilFull)} DAYS"
+
+    def getCurrentScheduleData(self) -> BackupScheduleData:
+        """Builds a schedule from the current data, used for estimates before the data is validated."""
+        return BackupScheduleData(
+            "", self.CurrentBackupData["origin_folder"] or "", self.CurrentBackupData["destination_folder"],
+            self.CurrentBackupData["initiation_type"], self.CurrentBackupData["start_time"], 
+            self.CurrentBackupData["recurrence_type"], self.CurrentBackupData["recurrence_step_unit"],
+            self.CurrentBackupData["recurrence_step"], backup_id=self.CurrentBackupData["backup_id"]
+        )
+
+    def getEstimatedDuration(self) -> str:
+        """Estimates the duration of the backup's next run from past runs, to be shown in the triggerInfoTree."""
+        if self.inputIsInvalid(self.CurrentBackupData["destination_folder"], str):
+            return "-"
+
+        plannedBytes = None
+        if self.originFolderStats is not None:
+            plannedBytes = self.originFolderStats.total_size
 
+        estimate = estimateBackupDuration(self.getCurrentScheduleData(), plannedBytes, self.backupHistory)
 
+        if estimate is None:
+            return "UNKNOWN"
 
+        if estimate.source == EstimateSource.DEVICE_HISTORY:
+            return f"~{formatDuration(estimate.duration)} (FIRST RUN)".upper()
+        return f"~{formatDuration(estimate.duration)}".upper()
+
+    def getDriveSpeedWarning(self, scheduleData: BackupScheduleData) -> Optional[str]:
+        """Compares the benchmarks of the origin and destination drives, returns a warning if the destination is much slower."""
+        originBenchmark = getDriveBenchmark(scheduleData.origin_folder, self.driveBenchmarks)
+        destinationBenchmark = getDriveBenchmark(scheduleData.destination_folder, self.driveBenchmarks)
+
+        # Backups within the same drive don't have a slower side.
+        if originBenchmark is None or destinationBenchmark is None or originBenchmark is destinationBenchmark:
+            return None
+        return compareDriveSpeeds(originBenchmark, destinationBenchmark)
+
+    def getSuggestedWorkers(self) -> str:
+        """Suggests how many files the backup should copy at once from the drive benchmarks, to be shown in the triggerInfoTree."""
+        if self.inputIsInvalid(self.CurrentBackupData["origin_folder"], str) or \
+            self.inputIsInvalid(self.CurrentBackupData["destination_folder"], str):
+            return "-"
+
+        workerCount = suggestWorkerCount(
+            getDriveBenchmark(self.CurrentBackupData["origin_folder"], self.driveBenchmarks),
+            getDriveBenchmark(self.CurrentBackupData["destination_folder"], self.driveBenchmarks)
+        )
+
+        if workerCount is None:
+            return "NOT BENCHMARKED"
+        return str(workerCount)
+
+    def updatePathOverlaps(self, input: QLineEdit, text: str):
+        """Highlights the input if the typed folder is, contains, or is inside of a folder of another registered backup."""
+        if self.inputIsInvalid(text, str) or not os.path.isabs(text):
+            input.setToolTip("")
+            input.setStyleSheet("")
+            return
 
+        overlaps = []
+        for relation, entries in (
+            ("Inside of", self.pathIndex.findContaining(text)),
+            ("Same as", self.pathIndex.findEqual(text)),
+            ("Contains", self.pathIndex.findContainedBy(text))
+        ):
+            for entry in entries:
+                if entry.backup.backup_id == self.CurrentBackupData["backup_id"]:
+                    continue
+
+                role = "origin" if entry.role == FolderRole.ORIGIN else "destination"
+                overlaps.append(f"{relation} the {role} of {entry.backup.friendly_name}")
+
+        input.setToolTip("\n".join(overlaps))
+        input.setStyleSheet("background: rgb(255, 245, 210);" if overlaps else "")